@@ -1,10 +1,20 @@
 # Home.py
 import streamlit as st
-import pandas as pd
-from supabase import create_client
 import time
 from datetime import datetime, date
-import xlsxwriter
+import io
+from utils.archivo import leer_todo
+from utils.cache import estadisticas_cache
+from utils.cargador import crear_puntos_faltantes
+from utils.catalogo import catalogo_cursos, catalogo_sesiones, seleccionar
+from utils.concurrencia import consultar_en_paralelo
+from utils.conexion import obtener_cliente, estadisticas_conexion
+from utils.exportacion import filas_sesion, escribir_excel
+from utils.historial import autor_actual, guardar_con_historial, mostrar_deshacer_rehacer
+from utils.instantanea import obtener_instantanea
+from utils.operaciones import mostrar_operaciones_masivas
+from utils.totales import obtener_totales
+from utils.vistas import seleccionar_vista
 
 # Configuración de la página
 st.set_page_config(
@@ -14,15 +24,8 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Inicializar conexión con Supabase
-@st.cache_resource
-def init_connection():
-    return create_client(
-        st.secrets["supabase_url"],
-        st.secrets["supabase_key"]
-    )
-
-supabase = init_connection()
+# Conexión compartida con Supabase
+supabase = obtener_cliente()
 
 # Inicializar estados si no existen
 if 'puntos_individuales_pendientes' not in st.session_state:
@@ -32,58 +35,28 @@ if 'puntos_grupales_pendientes' not in st.session_state:
 if 'ultimo_cambio' not in st.session_state:
     st.session_state.ultimo_cambio = time.time()
 
-def chunk_dict(dictionary, chunk_size=10):
-    """Divide un diccionario en partes más pequeñas"""
-    items = list(dictionary.items())
-    for i in range(0, len(items), chunk_size):
-        yield dict(items[i:i + chunk_size])
-
 def guardar_puntos():
     with st.spinner('Guardando puntos...'):
         try:
             MAX_RETRIES = 3
-            CHUNK_SIZE = 10
-            DELAY_BETWEEN_CHUNKS = 0.5  # segundos
-            
-            # Función auxiliar para actualizar con reintentos
-            def actualizar_con_reintentos(tabla, datos):
-                for intento in range(MAX_RETRIES):
-                    try:
-                        # Dividir las actualizaciones en lotes
-                        for chunk in chunk_dict(datos, CHUNK_SIZE):
-                            # Crear una lista de actualizaciones por lote
-                            updates = []
-                            for punto_id, puntos in chunk.items():
-                                updates.append({
-                                    'id': punto_id,
-                                    'puntos': puntos
-                                })
-                            
-                            # Realizar actualización en lote
-                            supabase.table(tabla)\
-                                .upsert(updates)\
-                                .execute()
-                            
-                            # Pequeña pausa entre lotes
-                            time.sleep(DELAY_BETWEEN_CHUNKS)
-                        return True
-                    except Exception as e:
-                        if intento == MAX_RETRIES - 1:  # Último intento
-                            raise e
-                        time.sleep(1)  # Esperar antes de reintentar
-                return False
-
-            # Guardar puntos individuales
-            if st.session_state.puntos_individuales_pendientes:
-                actualizar_con_reintentos('puntos_individuales', 
-                                        st.session_state.puntos_individuales_pendientes)
-                st.session_state.puntos_individuales_pendientes = {}
-
-            # Guardar puntos grupales
-            if st.session_state.puntos_grupales_pendientes:
-                actualizar_con_reintentos('puntos_grupales', 
-                                        st.session_state.puntos_grupales_pendientes)
-                st.session_state.puntos_grupales_pendientes = {}
+
+            # Un solo lote con los cambios individuales y grupales; el servidor
+            # registra el historial en la misma transacción
+            for intento in range(MAX_RETRIES):
+                try:
+                    guardar_con_historial(
+                        supabase,
+                        st.session_state.puntos_individuales_pendientes,
+                        st.session_state.puntos_grupales_pendientes
+                    )
+                    break
+                except Exception as e:
+                    if intento == MAX_RETRIES - 1:  # Último intento
+                        raise e
+                    time.sleep(1)  # Esperar antes de reintentar
+
+            st.session_state.puntos_individuales_pendientes = {}
+            st.session_state.puntos_grupales_pendientes = {}
 
             st.success('✅ Puntos guardados exitosamente')
             time.sleep(0.5)
@@ -94,53 +67,102 @@ def guardar_puntos():
             # No hacemos rerun aquí para mantener los cambios pendientes
             return False
 
+def consultas_pagina():
+    """Consultas de puntos de la sesión actual, que no dependen una de otra
+
+    Cursos, sesiones, estudiantes y grupos vienen de la caché compartida. Los
+    puntos se leen por páginas: un curso puede tener más filas que el límite
+    de una respuesta.
+    """
+    consultas = {}
+    if 'curso_actual' in st.session_state and 'sesion_actual' in st.session_state:
+        sesion_id = st.session_state.sesion_actual
+        consultas.update(
+            puntos_grupales=lambda: leer_todo(
+                lambda: supabase.table('puntos_grupales').select('*').eq('sesion_id', sesion_id)
+            ),
+            puntos_individuales=lambda: leer_todo(
+                lambda: supabase.table('puntos_individuales').select('*').eq('sesion_id', sesion_id)
+            ),
+        )
+    return consultas
+
+def completar_puntos(tabla, columna, ids, puntos):
+    """Indexa los puntos por grupo o estudiante, creando en un solo upsert los que falten"""
+    por_id = {p[columna]: p for p in puntos}
+    faltantes = [i for i in ids if i not in por_id]
+    if faltantes:
+        por_id.update(crear_puntos_faltantes(
+            supabase, tabla, columna, st.session_state.sesion_actual, faltantes
+        ))
+    return por_id
+
 # Título principal
 st.title("🎯 Sistema de Puntos")
 
+# Catálogos de cursos y sesiones de la caché compartida, indexados por id;
+# solo se consultan cuando cambia su versión
+cursos = catalogo_cursos(supabase)
+sesiones = None
+if 'curso_actual' in st.session_state:
+    sesiones = catalogo_sesiones(supabase, st.session_state['curso_actual'])
+
+# Las lecturas de puntos se hacen en paralelo
+datos = consultar_en_paralelo(**consultas_pagina())
+
+# La fila de la sesión actual se toma del catálogo de sesiones
+sesion = sesiones.get(st.session_state.get('sesion_actual')) if sesiones else None
+
+if sesion:
+    instantanea = obtener_instantanea(supabase, st.session_state['curso_actual'])
+    puntos_grupales_por_grupo = completar_puntos(
+        'puntos_grupales', 'grupo_id',
+        [g.id for g in instantanea.grupos],
+        datos['puntos_grupales']
+    )
+    puntos_individuales_por_estudiante = completar_puntos(
+        'puntos_individuales', 'estudiante_id',
+        [e.id for e in instantanea.estudiantes],
+        datos['puntos_individuales']
+    )
+    
+    # Totales por estudiante; solo se recalculan los integrantes de grupos que cambiaron
+    totales = obtener_totales(sesion['id'], instantanea)
+    for grupo_id, punto in puntos_grupales_por_grupo.items():
+        totales.fijar_grupo(grupo_id, st.session_state.puntos_grupales_pendientes.get(
+            punto['id'], punto['puntos']))
+    for estudiante_id, punto in puntos_individuales_por_estudiante.items():
+        totales.fijar_individual(estudiante_id, st.session_state.puntos_individuales_pendientes.get(
+            punto['id'], punto['puntos']))
+
 # Sección de Selección Rápida
 with st.container():
     # Selector de Curso
-    cursos = supabase.table('cursos').select('*').execute()
-    if cursos.data:
+    if cursos:
         col1, col2, col3 = st.columns([2,2,1])
         
         with col1:
-            curso_actual = st.selectbox(
-                "Seleccionar Curso",
-                options=[c['id'] for c in cursos.data],
-                format_func=lambda x: next(c['nombre'] for c in cursos.data if c['id'] == x),
-                index=next((i for i, c in enumerate(cursos.data) 
-                          if c['id'] == st.session_state.get('curso_actual', None)), 0)
+            curso_actual = seleccionar(
+                "Seleccionar Curso", cursos, st.session_state.get('curso_actual'), clave='curso'
             )
             
-            if curso_actual != st.session_state.get('curso_actual'):
+            if curso_actual is not None and curso_actual != st.session_state.get('curso_actual'):
                 st.session_state.curso_actual = curso_actual
-                st.session_state.curso_nombre = next(c['nombre'] for c in cursos.data if c['id'] == curso_actual)
+                st.session_state.curso_nombre = cursos.etiqueta(curso_actual)
                 if 'sesion_actual' in st.session_state:
                     del st.session_state.sesion_actual
                 st.rerun()
         
         with col2:
             if 'curso_actual' in st.session_state:
-                sesiones = supabase.table('sesiones')\
-                    .select('*')\
-                    .eq('curso_id', st.session_state['curso_actual'])\
-                    .order('fecha', desc=True)\
-                    .execute()
-                
-                if sesiones.data:
-                    sesion_actual = st.selectbox(
-                        "Seleccionar Sesión",
-                        options=[s['id'] for s in sesiones.data],
-                        format_func=lambda x: next(s['nombre'] + f" ({s['fecha']})" 
-                                                 for s in sesiones.data if s['id'] == x),
-                        index=next((i for i, s in enumerate(sesiones.data) 
-                                  if s['id'] == st.session_state.get('sesion_actual', None)), 0)
+                if sesiones:
+                    sesion_actual = seleccionar(
+                        "Seleccionar Sesión", sesiones, st.session_state.get('sesion_actual'), clave='sesion'
                     )
                     
-                    if sesion_actual != st.session_state.get('sesion_actual'):
+                    if sesion_actual is not None and sesion_actual != st.session_state.get('sesion_actual'):
                         st.session_state.sesion_actual = sesion_actual
-                        st.session_state.sesion_nombre = next(s['nombre'] for s in sesiones.data if s['id'] == sesion_actual)
+                        st.session_state.sesion_nombre = sesiones.get(sesion_actual)['nombre']
                         st.rerun()
                 else:
                     st.warning("No hay sesiones en este curso")
@@ -150,87 +172,23 @@ with st.container():
             if st.button("➕ Nueva Sesión", use_container_width=True):
                 st.switch_page("pages/4_gestionar_sesiones.py")
             
-            if 'sesion_actual' in st.session_state:
+            if sesion:
                 if st.button("📥 Descargar Sesión", use_container_width=True):
                     with st.spinner("Descargando datos..."):
-                        # Obtener todos los estudiantes del curso
-                        estudiantes = supabase.table('estudiantes_curso')\
-                            .select('*')\
-                            .eq('curso_id', st.session_state['curso_actual'])\
-                            .order('apellidos')\
-                            .execute()
-                        
-                        # Obtener puntos individuales
-                        puntos_ind = supabase.table('puntos_individuales')\
-                            .select('*')\
-                            .eq('sesion_id', st.session_state.sesion_actual)\
-                            .execute()
-                            
-                        # Obtener puntos grupales
-                        puntos_grupales = supabase.table('puntos_grupales')\
-                            .select('*, grupos!inner(nombre)')\
-                            .eq('sesion_id', st.session_state.sesion_actual)\
-                            .execute()
-                            
-                        # Crear diccionario de puntos grupales por grupo
-                        grupos_dict = {pg['grupo_id']: {'puntos': pg['puntos'], 'nombre': pg['grupos']['nombre']} 
-                                     for pg in puntos_grupales.data}
-                            
-                        # Obtener membresía de grupos
-                        estudiantes_grupos = supabase.table('estudiantes_grupo')\
-                            .select('*')\
-                            .execute()
-                            
-                        # Crear diccionario de grupos por estudiante
-                        grupos_por_estudiante = {}
-                        for eg in estudiantes_grupos.data:
-                            if eg['estudiante_id'] not in grupos_por_estudiante:
-                                grupos_por_estudiante[eg['estudiante_id']] = []
-                            if eg['grupo_id'] in grupos_dict:
-                                grupos_por_estudiante[eg['estudiante_id']].append(grupos_dict[eg['grupo_id']])
-                        
-                        # Crear diccionario de puntos individuales
-                        puntos_dict = {p['estudiante_id']: p['puntos'] for p in puntos_ind.data}
-                        
+                        import pandas as pd
+
                         # Preparar datos para Excel
-                        excel_data = []
-                        for est in estudiantes.data:
-                            puntos_individuales = puntos_dict.get(est['id'], 0)
-                            grupos_est = grupos_por_estudiante.get(est['id'], [])
-                            puntos_grupales = sum(g['puntos'] for g in grupos_est)
-                            grupos_nombres = ', '.join(g['nombre'] for g in grupos_est)
-                            
-                            excel_data.append({
-                                'Apellidos': est['apellidos'],
-                                'Nombres': est['nombres'],
-                                'Grupos': grupos_nombres,
-                                'Puntos Individuales': puntos_individuales,
-                                'Puntos Grupales': puntos_grupales,
-                                'Total': puntos_individuales + puntos_grupales
-                                
-                            })
-                        
-                        # Crear DataFrame y exportar a Excel
-                        df = pd.DataFrame(excel_data)
+                        df = pd.DataFrame(filas_sesion(
+                            instantanea.estudiantes, instantanea.grupos,
+                            instantanea.miembros, totales
+                        ))
                         fecha_actual = datetime.now().strftime("%Y%m%d_%H%M%S")
                         nombre_archivo = f"sesion_{st.session_state.sesion_nombre.replace(' ', '_')}_{fecha_actual}.xlsx"
                         
-                        # Configurar el writer de Excel
-                        buffer = pd.ExcelWriter(nombre_archivo, engine='xlsxwriter')
-                        df.to_excel(buffer, index=False, sheet_name='Puntos')
-                        
-                        # Ajustar ancho de columnas
-                        worksheet = buffer.sheets['Puntos']
-                        for idx, col in enumerate(df.columns):
-                            max_length = max(df[col].astype(str).apply(len).max(),
-                                          len(col)) + 2
-                            worksheet.set_column(idx, idx, max_length)
-                        
-                        buffer.close()
-                        
-                        # Leer el archivo y prepararlo para descarga
-                        with open(nombre_archivo, 'rb') as f:
-                            bytes_data = f.read()
+                        # Crear el Excel en memoria
+                        buffer = io.BytesIO()
+                        escribir_excel({'Puntos': df}, buffer)
+                        bytes_data = buffer.getvalue()
                         
                         st.download_button(
                             label="📥 Descargar Excel",
@@ -243,13 +201,7 @@ with st.container():
 if 'curso_actual' in st.session_state and 'sesion_actual' in st.session_state:
     st.divider()
     
-    # Obtener información de la sesión actual
-    sesion = supabase.table('sesiones')\
-        .select('*')\
-        .eq('id', st.session_state.sesion_actual)\
-        .execute()
-    
-    if sesion.data:
+    if sesion:
         # Mostrar información resumida
         col1, col2, col3 = st.columns([2,2,1])
         with col1:
@@ -257,106 +209,62 @@ if 'curso_actual' in st.session_state and 'sesion_actual' in st.session_state:
         with col2:
             st.info(f"📅 Sesión: {st.session_state.sesion_nombre}")
         with col3:
-            st.info(f"Máximo: {sesion.data[0]['puntaje_maximo']}")
+            st.info(f"Máximo: {sesion['puntaje_maximo']}")
+        
+        mostrar_operaciones_masivas(supabase, sesion, instantanea.grupos, instantanea.estudiantes, autor_actual())
         
-        # Tabs para diferentes vistas
-        tab1, tab2 = st.tabs(["👥 Vista por Grupos", "👤 Vista Individual"])
+        # Selector de vista: solo se dibuja la vista elegida
+        vista = seleccionar_vista()
 
         # Vista de Grupos
-        with tab1:
-            grupos = supabase.table('grupos')\
-                .select('*')\
-                .eq('curso_id', st.session_state['curso_actual'])\
-                .execute()
-
-            if grupos.data:
+        if vista == 'grupos':
+            if instantanea.grupos:
                 # Layout en grid de 3 columnas para los grupos
                 cols = st.columns(3)
-                for idx, grupo in enumerate(grupos.data):
+                for idx, grupo in enumerate(instantanea.grupos):
                     with cols[idx % 3]:
                         with st.container():
                             st.subheader(f"👥 {grupo['nombre']}", divider="blue")
                             
-                            # Obtener puntos grupales
-                            puntos_grupales = supabase.table('puntos_grupales')\
-                                .select('*')\
-                                .eq('sesion_id', st.session_state.sesion_actual)\
-                                .eq('grupo_id', grupo['id'])\
-                                .execute()
-
-                            if not puntos_grupales.data:
-                                puntos_grupales = supabase.table('puntos_grupales').insert({
-                                    'sesion_id': st.session_state.sesion_actual,
-                                    'grupo_id': grupo['id'],
-                                    'puntos': 0
-                                }).execute()
-
-                            punto_grupal = puntos_grupales.data[0]
+                            punto_grupal = puntos_grupales_por_grupo[grupo['id']]
+                            puntos_actuales = st.session_state.puntos_grupales_pendientes.get(
+                                punto_grupal['id'], punto_grupal['puntos']
+                            )
                             
                             # Input de puntos grupales
                             nuevo_puntaje = st.number_input(
                                 "Puntos grupales",
                                 min_value=0.0,
-                                max_value=float(sesion.data[0]['puntaje_maximo']),
-                                value=float(punto_grupal['puntos']),
+                                max_value=float(sesion['puntaje_maximo']),
+                                value=float(puntos_actuales),
                                 step=0.5,
                                 key=f"grupo_{grupo['id']}"
                             )
                             
-                            if nuevo_puntaje != punto_grupal['puntos']:
+                            if nuevo_puntaje != puntos_actuales:
                                 st.session_state.puntos_grupales_pendientes[punto_grupal['id']] = nuevo_puntaje
                                 st.session_state.ultimo_cambio = time.time()
+                                totales.fijar_grupo(grupo['id'], nuevo_puntaje)
                             
                             # Mostrar estudiantes del grupo
-                            estudiantes_grupo = supabase.table('estudiantes_grupo')\
-                                .select('estudiante_id, estudiantes_curso!inner(*)')\
-                                .eq('grupo_id', grupo['id'])\
-                                .execute()
-
-                            if estudiantes_grupo.data:
-                                for estudiante in estudiantes_grupo.data:
-                                    est = estudiante['estudiantes_curso']
-                                    st.write(f"- {est['apellidos']}, {est['nombres']}")
+                            for est in instantanea.integrantes_de(grupo['id']):
+                                st.write(f"- {est['apellidos']}, {est['nombres']}")
             else:
                 st.info("No hay grupos creados en este curso")
 
         # Vista Individual
-        with tab2:
+        else:
             busqueda = st.text_input("🔍 Buscar estudiante", "")
             
-            estudiantes = supabase.table('estudiantes_curso')\
-                .select('*')\
-                .eq('curso_id', st.session_state['curso_actual'])\
-                .order('apellidos')\
-                .execute()
-
-            if estudiantes.data:
-                estudiantes_filtrados = estudiantes.data
-                if busqueda:
-                    busqueda = busqueda.lower()
-                    estudiantes_filtrados = [
-                        est for est in estudiantes.data
-                        if busqueda in f"{est['nombres']} {est['apellidos']}".lower()
-                    ]
+            if instantanea.estudiantes:
+                indice = instantanea.indice()
+                estudiantes_filtrados = indice.buscar(busqueda, aproximada=True)
 
                 # Layout en grid de 3 columnas para estudiantes
                 cols = st.columns(3)
                 for idx, estudiante in enumerate(estudiantes_filtrados):
                     with cols[idx % 3]:
-                        puntos_ind = supabase.table('puntos_individuales')\
-                            .select('*')\
-                            .eq('sesion_id', st.session_state.sesion_actual)\
-                            .eq('estudiante_id', estudiante['id'])\
-                            .execute()
-
-                        if not puntos_ind.data:
-                            puntos_ind = supabase.table('puntos_individuales').insert({
-                                'sesion_id': st.session_state.sesion_actual,
-                                'estudiante_id': estudiante['id'],
-                                'puntos': 0
-                            }).execute()
-
-                        punto_individual = puntos_ind.data[0]
+                        punto_individual = puntos_individuales_por_estudiante[estudiante['id']]
                         puntos_actuales = st.session_state.puntos_individuales_pendientes.get(
                             punto_individual['id'], punto_individual['puntos']
                         )
@@ -369,7 +277,7 @@ if 'curso_actual' in st.session_state and 'sesion_actual' in st.session_state:
                         nuevo_puntaje = st.number_input(
                             f"**{nombre_estudiante}**",
                             min_value=0.0,
-                            max_value=float(sesion.data[0]['puntaje_maximo']),
+                            max_value=float(sesion['puntaje_maximo']),
                             value=float(puntos_actuales),
                             step=0.5,
                             key=f"ind_{estudiante['id']}"
@@ -378,12 +286,17 @@ if 'curso_actual' in st.session_state and 'sesion_actual' in st.session_state:
                         if nuevo_puntaje != puntos_actuales:
                             st.session_state.puntos_individuales_pendientes[punto_individual['id']] = nuevo_puntaje
                             st.session_state.ultimo_cambio = time.time()
+                            totales.fijar_individual(estudiante['id'], nuevo_puntaje)
+                        
+                        if totales.grupal_de(estudiante['id']):
+                            st.caption(f"Grupal: {totales.grupal_de(estudiante['id'])} · "
+                                       f"Total: {totales.total_de(estudiante['id'])}")
             else:
                 st.info("No hay estudiantes en este curso")
 
         # Barra de estado y guardado
         st.divider()
-        col1, col2 = st.columns([3,1])
+        col1, col2, col3 = st.columns([3,1,1])
 
         cambios_pendientes = len(st.session_state.puntos_individuales_pendientes) + \
                             len(st.session_state.puntos_grupales_pendientes)
@@ -399,8 +312,19 @@ if 'curso_actual' in st.session_state and 'sesion_actual' in st.session_state:
                 if st.button("💾 Guardar Ahora", key="guardar_manual", use_container_width=True):
                     guardar_puntos()
 
+        with col3:
+            mostrar_deshacer_rehacer(supabase, sesion['id'], deshabilitado=cambios_pendientes > 0)
+
         # Guardado automático
         if cambios_pendientes > 0 and (time.time() - st.session_state.ultimo_cambio) >= 5:
             guardar_puntos()
 else:
-    st.warning("👆 Selecciona un curso y una sesión para comenzar")
\ No newline at end of file
+    st.warning("👆 Selecciona un curso y una sesión para comenzar")
+
+# Diagnóstico de la conexión con Supabase
+with st.sidebar.expander("🔌 Estado de la conexión"):
+    st.json(estadisticas_conexion())
+
+# Aciertos y fallos de la caché compartida por todas las sesiones
+with st.sidebar.expander("🗄️ Caché compartida"):
+    st.json(estadisticas_cache())
\ No newline at end of file
@@ -0,0 +1,90 @@
+# api.py
+"""API JSON de solo lectura para integrar el Sistema de Puntos con un LMS
+
+Rutas:
+    GET /cursos/<id>/estudiantes
+    GET /cursos/<id>/sesiones/<id>/totales
+    GET /cursos/<id>/calificaciones
+    GET /salud
+
+Ejemplos:
+    python api.py --puerto 8502
+    python api.py --fake          # datos de demostración en memoria, sin Supabase
+
+Si se define API_TOKEN (o --token), cada petición debe enviar
+"Authorization: Bearer <token>".
+"""
+import argparse
+import hmac
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.servicio import FuenteMemoria, FuenteSupabase, Servicio, datos_demo
+
+
+def crear_manejador(servicio, token=None):
+    """Clase de manejador HTTP que atiende las peticiones con `servicio`"""
+
+    class Manejador(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            if token and not hmac.compare_digest(
+                self.headers.get('Authorization', ''), f"Bearer {token}"
+            ):
+                estado, encabezados, cuerpo = servicio.respuesta_json(401, {'error': "No autorizado"})
+            else:
+                try:
+                    estado, encabezados, cuerpo = servicio.responder(
+                        self.path, self.headers.get('If-None-Match')
+                    )
+                except Exception as e:
+                    estado, encabezados, cuerpo = servicio.respuesta_json(502, {'error': str(e)})
+
+            self.send_response(estado)
+            for nombre, valor in encabezados.items():
+                self.send_header(nombre, valor)
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, formato, *args):
+            if os.environ.get('API_LOG'):
+                super().log_message(formato, *args)
+
+    return Manejador
+
+
+def crear_servidor(servicio, host='127.0.0.1', puerto=8502, token=None):
+    return ThreadingHTTPServer((host, puerto), crear_manejador(servicio, token))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API JSON de solo lectura del Sistema de Puntos")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8502)
+    parser.add_argument('--token', default=os.environ.get('API_TOKEN'))
+    parser.add_argument('--ttl-version', type=float, default=None,
+                        help="Segundos que se reutiliza la versión de un curso antes de consultarla")
+    parser.add_argument('--fake', action='store_true', help="Usa datos de demostración en memoria")
+    args = parser.parse_args(argv)
+
+    if args.fake:
+        fuente = FuenteMemoria(datos_demo())
+    else:
+        from cli import cliente
+        fuente = FuenteSupabase(cliente())
+
+    opciones = {} if args.ttl_version is None else {'ttl_version': args.ttl_version}
+    servidor = crear_servidor(Servicio(fuente, **opciones), args.host, args.puerto, args.token)
+    print(f"API escuchando en http://{args.host}:{args.puerto}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == '__main__':
+    main()
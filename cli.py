@@ -0,0 +1,378 @@
+# cli.py
+"""Tareas por lotes sin servidor de Streamlit
+
+Ejemplos:
+    python cli.py export-course 12 --salida exportes/
+    python cli.py export-all --procesos 8
+    python cli.py import-roster 12 estudiantes.csv
+    python cli.py create-sessions --cursos 12 13 --desde 2026-03-02 --hasta 2026-07-03 --dias lun,mie
+    python cli.py recompute-stats
+    python cli.py archive 12
+    python cli.py clone-course 12 "Matemática 2027-I" --inicio-sesiones 2027-03-01
+    python cli.py purge --lote 5000
+    python cli.py restore sesion --curso 12
+    python cli.py restore sesion 345
+    python cli.py startup-times --guardar
+    python cli.py load-test --usuarios 50 --pasos 20 --latencia 0.05 --procesos 4
+
+Las credenciales se leen de SUPABASE_URL y SUPABASE_KEY (también desde un
+archivo .env) o, si no existen, de .streamlit/secrets.toml.
+"""
+import argparse
+import json
+import os
+import sys
+import tomllib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from utils.archivo import archivar_curso
+from utils.arranque import ARCHIVO_BASE, guardar_base, leer_base, medir_paginas, regresiones
+from utils.carga import PAGINAS, PROB_CAMBIO_ESTRUCTURA, prueba_de_carga
+from utils.clonacion import clonar_curso
+from utils.conexion import crear_cliente
+from utils.eliminacion import DIAS_RETENCION, eliminados_recientes, purgar, restaurar
+from utils.exportacion import exportar_curso
+from utils.importacion import importar_estudiantes, leer_archivo, limpiar_nombres
+from utils.sesiones import DIAS_SEMANA, crear_sesiones, fechas_recurrentes
+
+RAIZ = Path(__file__).resolve().parent
+
+# Cliente de Supabase de cada proceso; los clientes no se pueden compartir entre procesos
+_cliente = None
+
+
+def credenciales():
+    """URL y clave de Supabase desde el entorno o secrets.toml"""
+    load_dotenv(RAIZ / '.env')
+    url, key = os.environ.get('SUPABASE_URL'), os.environ.get('SUPABASE_KEY')
+    if url and key:
+        return url, key
+
+    secretos = RAIZ / '.streamlit' / 'secrets.toml'
+    if secretos.exists():
+        with open(secretos, 'rb') as f:
+            config = tomllib.load(f)
+        if config.get('supabase_url') and config.get('supabase_key'):
+            return config['supabase_url'], config['supabase_key']
+    sys.exit("Faltan las credenciales: define SUPABASE_URL y SUPABASE_KEY")
+
+
+def _iniciar_proceso(url, key):
+    global _cliente
+    _cliente = crear_cliente(url, key)
+
+
+def cliente():
+    """Cliente del proceso actual, creado la primera vez que se usa"""
+    if _cliente is None:
+        _iniciar_proceso(*credenciales())
+    return _cliente
+
+
+def nombre_archivo_curso(curso):
+    nombre = ''.join(c if c.isalnum() else '_' for c in curso['nombre']).strip('_')
+    return f"curso_{curso['id']}_{nombre}.xlsx"
+
+
+# Tareas por curso; se ejecutan en los procesos del pool
+
+def _exportar(curso, salida):
+    destino = Path(salida) / nombre_archivo_curso(curso)
+    sesiones = exportar_curso(cliente(), curso['id'], destino)
+    return f"{destino} ({sesiones} sesiones)"
+
+
+def _crear_sesiones(curso, fechas, puntaje_maximo, prefijo):
+    creadas = crear_sesiones(cliente(), curso['id'], fechas, puntaje_maximo, prefijo)
+    return f"{len(creadas)} sesiones creadas"
+
+
+def _recalcular(curso):
+    sesiones = cliente().rpc('recalcular_estadisticas_curso', {'p_curso_id': curso['id']}).execute()
+    return f"{sesiones.data or 0} sesiones actualizadas"
+
+
+def obtener_cursos(ids=None, archivados=False):
+    """Cursos indicados por id, o todos si no se indica ninguno
+
+    Los cursos archivados solo se incluyen con `archivados=True`.
+    """
+    consulta = cliente().table('cursos').select('id, nombre').is_('eliminado_en', 'null').order('id')
+    if not archivados:
+        consulta = consulta.is_('archivado_en', 'null')
+    if ids:
+        consulta = consulta.in_('id', ids)
+    cursos = consulta.execute().data
+    faltantes = set(ids or ()) - {c['id'] for c in cursos}
+    if faltantes:
+        sys.exit(f"No existen los cursos: {', '.join(map(str, sorted(faltantes)))}")
+    return cursos
+
+
+def por_curso(cursos, tarea, *args, procesos=None):
+    """Ejecuta una tarea por curso en paralelo con un pool de procesos
+
+    Devuelve la cantidad de cursos que fallaron.
+    """
+    fallidos = 0
+    with ProcessPoolExecutor(
+        max_workers=procesos,
+        initializer=_iniciar_proceso,
+        initargs=credenciales()
+    ) as pool:
+        futuros = {pool.submit(tarea, curso, *args): curso for curso in cursos}
+        for futuro in as_completed(futuros):
+            curso = futuros[futuro]
+            try:
+                print(f"✅ {curso['nombre']}: {futuro.result()}")
+            except Exception as e:
+                fallidos += 1
+                print(f"❌ {curso['nombre']}: {str(e)}", file=sys.stderr)
+    return fallidos
+
+
+def comando_export_course(args):
+    Path(args.salida).mkdir(parents=True, exist_ok=True)
+    curso = obtener_cursos([args.curso_id], archivados=True)[0]
+    print(_exportar(curso, args.salida))
+    return 0
+
+
+def comando_export_all(args):
+    Path(args.salida).mkdir(parents=True, exist_ok=True)
+    return por_curso(obtener_cursos(archivados=True), _exportar, args.salida, procesos=args.procesos)
+
+
+def comando_import_roster(args):
+    with open(args.archivo, 'rb') as archivo:
+        df = leer_archivo(archivo)
+    if 'apellidos' not in df.columns or 'nombres' not in df.columns:
+        sys.exit("El archivo debe contener las columnas 'apellidos' y 'nombres'")
+    curso = obtener_cursos([args.curso_id])[0]
+    agregados, repetidos = importar_estudiantes(cliente(), curso['id'], limpiar_nombres(df))
+    print(f"✅ {agregados} estudiantes agregados a {curso['nombre']}, {repetidos} ya existían")
+    return 0
+
+
+def comando_create_sessions(args):
+    dias = [DIAS_SEMANA.index(d) for d in args.dias]
+    fechas = fechas_recurrentes(args.desde, args.hasta, dias)
+    if not fechas:
+        sys.exit("No hay fechas en el rango indicado para esos días")
+    cursos = obtener_cursos(args.cursos)
+    return por_curso(cursos, _crear_sesiones, fechas, args.puntaje_maximo, args.prefijo,
+                     procesos=args.procesos)
+
+
+def comando_recompute_stats(args):
+    return por_curso(obtener_cursos(args.cursos), _recalcular, procesos=args.procesos)
+
+
+def comando_archive(args):
+    curso = obtener_cursos([args.curso_id])[0]
+    manifiesto = archivar_curso(cliente(), curso['id'], args.lote)
+    filas = sum(t['filas'] for t in manifiesto['tablas'].values())
+    print(f"✅ {curso['nombre']} archivado: {filas} filas")
+    return 0
+
+
+def comando_clone_course(args):
+    curso = obtener_cursos([args.curso_id])[0]
+    resumen = clonar_curso(cliente(), curso['id'], args.nombre, args.inicio_sesiones)
+    print(f"✅ {curso['nombre']} clonado como '{args.nombre}' (id {resumen['curso_id']}): "
+          f"{resumen['estudiantes']} estudiantes, {resumen['grupos']} grupos, "
+          f"{resumen['miembros']} integrantes, {resumen['sesiones']} sesiones")
+    return 0
+
+
+def comando_purge(args):
+    borradas = purgar(cliente(), args.lote, args.retencion_dias)
+    print(f"✅ {borradas} filas eliminadas definitivamente")
+    return 0
+
+
+# Tabla y columnas que se listan de cada tipo de fila restaurable
+RESTAURABLES = {
+    'curso': ('cursos', 'id, nombre, eliminado_en'),
+    'sesion': ('sesiones', 'id, curso_id, nombre, fecha, eliminado_en'),
+    'estudiante': ('estudiantes_curso', 'id, curso_id, apellidos, nombres, eliminado_en'),
+}
+
+
+def comando_restore(args):
+    tabla, columnas = RESTAURABLES[args.tipo]
+    if args.id is None:
+        eliminados = eliminados_recientes(cliente(), tabla, columnas,
+                                          None if args.tipo == 'curso' else args.curso)
+        if not eliminados:
+            print(f"No hay filas de {tabla} eliminadas en los últimos {DIAS_RETENCION} días")
+        for fila in eliminados:
+            print(json.dumps(fila, ensure_ascii=False))
+        return 0
+    if not restaurar(cliente(), tabla, args.id):
+        sys.exit(f"No existe la fila {args.id} en {tabla} (¿ya se purgó?)")
+    print(f"✅ {args.tipo} {args.id} restaurado")
+    return 0
+
+
+def comando_startup_times(args):
+    mediciones = medir_paginas(args.repeticiones)
+    for ruta, medicion in mediciones.items():
+        pesados = ', '.join(medicion['pesados']) or '-'
+        print(f"{medicion['segundos']:7.3f}s  {ruta}  (pesados: {pesados})")
+    if args.guardar:
+        guardar_base(mediciones)
+        print(f"✅ Línea base guardada en {ARCHIVO_BASE.name}")
+        return 0
+
+    base = leer_base()
+    if not base:
+        print(f"No hay línea base; usa --guardar para crear {ARCHIVO_BASE.name}")
+        return 0
+    encontradas = regresiones(mediciones, base, args.tolerancia)
+    for regresion in encontradas:
+        print(f"❌ {regresion}", file=sys.stderr)
+    return len(encontradas)
+
+
+def comando_load_test(args):
+    reporte = prueba_de_carga(
+        usuarios=args.usuarios, pasos=args.pasos, latencia=args.latencia, variacion=args.variacion,
+        estudiantes=args.estudiantes, tamano_grupo=args.tamano_grupo, cursos=args.cursos,
+        paginas=args.paginas, ediciones_por_guardado=args.ediciones_por_guardado,
+        prob_cambio_estructura=args.cambios_estructura, procesos=args.procesos, semilla=args.semilla
+    )
+    render, backend = reporte['render'], reporte['backend']
+    print(f"Render (ms): p50 {render['p50']}  p95 {render['p95']}  p99 {render['p99']}  "
+          f"máx {render['max']}  ({render['renders']} renders en {reporte['duracion']}s)")
+    for tipo, medida in reporte['render_por_tipo'].items():
+        print(f"  {tipo:<20} p50 {medida['p50']:>8}  p95 {medida['p95']:>8}  p99 {medida['p99']:>8}  "
+              f"({medida['renders']})")
+    print(f"Backend: {backend['peticiones']} peticiones ({backend['lecturas']} lecturas, "
+          f"{backend['escrituras']} escrituras), {backend['qps']} QPS, pico {backend['qps_pico']}/s, "
+          f"{backend['cambios_version']} cambios de versión")
+    for nombre, lotes in reporte['lotes_escritura'].items():
+        print(f"  {nombre:<30} {lotes['lotes']} lotes, {lotes['filas_promedio']} filas en promedio, "
+              f"máximo {lotes['filas_max']}")
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+        print(f"✅ Reporte guardado en {args.salida}")
+    for error in reporte['errores']:
+        print(f"❌ {error}", file=sys.stderr)
+    return len(reporte['errores'])
+
+
+def _fecha(texto):
+    try:
+        return datetime.strptime(texto, '%Y-%m-%d').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Fecha inválida '{texto}', usa AAAA-MM-DD")
+
+
+def _dias(texto):
+    dias = [d.strip().lower() for d in texto.split(',') if d.strip()]
+    invalidos = [d for d in dias if d not in DIAS_SEMANA]
+    if invalidos or not dias:
+        raise argparse.ArgumentTypeError(f"Días inválidos, usa: {','.join(DIAS_SEMANA)}")
+    return dias
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Tareas por lotes del Sistema de Puntos")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p = sub.add_parser('export-course', help="Exporta las sesiones de un curso a Excel")
+    p.add_argument('curso_id', type=int)
+    p.add_argument('--salida', default='.', help="Carpeta de destino")
+    p.set_defaults(funcion=comando_export_course)
+
+    p = sub.add_parser('export-all', help="Exporta todos los cursos, un Excel por curso")
+    p.add_argument('--salida', default='.', help="Carpeta de destino")
+    p.set_defaults(funcion=comando_export_all)
+
+    p = sub.add_parser('import-roster', help="Agrega estudiantes a un curso desde CSV o Excel")
+    p.add_argument('curso_id', type=int)
+    p.add_argument('archivo', help="Archivo con las columnas apellidos,nombres")
+    p.set_defaults(funcion=comando_import_roster)
+
+    p = sub.add_parser('create-sessions', help="Crea sesiones recurrentes en uno o varios cursos")
+    p.add_argument('--cursos', type=int, nargs='+', help="Ids de los cursos (por defecto todos)")
+    p.add_argument('--desde', type=_fecha, default=date.today())
+    p.add_argument('--hasta', type=_fecha, required=True)
+    p.add_argument('--dias', type=_dias, required=True, help="Por ejemplo lun,mie,vie")
+    p.add_argument('--puntaje-maximo', type=float, default=20.0)
+    p.add_argument('--prefijo', default="Sesión")
+    p.set_defaults(funcion=comando_create_sessions)
+
+    p = sub.add_parser('recompute-stats', help="Recalcula las estadísticas de las sesiones")
+    p.add_argument('--cursos', type=int, nargs='+', help="Ids de los cursos (por defecto todos)")
+    p.set_defaults(funcion=comando_recompute_stats)
+
+    p = sub.add_parser('archive', help="Archiva un curso terminado en Parquet y libera sus filas")
+    p.add_argument('curso_id', type=int)
+    p.add_argument('--lote', type=int, default=5000, help="Filas borradas como máximo por llamada")
+    p.set_defaults(funcion=comando_archive)
+
+    p = sub.add_parser('clone-course', help="Copia estudiantes, grupos y opcionalmente sesiones a un curso nuevo")
+    p.add_argument('curso_id', type=int)
+    p.add_argument('nombre', help="Nombre del curso nuevo")
+    p.add_argument('--inicio-sesiones', type=_fecha,
+                   help="Copia las sesiones corridas para que la primera caiga en esta fecha")
+    p.set_defaults(funcion=comando_clone_course)
+
+    p = sub.add_parser('purge', help="Borra en lotes los datos de cursos, sesiones y estudiantes eliminados")
+    p.add_argument('--lote', type=int, default=5000, help="Filas borradas como máximo por llamada")
+    p.add_argument('--retencion-dias', type=int, default=DIAS_RETENCION,
+                   help="Solo se purgan las filas eliminadas hace más de estos días")
+    p.set_defaults(funcion=comando_purge)
+
+    p = sub.add_parser('restore', help="Restaura un curso, sesión o estudiante eliminado que aún no se purgó")
+    p.add_argument('tipo', choices=sorted(RESTAURABLES))
+    p.add_argument('id', type=int, nargs='?', help="Fila a restaurar; sin id se listan las eliminadas")
+    p.add_argument('--curso', type=int, help="Al listar sesiones o estudiantes, solo los de este curso")
+    p.set_defaults(funcion=comando_restore)
+
+    p = sub.add_parser('startup-times', help="Mide el costo de importar cada página y lo compara con la línea base")
+    p.add_argument('--repeticiones', type=int, default=3, help="Procesos nuevos por página; se usa el mínimo")
+    p.add_argument('--tolerancia', type=float, default=0.2, help="Aumento relativo permitido antes de fallar")
+    p.add_argument('--guardar', action='store_true', help="Guarda las mediciones como nueva línea base")
+    p.set_defaults(funcion=comando_startup_times)
+
+    p = sub.add_parser('load-test', help="Simula muchas sesiones editando puntos contra un backend falso")
+    p.add_argument('--usuarios', type=int, default=50)
+    p.add_argument('--pasos', type=int, default=20, help="Acciones de cada usuario")
+    p.add_argument('--latencia', type=float, default=0.02, help="Segundos de cada petición al backend")
+    p.add_argument('--variacion', type=float, default=0.01, help="Segundos extra aleatorios por petición")
+    p.add_argument('--estudiantes', type=int, default=40, help="Estudiantes por curso")
+    p.add_argument('--tamano-grupo', type=int, default=5)
+    p.add_argument('--cursos', type=int, default=1, help="Cursos entre los que se reparten los usuarios")
+    p.add_argument('--paginas', nargs='+', choices=sorted(PAGINAS), default=['home', 'puntos'])
+    p.add_argument('--ediciones-por-guardado', type=int, default=4,
+                   help="Ediciones antes de dejar correr el guardado automático")
+    p.add_argument('--cambios-estructura', type=float, default=PROB_CAMBIO_ESTRUCTURA,
+                   help="Probabilidad de que un paso agregue un estudiante e invalide las cachés del curso")
+    p.add_argument('--procesos', type=int, default=1,
+                   help="Procesos, cada uno con sus propias cachés como un servidor aparte (por defecto 1)")
+    p.add_argument('--semilla', type=int, default=0)
+    p.add_argument('--salida', help="Archivo JSON donde guardar el reporte")
+    p.set_defaults(funcion=comando_load_test)
+
+    # Solo los comandos que reparten trabajo en un pool de procesos
+    for nombre in ('export-all', 'create-sessions', 'recompute-stats'):
+        sub.choices[nombre].add_argument('--procesos', type=int, default=None,
+                                         help="Procesos en paralelo (por defecto uno por CPU)")
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    return 1 if args.funcion(args) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,21 +1,20 @@
 # pages/1_gestionar_cursos.py
 import streamlit as st
-import pandas as pd
-from supabase import create_client
-from datetime import datetime
+import io
+import time
+from datetime import date, datetime, timedelta, timezone
+from utils.archivo import archivar_curso
+from utils.catalogo import catalogo_cursos
+from utils.clonacion import clonar_curso
+from utils.conexion import obtener_cliente
+from utils.eliminacion import DIAS_RETENCION, marcar_eliminado, restaurar
+from utils.exportacion import exportar_curso
 
 # Configuración de la página
 st.set_page_config(page_title="Gestión de Cursos", page_icon="📚")
 
-# Inicializar conexión con Supabase
-@st.cache_resource
-def init_connection():
-    return create_client(
-        st.secrets["supabase_url"],
-        st.secrets["supabase_key"]
-    )
-
-supabase = init_connection()
+# Conexión compartida con Supabase
+supabase = obtener_cliente()
 
 # Título de la página
 st.title("📚 Gestión de Cursos")
@@ -25,6 +24,8 @@ def cargar_cursos():
     try:
         response = supabase.table('cursos')\
             .select('*')\
+            .is_('eliminado_en', 'null')\
+            .is_('archivado_en', 'null')\
             .order('created_at', desc=True)\
             .execute()
         return response.data
@@ -58,6 +59,55 @@ with st.form("nuevo_curso", clear_on_submit=True):
                 else:
                     st.error(f"Error al crear el curso: {str(e)}")
 
+# Clonar un curso existente para un nuevo periodo
+def mostrar_clonar_curso():
+    cursos_activos = catalogo_cursos(supabase)
+    if not cursos_activos:
+        return
+    with st.expander("🧬 Clonar un curso para un nuevo periodo"):
+        with st.form("clonar_curso", clear_on_submit=True):
+            origen = st.selectbox(
+                "Curso de origen",
+                options=cursos_activos.ids,
+                format_func=cursos_activos.etiquetas.get,
+                index=cursos_activos.posicion.get(st.session_state.get('curso_actual'), 0)
+            )
+            nombre_nuevo = st.text_input("Nombre del nuevo curso")
+            copiar_sesiones = st.checkbox("Copiar también el calendario de sesiones")
+            inicio = st.date_input(
+                "Fecha de la primera sesión",
+                value=date.today(),
+                help="Las sesiones se corren para que la primera caiga en esta fecha"
+            )
+            st.caption("Se copian los estudiantes, los grupos y sus integrantes; los puntos no.")
+
+            if st.form_submit_button("Clonar Curso", use_container_width=True):
+                try:
+                    with st.spinner("Clonando curso..."):
+                        resumen = clonar_curso(
+                            supabase, origen, nombre_nuevo,
+                            inicio if copiar_sesiones else None
+                        )
+                    st.session_state.curso_actual = resumen['curso_id']
+                    st.session_state.curso_nombre = nombre_nuevo.strip()
+                    st.session_state.pop('sesion_actual', None)
+                    st.session_state.pop('sesion_nombre', None)
+                    st.success(
+                        f"✅ Curso '{nombre_nuevo.strip()}' creado con {resumen['estudiantes']} estudiantes, "
+                        f"{resumen['grupos']} grupos y {resumen['sesiones']} sesiones"
+                    )
+                    time.sleep(1)
+                    st.rerun()
+                except ValueError as e:
+                    st.error(str(e))
+                except Exception as e:
+                    if 'duplicate key' in str(e):
+                        st.error("Ya existe un curso con este nombre")
+                    else:
+                        st.error(f"Error al clonar el curso: {str(e)}")
+
+mostrar_clonar_curso()
+
 # Mostrar curso actualmente seleccionado
 if 'curso_actual' in st.session_state:
     st.info(f"✅ Curso actualmente seleccionado: {st.session_state.get('curso_nombre', 'Ninguno')}")
@@ -90,6 +140,7 @@ else:
                 estudiantes = supabase.table('estudiantes_curso')\
                     .select('id')\
                     .eq('curso_id', curso['id'])\
+                    .is_('eliminado_en', 'null')\
                     .execute()
                 
                 grupos = supabase.table('grupos')\
@@ -100,6 +151,7 @@ else:
                 sesiones = supabase.table('sesiones')\
                     .select('id')\
                     .eq('curso_id', curso['id'])\
+                    .is_('eliminado_en', 'null')\
                     .execute()
                 
                 col_stats1, col_stats2, col_stats3 = st.columns(3)
@@ -127,14 +179,93 @@ else:
                         st.error("No se puede eliminar el curso activo")
                     else:
                         try:
-                            supabase.table('cursos').delete().eq('id', curso['id']).execute()
+                            marcar_eliminado(supabase, 'cursos', curso['id'])
                             st.success(f"Curso eliminado exitosamente")
                             st.rerun()
                         except Exception as e:
                             st.error(f"Error al eliminar el curso: {str(e)}")
+                
+                if curso['id'] != st.session_state.get('curso_actual'):
+                    with st.popover("📦 Archivar"):
+                        st.write("Guarda el curso completo en un archivo comprimido y libera "
+                                 "sus filas de la base de datos. Podrás seguir exportándolo, "
+                                 "pero ya no editarlo.")
+                        if st.button("Confirmar", key=f"archive_{curso['id']}"):
+                            try:
+                                with st.spinner("Archivando curso..."):
+                                    manifiesto = archivar_curso(supabase, curso['id'])
+                                filas = sum(t['filas'] for t in manifiesto['tablas'].values())
+                                st.success(f"Curso archivado ({filas} filas)")
+                                st.rerun()
+                            except Exception as e:
+                                st.error(f"Error al archivar el curso: {str(e)}")
             
             st.markdown("---")
 
+# Cursos eliminados que todavía se pueden restaurar
+def mostrar_cursos_eliminados():
+    limite = datetime.now(timezone.utc) - timedelta(days=DIAS_RETENCION)
+    eliminados = supabase.table('cursos')\
+        .select('id, nombre, eliminado_en')\
+        .gte('eliminado_en', limite.isoformat())\
+        .order('eliminado_en', desc=True)\
+        .execute()
+    if not eliminados.data:
+        return
+    
+    with st.expander(f"🗑️ Cursos eliminados ({len(eliminados.data)})"):
+        st.caption(f"Los cursos eliminados se borran definitivamente después de {DIAS_RETENCION} días")
+        for curso in eliminados.data:
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                fecha = datetime.fromisoformat(curso['eliminado_en']).strftime('%Y-%m-%d %H:%M')
+                st.write(f"**{curso['nombre']}** (eliminado: {fecha})")
+            with col2:
+                if st.button("♻️ Restaurar", key=f"restore_{curso['id']}"):
+                    try:
+                        restaurar(supabase, 'cursos', curso['id'])
+                        st.success(f"Curso '{curso['nombre']}' restaurado")
+                        st.rerun()
+                    except Exception as e:
+                        if 'duplicate key' in str(e):
+                            st.error("Ya existe otro curso con este nombre")
+                        else:
+                            st.error(f"Error al restaurar el curso: {str(e)}")
+
+mostrar_cursos_eliminados()
+
+# Cursos archivados; sus datos se leen del archivo solo al exportarlos
+def mostrar_cursos_archivados():
+    archivados = supabase.table('cursos')\
+        .select('id, nombre, archivado_en')\
+        .is_('eliminado_en', 'null')\
+        .not_.is_('archivado_en', 'null')\
+        .order('archivado_en', desc=True)\
+        .execute()
+    if not archivados.data:
+        return
+    
+    with st.expander(f"📦 Cursos archivados ({len(archivados.data)})"):
+        for curso in archivados.data:
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                fecha = datetime.fromisoformat(curso['archivado_en']).strftime('%Y-%m-%d')
+                st.write(f"**{curso['nombre']}** (archivado: {fecha})")
+            with col2:
+                if st.button("📥 Exportar", key=f"export_archived_{curso['id']}"):
+                    buffer = io.BytesIO()
+                    with st.spinner("Leyendo archivo..."):
+                        exportar_curso(supabase, curso['id'], buffer)
+                    st.download_button(
+                        label="📥 Descargar Excel",
+                        data=buffer.getvalue(),
+                        file_name=f"curso_{curso['nombre'].replace(' ', '_')}.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        key=f"download_archived_{curso['id']}"
+                    )
+
+mostrar_cursos_archivados()
+
 # Información adicional
 with st.expander("ℹ️ Ayuda"):
     st.markdown("""
@@ -142,6 +273,8 @@ with st.expander("ℹ️ Ayuda"):
     1. **Crear Curso**: Ingresa el nombre y haz clic en 'Crear Curso'
     2. **Seleccionar Curso**: Usa el botón 'Seleccionar' para activar un curso
     3. **Eliminar Curso**: Solo puedes eliminar cursos que no estén activos
+    4. **Restaurar Curso**: Un curso eliminado se puede restaurar durante unos días
+    5. **Archivar Curso**: Guarda un curso terminado en un archivo y lo quita de la lista
     
     ### Notas:
     - El curso seleccionado se mantiene activo en todas las páginas
@@ -1,22 +1,19 @@
 # pages/2_gestionar_estudiantes.py
 import streamlit as st
-import pandas as pd
-from supabase import create_client
 import streamlit.components.v1 as components
 import io
+from datetime import datetime
+from utils.busqueda import obtener_indice
+from utils.catalogo import catalogo_cursos
+from utils.importacion import leer_archivo, limpiar_nombres
+from utils.conexion import obtener_cliente
+from utils.eliminacion import DIAS_RETENCION, eliminados_recientes, marcar_eliminado, restaurar
 
 # Configuración de la página
 st.set_page_config(page_title="Gestión de Estudiantes", page_icon="👥")
 
-# Inicializar conexión con Supabase
-@st.cache_resource
-def init_connection():
-    return create_client(
-        st.secrets["supabase_url"],
-        st.secrets["supabase_key"]
-    )
-
-supabase = init_connection()
+# Conexión compartida con Supabase
+supabase = obtener_cliente()
 
 # Función para mostrar el encabezado con información del curso
 def mostrar_encabezado():
@@ -26,20 +23,16 @@ def mostrar_encabezado():
         st.page_link("pages/1_📚_Mis_Cursos.py", label="Ir a Gestión de Cursos")
         st.stop()
     else:
-        # Obtener información actualizada del curso
-        curso = supabase.table('cursos')\
-            .select('*')\
-            .eq('id', st.session_state.curso_actual)\
-            .single()\
-            .execute()
+        # Información del curso desde el catálogo compartido
+        curso = catalogo_cursos(supabase).get(st.session_state.curso_actual)
         
-        if not curso.data:
+        if not curso:
             st.error("El curso seleccionado ya no existe")
             del st.session_state.curso_actual
-            del st.session_state.curso_nombre
+            st.session_state.pop('curso_nombre', None)
             st.rerun()
         
-        st.info(f"📚 Curso actual: {curso.data['nombre']}")
+        st.info(f"📚 Curso actual: {curso['nombre']}")
 
 # Función para crear y descargar plantilla
 def mostrar_boton_plantilla():
@@ -49,8 +42,10 @@ def mostrar_boton_plantilla():
     
     col1, col2 = st.columns(2)
     
-    # Crear plantilla Excel
+    # Las plantillas se generan recién al descargarlas, así pandas no se carga con la página
     def crear_plantilla_excel():
+        import pandas as pd
+
         df = pd.DataFrame({
             'apellidos': ['Pérez García', 'Martínez López'],
             'nombres': ['Juan', 'María']
@@ -58,10 +53,11 @@ def mostrar_boton_plantilla():
         buffer = io.BytesIO()
         with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
             df.to_excel(writer, index=False, sheet_name='Estudiantes')
-        return buffer
+        return buffer.getvalue()
     
-    # Crear plantilla CSV
     def crear_plantilla_csv():
+        import pandas as pd
+
         df = pd.DataFrame({
             'apellidos': ['Pérez García', 'Martínez López'],
             'nombres': ['Juan', 'María']
@@ -70,47 +66,31 @@ def mostrar_boton_plantilla():
     
     # Botones de descarga
     with col1:
-        excel_buffer = crear_plantilla_excel()
         st.download_button(
             label="📥 Descargar plantilla Excel",
-            data=excel_buffer.getvalue(),
+            data=crear_plantilla_excel,
             file_name="plantilla_estudiantes.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
     
     with col2:
-        csv_data = crear_plantilla_csv()
         st.download_button(
             label="📥 Descargar plantilla CSV",
-            data=csv_data,
+            data=crear_plantilla_csv,
             file_name="plantilla_estudiantes.csv",
             mime="text/csv"
         )
 
 def procesar_archivo(file):
     try:
-        if file.name.endswith('.csv'):
-            df = pd.read_csv(file)
-        else:  # Excel file
-            df = pd.read_excel(file)
+        df = leer_archivo(file)
         
         if 'apellidos' not in df.columns or 'nombres' not in df.columns:
             st.error("El archivo debe contener las columnas 'apellidos' y 'nombres'")
             return None
             
-        # Filtrar las filas de ejemplo si existen
-        ejemplos = [
-            ('Pérez García', 'Juan'),
-            ('Martínez López', 'María')
-        ]
-        
-        df = df[~df.apply(lambda row: (row['apellidos'].strip(), row['nombres'].strip()) in ejemplos, axis=1)]
-        
-        # Limpiar espacios en blanco
-        df['apellidos'] = df['apellidos'].str.strip()
-        df['nombres'] = df['nombres'].str.strip()
-        
-        return df
+        # Limpiar espacios en blanco y filtrar las filas de ejemplo si existen
+        return limpiar_nombres(df)
     except Exception as e:
         st.error(f"Error al procesar el archivo: {str(e)}")
         return None
@@ -186,6 +166,33 @@ def agregar_estudiante_manual():
                     else:
                         st.error(f"Error al agregar estudiante: {str(e)}")
 
+# Estudiantes eliminados del curso que todavía se pueden restaurar
+def mostrar_estudiantes_eliminados():
+    eliminados = eliminados_recientes(supabase, 'estudiantes_curso', 'id, apellidos, nombres, eliminado_en',
+                                      st.session_state['curso_actual'])
+    if not eliminados:
+        return
+    
+    with st.expander(f"🗑️ Estudiantes eliminados ({len(eliminados)})"):
+        st.caption(f"Los estudiantes eliminados se borran definitivamente, con sus puntos, "
+                   f"después de {DIAS_RETENCION} días")
+        for estudiante in eliminados:
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                fecha = datetime.fromisoformat(estudiante['eliminado_en']).strftime('%Y-%m-%d %H:%M')
+                st.write(f"**{estudiante['apellidos']}**, {estudiante['nombres']} (eliminado: {fecha})")
+            with col2:
+                if st.button("♻️ Restaurar", key=f"restore_{estudiante['id']}"):
+                    try:
+                        restaurar(supabase, 'estudiantes_curso', estudiante['id'])
+                        st.success("Estudiante restaurado con sus puntos")
+                        st.rerun()
+                    except Exception as e:
+                        if 'duplicate key' in str(e):
+                            st.error("Ya hay otro estudiante con este nombre en el curso")
+                        else:
+                            st.error(f"Error al restaurar el estudiante: {str(e)}")
+
 # Título de la página y encabezado
 st.title("👥 Gestión de Estudiantes")
 mostrar_encabezado()
@@ -208,6 +215,7 @@ try:
     estudiantes = supabase.table('estudiantes_curso')\
         .select('*')\
         .eq('curso_id', st.session_state['curso_actual'])\
+        .is_('eliminado_en', 'null')\
         .order('apellidos')\
         .execute()
 
@@ -218,14 +226,8 @@ try:
             busqueda = st.text_input("🔍 Buscar estudiante", 
                                    placeholder="Ingresa apellido o nombre")
             
-            estudiantes_mostrar = estudiantes.data
-            if busqueda:
-                busqueda = busqueda.lower()
-                estudiantes_mostrar = [
-                    e for e in estudiantes.data
-                    if busqueda in e['apellidos'].lower() or 
-                       busqueda in e['nombres'].lower()
-                ]
+            indice = obtener_indice(st.session_state['curso_actual'], estudiantes.data)
+            estudiantes_mostrar = indice.buscar(busqueda, aproximada=True)
             
             if not estudiantes_mostrar:
                 st.info("No se encontraron estudiantes")
@@ -241,10 +243,7 @@ try:
                     if st.button("🗑️", key=f"del_{estudiante['id']}", 
                                help="Eliminar estudiante"):
                         try:
-                            supabase.table('estudiantes_curso')\
-                                .delete()\
-                                .eq('id', estudiante['id'])\
-                                .execute()
+                            marcar_eliminado(supabase, 'estudiantes_curso', estudiante['id'])
                             st.success("Estudiante eliminado del curso")
                             st.rerun()
                         except Exception as e:
@@ -256,6 +255,8 @@ try:
 except Exception as e:
     st.error(f"Error al cargar la lista de estudiantes: {str(e)}")
 
+mostrar_estudiantes_eliminados()
+
 # Información adicional
 with st.expander("ℹ️ Información"):
     st.markdown("""
@@ -278,8 +279,10 @@ with st.expander("ℹ️ Información"):
     
     ### Notas importantes:
     - Los nombres y apellidos se limpian automáticamente de espacios extra
+    - La búsqueda ignora tildes y mayúsculas (ej. "perez" encuentra "Pérez")
     - No se permiten estudiantes duplicados en el mismo curso
-    - Al eliminar un estudiante, se eliminan sus registros de puntos
+    - Al eliminar un estudiante, sus registros de puntos se borran después de unos días;
+      mientras tanto puedes restaurarlo desde "Estudiantes eliminados"
     """)
 
 # Resumen al final de la página
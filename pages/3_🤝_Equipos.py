@@ -1,20 +1,15 @@
 # pages/3_gestionar_grupos.py
 import streamlit as st
-import pandas as pd
-from supabase import create_client
+from utils.archivo import leer_todo
+from utils.catalogo import catalogo_cursos
+from utils.conexion import obtener_cliente
+from utils.equipos import MODOS, generar_grupos, leer_parejas, parejas_repetidas
 
 # Configuración de la página
 st.set_page_config(page_title="Gestión de Grupos", page_icon="👥")
 
-# Inicializar conexión con Supabase
-@st.cache_resource
-def init_connection():
-    return create_client(
-        st.secrets["supabase_url"],
-        st.secrets["supabase_key"]
-    )
-
-supabase = init_connection()
+# Conexión compartida con Supabase
+supabase = obtener_cliente()
 
 # Función para mostrar el encabezado con información del curso
 def mostrar_encabezado():
@@ -24,20 +19,16 @@ def mostrar_encabezado():
         st.page_link("pages/1_📚_Mis_Cursos.py", label="Ir a Gestión de Cursos")
         st.stop()
     else:
-        # Obtener información actualizada del curso
-        curso = supabase.table('cursos')\
-            .select('*')\
-            .eq('id', st.session_state.curso_actual)\
-            .single()\
-            .execute()
+        # Información del curso desde el catálogo compartido
+        curso = catalogo_cursos(supabase).get(st.session_state.curso_actual)
         
-        if not curso.data:
+        if not curso:
             st.error("El curso seleccionado ya no existe")
             del st.session_state.curso_actual
-            del st.session_state.curso_nombre
+            st.session_state.pop('curso_nombre', None)
             st.rerun()
         
-        st.info(f"📚 Curso actual: {curso.data['nombre']}")
+        st.info(f"📚 Curso actual: {curso['nombre']}")
 
 # Título de la página y encabezado
 st.title("👥 Gestión de Grupos")
@@ -65,29 +56,102 @@ def obtener_siguiente_numero_grupo():
 
 def obtener_estudiantes_sin_grupo():
     try:
+        curso_id = st.session_state['curso_actual']
         # Obtener estudiantes del curso actual que no están en ningún grupo
-        estudiantes_curso = supabase.table('estudiantes_curso')\
-            .select("*")\
-            .eq('curso_id', st.session_state['curso_actual'])\
-            .execute()
+        estudiantes_curso = leer_todo(lambda: supabase.table('estudiantes_curso')
+                                      .select("*")
+                                      .eq('curso_id', curso_id)
+                                      .is_('eliminado_en', 'null'))
         
-        if not estudiantes_curso.data:
+        if not estudiantes_curso:
             return []
         
-        # Obtener IDs de estudiantes que ya están en grupos
-        estudiantes_en_grupos = supabase.table('estudiantes_grupo')\
-            .select('estudiante_id')\
-            .execute()
+        # Obtener IDs de estudiantes que ya están en grupos de este curso
+        estudiantes_en_grupos = leer_todo(lambda: supabase.table('estudiantes_grupo')
+                                          .select('estudiante_id, grupos!inner(curso_id)')
+                                          .eq('grupos.curso_id', curso_id))
         
-        ids_en_grupos = [e['estudiante_id'] for e in estudiantes_en_grupos.data] if estudiantes_en_grupos.data else []
+        ids_en_grupos = {e['estudiante_id'] for e in estudiantes_en_grupos}
         
         # Filtrar estudiantes que no están en grupos
-        return [e for e in estudiantes_curso.data if e['id'] not in ids_en_grupos]
+        return [e for e in estudiantes_curso if e['id'] not in ids_en_grupos]
     
     except Exception as e:
         st.error(f"Error al obtener estudiantes: {str(e)}")
         return []
 
+def generar_grupos_automaticamente():
+    with st.expander("⚡ Generar grupos automáticamente"):
+        estudiantes = obtener_estudiantes_sin_grupo()
+        if not estudiantes:
+            st.info("No hay estudiantes sin grupo")
+            return
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            tamano = st.number_input("Integrantes por grupo", min_value=2, max_value=20,
+                                     value=4, step=1, key="gen_tamano")
+        with col2:
+            modo = st.selectbox("Modo", options=list(MODOS), format_func=MODOS.get, key="gen_modo")
+        with col3:
+            semilla = st.number_input("Semilla", min_value=0, value=0, step=1, key="gen_semilla",
+                                      help="La misma semilla genera siempre los mismos grupos")
+        
+        if st.button("🎲 Generar vista previa", key="gen_preview"):
+            puntos, parejas = {}, {}
+            if modo == 'balanceado':
+                acumulados = supabase.rpc('puntos_acumulados_curso', {
+                    'p_curso_id': st.session_state['curso_actual']
+                }).execute()
+                puntos = {p['estudiante_id']: p['puntos'] for p in acumulados.data}
+            elif modo == 'sin_repetir':
+                parejas = leer_parejas(supabase, st.session_state['curso_actual'])
+            
+            grupos_ids = generar_grupos([e['id'] for e in estudiantes], tamano, modo,
+                                        semilla, puntos, parejas)
+            siguiente_numero = obtener_siguiente_numero_grupo()
+            st.session_state.grupos_generados = [
+                {'nombre': f"Grupo {siguiente_numero + i}", 'estudiantes': ids}
+                for i, ids in enumerate(grupos_ids)
+            ]
+            # Parejas del reparto que ya trabajaron juntas, para mostrarlas con la vista previa
+            st.session_state.parejas_repetidas = parejas_repetidas(grupos_ids, parejas) if parejas else None
+        
+        grupos_generados = st.session_state.get('grupos_generados')
+        if grupos_generados:
+            nombres = {e['id']: f"{e['apellidos']}, {e['nombres']}" for e in estudiantes}
+            # Descartar la vista previa si los estudiantes sin grupo cambiaron
+            if any(i not in nombres for g in grupos_generados for i in g['estudiantes']):
+                del st.session_state.grupos_generados
+                st.rerun()
+            
+            st.dataframe(
+                [{'Grupo': g['nombre'],
+                  'Integrantes': '; '.join(nombres[i] for i in g['estudiantes'])}
+                 for g in grupos_generados],
+                hide_index=True, use_container_width=True
+            )
+            repetidas = st.session_state.get('parejas_repetidas')
+            if repetidas is not None:
+                if repetidas:
+                    st.caption(f"⚠️ {repetidas} parejas de este reparto ya trabajaron juntas")
+                else:
+                    st.caption("✅ Ninguna pareja repite compañeros anteriores")
+            if st.button(f"✅ Crear {len(grupos_generados)} grupos", key="gen_crear"):
+                try:
+                    supabase.rpc('crear_grupos_masivo', {
+                        'p_curso_id': st.session_state['curso_actual'],
+                        'p_grupos': grupos_generados
+                    }).execute()
+                    del st.session_state.grupos_generados
+                    st.success("✅ Grupos creados exitosamente")
+                    st.rerun()
+                except Exception as e:
+                    if 'unique_grupo_curso' in str(e):
+                        st.error("Ya existe un grupo con alguno de estos nombres en el curso")
+                    else:
+                        st.error(f"Error al crear los grupos: {str(e)}")
+
 # Crear nuevo grupo
 with st.form("nuevo_grupo", clear_on_submit=True):
     st.subheader("Crear Nuevo Grupo")
@@ -108,6 +172,7 @@ with st.form("nuevo_grupo", clear_on_submit=True):
         estudiantes = supabase.table('estudiantes_curso')\
             .select('*')\
             .eq('curso_id', st.session_state['curso_actual'])\
+            .is_('eliminado_en', 'null')\
             .order('apellidos')\
             .execute().data
     else:
@@ -165,6 +230,8 @@ with st.form("nuevo_grupo", clear_on_submit=True):
                 else:
                     st.error(f"Error al crear el grupo: {str(e)}")
 
+generar_grupos_automaticamente()
+
 # Ver grupos existentes
 st.markdown("---")
 st.subheader("📋 Grupos Existentes")
@@ -192,6 +259,7 @@ try:
                 miembros = supabase.table('estudiantes_grupo')\
                     .select('*, estudiantes_curso!inner(*)')\
                     .eq('grupo_id', grupo['id'])\
+                    .is_('estudiantes_curso.eliminado_en', 'null')\
                     .execute()
                 
                 if miembros.data:
@@ -235,6 +303,7 @@ col1, col2, col3 = st.columns(3)
 estudiantes_total = supabase.table('estudiantes_curso')\
     .select('id')\
     .eq('curso_id', st.session_state['curso_actual'])\
+    .is_('eliminado_en', 'null')\
     .execute()
 
 estudiantes_en_grupos = supabase.table('estudiantes_grupo')\
@@ -255,9 +324,12 @@ with st.expander("ℹ️ Ayuda"):
     ### Tipos de Grupos:
     1. **Grupos Normales**: Los estudiantes solo pueden estar en un grupo
     2. **Grupos Especiales**: Permiten estudiantes que ya están en otros grupos
+    3. **Generación automática**: Reparte a los estudiantes sin grupo en grupos del tamaño indicado,
+       al azar, balanceando los puntos acumulados o evitando repetir compañeros
     
     ### Notas importantes:
     - Los nombres de grupo se autogeneran si no se especifican
     - Puedes quitar estudiantes individualmente o eliminar grupos completos
     - Al eliminar un grupo, los estudiantes quedan disponibles para otros grupos
+    - Quiénes ya trabajaron juntos se recuerda aunque elimines sus grupos
     """)
\ No newline at end of file
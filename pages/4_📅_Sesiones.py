@@ -1,21 +1,33 @@
 import streamlit as st
-import pandas as pd
-from supabase import create_client
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import time
+from utils.cache import compartido, versiones
+from utils.catalogo import catalogo_cursos, catalogo_sesiones
+from utils.conexion import obtener_cliente
+from utils.eliminacion import DIAS_RETENCION, eliminados_recientes, marcar_eliminado, restaurar
+from utils.historial import autor_actual
+from utils.instantanea import obtener_instantanea
+from utils.sesiones import DIAS_SEMANA, crear_sesiones, fechas_recurrentes, siguiente_numero_sesion
 
 # Configuración de la página
 st.set_page_config(page_title="Gestión de Sesiones", page_icon="📅")
 
-# Inicializar conexión con Supabase
-@st.cache_resource
-def init_connection():
-    return create_client(
-        st.secrets["supabase_url"],
-        st.secrets["supabase_key"]
-    )
+# Conexión compartida con Supabase
+supabase = obtener_cliente()
 
-supabase = init_connection()
+# Sesiones por página en la tabla resumida
+SESIONES_POR_PAGINA = 20
+# Columna y dirección de cada orden de la lista
+ORDENES_SESIONES = {
+    "Fecha ▼": ('fecha', True),
+    "Fecha ▲": ('fecha', False),
+    "Nombre": ('nombre', False),
+    "Puntaje máximo": ('puntaje_maximo', False),
+}
+# Máximo de sesiones que se pueden programar de una vez
+MAX_SESIONES_PROGRAMADAS = 200
+# Nombre visible de cada día de DIAS_SEMANA
+NOMBRES_DIAS = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
 
 # Función para mostrar el encabezado con información del curso
 def mostrar_encabezado():
@@ -25,46 +37,39 @@ def mostrar_encabezado():
         st.page_link("pages/1_📚_Mis_Cursos.py", label="Ir a Gestión de Cursos")
         st.stop()
     else:
-        # Obtener información actualizada del curso
-        curso = supabase.table('cursos')\
-            .select('*')\
-            .eq('id', st.session_state.curso_actual)\
-            .single()\
-            .execute()
+        # Información del curso desde el catálogo compartido
+        curso = catalogo_cursos(supabase).get(st.session_state.curso_actual)
         
-        if not curso.data:
+        if not curso:
             st.error("El curso seleccionado ya no existe")
             del st.session_state.curso_actual
-            del st.session_state.curso_nombre
+            st.session_state.pop('curso_nombre', None)
             st.rerun()
         
-        st.info(f"📚 Curso actual: {curso.data['nombre']}")
+        st.info(f"📚 Curso actual: {curso['nombre']}")
 
-def actualizar_puntaje_maximo(sesion_id, nuevo_puntaje):
+def actualizar_puntaje_maximo(sesion_id, nuevo_puntaje, reescalar=False):
     try:
         # Validar el nuevo puntaje
         if not isinstance(nuevo_puntaje, (int, float)) or nuevo_puntaje <= 0:
             raise ValueError("El puntaje debe ser un número positivo")
+        
+        # Reescalar todos los puntos de la sesión en una sola operación
+        if reescalar:
+            supabase.rpc('reescalar_puntaje_sesion', {
+                'p_sesion_id': sesion_id,
+                'p_nuevo_maximo': nuevo_puntaje,
+                'p_autor': autor_actual()
+            }).execute()
+            return True, "Puntaje máximo actualizado y puntos reescalados exitosamente"
             
-        # Verificar si hay puntos asignados que excedan el nuevo máximo
-        puntos_individuales = supabase.table('puntos_individuales')\
-            .select('puntos')\
-            .eq('sesion_id', sesion_id)\
-            .execute()
-            
-        puntos_grupales = supabase.table('puntos_grupales')\
-            .select('puntos')\
-            .eq('sesion_id', sesion_id)\
-            .execute()
-            
-        # Verificar puntos individuales
-        for registro in puntos_individuales.data:
-            if registro['puntos'] > nuevo_puntaje:
+        # Verificar en el servidor si hay puntos que excedan el nuevo máximo
+        maximos = supabase.rpc('maximo_puntos_sesion', {'p_sesion_id': sesion_id}).execute()
+        
+        if maximos.data:
+            if maximos.data[0]['maximo_individual'] > nuevo_puntaje:
                 return False, "Hay estudiantes con puntos individuales que exceden el nuevo máximo"
-                
-        # Verificar puntos grupales
-        for registro in puntos_grupales.data:
-            if registro['puntos'] > nuevo_puntaje:
+            if maximos.data[0]['maximo_grupal'] > nuevo_puntaje:
                 return False, "Hay grupos con puntos que exceden el nuevo máximo"
         
         # Actualizar el puntaje máximo
@@ -78,25 +83,208 @@ def actualizar_puntaje_maximo(sesion_id, nuevo_puntaje):
     except Exception as e:
         return False, f"Error al actualizar el puntaje: {str(e)}"
 
-def obtener_siguiente_numero_sesion():
-    sesiones = supabase.table('sesiones')\
-        .select('nombre')\
+def obtener_siguiente_numero_sesion(prefijo="Sesión"):
+    """Siguiente número para el prefijo, calculado una vez por versión de las sesiones del curso"""
+    curso_id = st.session_state['curso_actual']
+    version = versiones(supabase, curso_id)['estructura']
+
+    def calcular():
+        sesiones = catalogo_sesiones(supabase, curso_id)
+        return siguiente_numero_sesion((sesiones.get(i)['nombre'] for i in sesiones.ids), prefijo)
+
+    return compartido(('siguiente_sesion', curso_id, version, prefijo), calcular)
+
+def mostrar_programar_sesiones():
+    """Crea el calendario de sesiones de un periodo con un solo insert"""
+    with st.expander("🗓️ Programar sesiones recurrentes"):
+        col1, col2 = st.columns(2)
+        with col1:
+            desde = st.date_input("Desde", value=date.today(), key="programar_desde")
+        with col2:
+            hasta = st.date_input("Hasta", value=date.today() + timedelta(weeks=16), key="programar_hasta")
+
+        dias = st.multiselect("Días de clase", range(len(DIAS_SEMANA)),
+                              format_func=lambda d: NOMBRES_DIAS[d], key="programar_dias")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            puntaje_maximo = st.number_input("Puntaje Máximo", min_value=1.0, max_value=100.0,
+                                             value=20.0, step=0.5, key="programar_maximo")
+        with col2:
+            prefijo = st.text_input("Prefijo del nombre", value="Sesión", key="programar_prefijo")
+
+        if hasta < desde:
+            st.warning("La fecha final debe ser posterior a la inicial")
+            return
+        fechas = fechas_recurrentes(desde, hasta, dias)
+        if not fechas:
+            st.caption("Elige los días de clase para ver las sesiones a crear")
+            return
+        if len(fechas) > MAX_SESIONES_PROGRAMADAS:
+            st.warning(f"Son {len(fechas)} sesiones; el máximo por programación es {MAX_SESIONES_PROGRAMADAS}")
+            return
+
+        prefijo = prefijo.strip() or "Sesión"
+        inicio = obtener_siguiente_numero_sesion(prefijo)
+        vista = [
+            {'Nombre': f"{prefijo} {inicio + i}", 'Fecha': fecha.strftime('%d/%m/%Y'), 'Día': NOMBRES_DIAS[fecha.weekday()]}
+            for i, fecha in enumerate(fechas)
+        ]
+        st.caption(f"Se crearán {len(fechas)} sesiones")
+        st.dataframe(vista, hide_index=True, use_container_width=True, height=min(35 * len(vista) + 38, 250))
+
+        if st.button(f"🗓️ Crear {len(fechas)} sesiones", use_container_width=True, key="programar_crear"):
+            try:
+                creadas = crear_sesiones(supabase, st.session_state['curso_actual'], fechas,
+                                         puntaje_maximo, prefijo)
+                st.success(f"✅ Se crearon {len(creadas)} sesiones")
+                time.sleep(1)
+                st.rerun()
+            except Exception as e:
+                if 'unique_sesion_curso' in str(e):
+                    st.error("Alguno de los nombres ya existe en el curso")
+                else:
+                    st.error(f"Error al crear las sesiones: {str(e)}")
+
+def consultar_pagina_sesiones(busqueda, orden, pagina):
+    """Una página de sesiones con sus estadísticas precalculadas, en una sola consulta"""
+    columna, descendente = ORDENES_SESIONES[orden]
+    consulta = supabase.table('sesiones')\
+        .select('id, nombre, fecha, puntaje_maximo, '
+                'estadisticas_sesion(promedio, sin_puntos, actualizado_en)', count='exact')\
         .eq('curso_id', st.session_state['curso_actual'])\
+        .is_('eliminado_en', 'null')
+    if busqueda:
+        consulta = consulta.ilike('nombre', f"%{busqueda}%")
+    inicio = (pagina - 1) * SESIONES_POR_PAGINA
+    return consulta\
+        .order(columna, desc=descendente)\
+        .order('id')\
+        .range(inicio, inicio + SESIONES_POR_PAGINA - 1)\
         .execute()
+
+def estadisticas_de(sesion):
+    """Estadísticas embebidas de una sesión; PostgREST puede devolverlas como lista"""
+    estadisticas = sesion.get('estadisticas_sesion')
+    if isinstance(estadisticas, list):
+        estadisticas = estadisticas[0] if estadisticas else None
+    return estadisticas
+
+def mostrar_resumen_sesiones(sesiones):
+    """Tabla resumida de la página actual; cada fila solo tiene el botón para abrirla"""
+    encabezado = st.columns([3, 2, 1, 1, 1])
+    for col, titulo in zip(encabezado, ["Sesión", "Fecha", "Máximo", "Promedio"]):
+        col.markdown(f"**{titulo}**")
+    for sesion in sesiones:
+        estadisticas = estadisticas_de(sesion)
+        abierta = sesion['id'] == st.session_state.sesion_abierta
+        col1, col2, col3, col4, col5 = st.columns([3, 2, 1, 1, 1])
+        col1.write(f"{'📂' if abierta else '📅'} {sesion['nombre']}")
+        col2.write(sesion['fecha'])
+        col3.write(f"{sesion['puntaje_maximo']}")
+        col4.write(f"{estadisticas['promedio']}" if estadisticas else "—")
+        with col5:
+            if st.button("Cerrar" if abierta else "Abrir", key=f"abrir_{sesion['id']}"):
+                st.session_state.sesion_abierta = None if abierta else sesion['id']
+                st.rerun()
+
+def mostrar_detalle_sesion(sesion):
+    """Controles de edición y estadísticas en vivo de la sesión abierta"""
+    st.markdown("---")
+    st.subheader(f"📂 {sesion['nombre']} - {sesion['fecha']}")
+    col1, col2 = st.columns([3, 1])
     
-    if not sesiones.data:
-        return 1
+    with col1:
+        # Input para modificar puntaje máximo
+        nuevo_puntaje = st.number_input(
+            "Puntaje Máximo",
+            min_value=1.0,
+            max_value=100.0,
+            value=float(sesion['puntaje_maximo']),
+            step=0.5,
+            key=f"puntaje_{sesion['id']}"
+        )
+        
+        # Botón para guardar cambios en el puntaje
+        if nuevo_puntaje != sesion['puntaje_maximo']:
+            reescalar = st.checkbox(
+                "Reescalar puntos proporcionalmente",
+                key=f"reescalar_{sesion['id']}",
+                help="Ajusta los puntos ya asignados al nuevo máximo "
+                     f"(ej. de {sesion['puntaje_maximo']} a {nuevo_puntaje})"
+            )
+            if st.button("💾 Guardar nuevo puntaje", key=f"save_points_{sesion['id']}"):
+                exito, mensaje = actualizar_puntaje_maximo(sesion['id'], nuevo_puntaje, reescalar)
+                if exito:
+                    st.success(f"✅ {mensaje}")
+                    time.sleep(1)
+                    st.rerun()
+                else:
+                    st.error(f"❌ {mensaje}")
+        
+        # Obtener resumen de puntos de la sesión desde la vista
+        resumen = supabase.table('puntos_totales')\
+            .select('total')\
+            .eq('sesion_id', sesion['id'])\
+            .execute()
+        
+        if resumen.data:
+            totales = [r['total'] for r in resumen.data]
+            
+            st.write("**Estadísticas:**")
+            col_stats1, col_stats2, col_stats3 = st.columns(3)
+            with col_stats1:
+                st.metric("Promedio Total", f"{sum(totales) / len(totales):.2f}")
+            with col_stats2:
+                st.metric("Máximo", f"{max(totales):.2f}")
+            with col_stats3:
+                st.metric("Mínimo", f"{min(totales):.2f}")
     
-    numeros = []
-    for sesion in sesiones.data:
-        try:
-            # Extraer número del nombre "Sesión X"
-            num = int(sesion['nombre'].split(' ')[1])
-            numeros.append(num)
-        except:
-            continue
+    with col2:
+        # Botón para ir a asignar puntos
+        if st.button("✏️ Asignar Puntos", key=f"points_{sesion['id']}"):
+            st.session_state.sesion_actual = sesion['id']
+            st.session_state.sesion_nombre = sesion['nombre']
+            st.switch_page("pages/5_✨_Asignar_Puntos.py")
+        
+        # Botón para eliminar sesión
+        if st.button("🗑️ Eliminar", key=f"del_{sesion['id']}", type="primary"):
+            if st.session_state.get('sesion_actual') == sesion['id']:
+                del st.session_state.sesion_actual
+                del st.session_state.sesion_nombre
+            
+            # Se oculta al instante; sus puntos se borran luego en segundo plano
+            marcar_eliminado(supabase, 'sesiones', sesion['id'])
+            st.session_state.sesion_abierta = None
+            st.success("✅ Sesión eliminada exitosamente")
+            st.rerun()
+
+# Sesiones eliminadas del curso que todavía se pueden restaurar
+def mostrar_sesiones_eliminadas():
+    eliminadas = eliminados_recientes(supabase, 'sesiones', 'id, nombre, fecha, eliminado_en',
+                                      st.session_state['curso_actual'])
+    if not eliminadas:
+        return
     
-    return max(numeros) + 1 if numeros else 1
+    with st.expander(f"🗑️ Sesiones eliminadas ({len(eliminadas)})"):
+        st.caption(f"Las sesiones eliminadas se borran definitivamente, con sus puntos, "
+                   f"después de {DIAS_RETENCION} días")
+        for sesion in eliminadas:
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                fecha = datetime.fromisoformat(sesion['eliminado_en']).strftime('%Y-%m-%d %H:%M')
+                st.write(f"**{sesion['nombre']}** del {sesion['fecha']} (eliminada: {fecha})")
+            with col2:
+                if st.button("♻️ Restaurar", key=f"restore_{sesion['id']}"):
+                    try:
+                        restaurar(supabase, 'sesiones', sesion['id'])
+                        st.success(f"Sesión '{sesion['nombre']}' restaurada con sus puntos")
+                        st.rerun()
+                    except Exception as e:
+                        if 'unique_sesion_curso' in str(e) or 'duplicate key' in str(e):
+                            st.error("Ya existe otra sesión con este nombre en el curso")
+                        else:
+                            st.error(f"Error al restaurar la sesión: {str(e)}")
 
 # Título y encabezado
 st.title("📅 Gestión de Sesiones")
@@ -126,16 +314,11 @@ with st.form("nueva_sesion", clear_on_submit=True):
     
     if submitted:
         try:
-            # Validar que haya estudiantes en el curso
-            estudiantes = supabase.table('estudiantes_curso')\
-                .select('id')\
-                .eq('curso_id', st.session_state['curso_actual'])\
-                .execute()
-            
-            if not estudiantes.data:
+            # Validar que haya estudiantes en el curso, desde la instantánea compartida
+            if not obtener_instantanea(supabase, st.session_state['curso_actual']).estudiantes:
                 st.error("No hay estudiantes registrados en el curso")
             else:
-                # Crear sesión
+                # Crear sesión; sus puntos se crean al abrirla por primera vez
                 nombre_final = nombre if nombre and nombre.strip() else nombre_sugerido
                 sesion = supabase.table('sesiones').insert({
                     'curso_id': st.session_state['curso_actual'],
@@ -146,28 +329,6 @@ with st.form("nueva_sesion", clear_on_submit=True):
                 
                 sesion_id = sesion.data[0]['id']
                 
-                # Inicializar puntos individuales para todos los estudiantes
-                for estudiante in estudiantes.data:
-                    supabase.table('puntos_individuales').insert({
-                        'sesion_id': sesion_id,
-                        'estudiante_id': estudiante['id'],
-                        'puntos': 0
-                    }).execute()
-                
-                # Inicializar puntos grupales para todos los grupos
-                grupos = supabase.table('grupos')\
-                    .select('id')\
-                    .eq('curso_id', st.session_state['curso_actual'])\
-                    .execute()
-                
-                if grupos.data:
-                    for grupo in grupos.data:
-                        supabase.table('puntos_grupales').insert({
-                            'sesion_id': sesion_id,
-                            'grupo_id': grupo['id'],
-                            'puntos': 0
-                        }).execute()
-                
                 st.success(f"✅ Sesión '{nombre_final}' creada exitosamente")
                 
                 # Actualizar estado de sesión actual
@@ -182,126 +343,86 @@ with st.form("nueva_sesion", clear_on_submit=True):
             else:
                 st.error(f"Error al crear la sesión: {str(e)}")
 
+mostrar_programar_sesiones()
+
 # Ver sesiones existentes
 st.markdown("---")
 st.subheader("📋 Sesiones del Curso")
 
+if 'pagina_sesiones' not in st.session_state:
+    st.session_state.pagina_sesiones = 1
+if 'sesion_abierta' not in st.session_state:
+    st.session_state.sesion_abierta = st.session_state.get('sesion_actual')
+
+def volver_a_primera_pagina():
+    st.session_state.pagina_sesiones = 1
+
+# Búsqueda y filtros; se aplican en el servidor
+col1, col2 = st.columns(2)
+with col1:
+    busqueda = st.text_input("🔍 Buscar sesión", 
+                           placeholder="Nombre de la sesión",
+                           on_change=volver_a_primera_pagina)
+with col2:
+    orden = st.selectbox("Ordenar por", list(ORDENES_SESIONES), on_change=volver_a_primera_pagina)
+
 try:
-    # Obtener sesiones ordenadas por fecha
-    sesiones = supabase.table('sesiones')\
-        .select('*')\
-        .eq('curso_id', st.session_state['curso_actual'])\
-        .order('fecha', desc=True)\
-        .execute()
+    pagina, total = st.session_state.pagina_sesiones, 0
+    sesiones = consultar_pagina_sesiones(busqueda, orden, pagina)
+    total = sesiones.count or 0
+    paginas = max(1, -(-total // SESIONES_POR_PAGINA))
+    if pagina > paginas:
+        # La página quedó vacía (por ejemplo, tras eliminar su última sesión)
+        st.session_state.pagina_sesiones = paginas
+        st.rerun()
 
     if sesiones.data:
-        # Búsqueda y filtros
-        col1, col2 = st.columns(2)
-        with col1:
-            busqueda = st.text_input("🔍 Buscar sesión", 
-                                   placeholder="Nombre de la sesión")
-        with col2:
-            orden = st.selectbox("Ordenar por", 
-                               ["Fecha ▼", "Fecha ▲", "Nombre", "Puntaje máximo"])
-        
-        sesiones_mostrar = sesiones.data
-        if busqueda:
-            sesiones_mostrar = [s for s in sesiones.data 
-                              if busqueda.lower() in s['nombre'].lower()]
-        
-        # Ordenar según selección
-        if orden == "Fecha ▲":
-            sesiones_mostrar = sorted(sesiones_mostrar, key=lambda x: x['fecha'])
-        elif orden == "Nombre":
-            sesiones_mostrar = sorted(sesiones_mostrar, key=lambda x: x['nombre'])
-        elif orden == "Puntaje máximo":
-            sesiones_mostrar = sorted(sesiones_mostrar, key=lambda x: x['puntaje_maximo'])
-        
-        # Mostrar sesiones
-        for sesion in sesiones_mostrar:
-            with st.expander(
-                f"📅 {sesion['nombre']} - {sesion['fecha']}", 
-                expanded=sesion['id'] == st.session_state.get('sesion_actual')
-            ):
-                col1, col2 = st.columns([3, 1])
-                
-                with col1:
-                    # Input para modificar puntaje máximo
-                    nuevo_puntaje = st.number_input(
-                        "Puntaje Máximo",
-                        min_value=1.0,
-                        max_value=100.0,
-                        value=float(sesion['puntaje_maximo']),
-                        step=0.5,
-                        key=f"puntaje_{sesion['id']}"
-                    )
-                    
-                    # Botón para guardar cambios en el puntaje
-                    if nuevo_puntaje != sesion['puntaje_maximo']:
-                        if st.button("💾 Guardar nuevo puntaje", key=f"save_points_{sesion['id']}"):
-                            exito, mensaje = actualizar_puntaje_maximo(sesion['id'], nuevo_puntaje)
-                            if exito:
-                                st.success(f"✅ {mensaje}")
-                                time.sleep(1)
-                                st.rerun()
-                            else:
-                                st.error(f"❌ {mensaje}")
-                    
-                    # Obtener resumen de puntos de la sesión desde la vista
-                    resumen = supabase.table('puntos_totales')\
-                        .select('*')\
-                        .eq('sesion_id', sesion['id'])\
-                        .execute()
-                    
-                    if resumen.data:
-                        puntos_df = pd.DataFrame([{
-                            'total': r['total'],
-                            'individuales': r['puntos_individuales'],
-                            'grupales': r['puntos_grupales']
-                        } for r in resumen.data])
-                        
-                        st.write("**Estadísticas:**")
-                        col_stats1, col_stats2, col_stats3 = st.columns(3)
-                        with col_stats1:
-                            st.metric("Promedio Total", f"{puntos_df['total'].mean():.2f}")
-                        with col_stats2:
-                            st.metric("Máximo", f"{puntos_df['total'].max():.2f}")
-                        with col_stats3:
-                            st.metric("Mínimo", f"{puntos_df['total'].min():.2f}")
-                
-                with col2:
-                    # Botón para ir a asignar puntos
-                    if st.button("✏️ Asignar Puntos", key=f"points_{sesion['id']}"):
-                        st.session_state.sesion_actual = sesion['id']
-                        st.session_state.sesion_nombre = sesion['nombre']
-                        st.switch_page("pages/5_✨_Asignar_Puntos.py")
-                    
-                    # Botón para eliminar sesión
-                    if st.button("🗑️ Eliminar", key=f"del_{sesion['id']}", type="primary"):
-                        if st.session_state.get('sesion_actual') == sesion['id']:
-                            del st.session_state.sesion_actual
-                            del st.session_state.sesion_nombre
-                        
-                        supabase.table('sesiones')\
-                            .delete()\
-                            .eq('id', sesion['id'])\
-                            .execute()
-                        st.success("✅ Sesión eliminada exitosamente")
-                        st.rerun()
+        mostrar_resumen_sesiones(sesiones.data)
+        st.caption("El promedio es el precalculado por `python cli.py recompute-stats`; "
+                   "abre una sesión para ver sus estadísticas actuales.")
+
+        if paginas > 1:
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col1:
+                if st.button("◀ Anterior", disabled=pagina <= 1, use_container_width=True):
+                    st.session_state.pagina_sesiones -= 1
+                    st.rerun()
+            with col2:
+                st.caption(f"Página {pagina} de {paginas} · {total} sesiones")
+            with col3:
+                if st.button("Siguiente ▶", disabled=pagina >= paginas, use_container_width=True):
+                    st.session_state.pagina_sesiones += 1
+                    st.rerun()
+    elif busqueda:
+        st.info("Ninguna sesión coincide con la búsqueda")
     else:
         st.info("No hay sesiones creadas en este curso")
 
 except Exception as e:
     st.error(f"Error al cargar las sesiones: {str(e)}")
 
+# Detalle de la sesión abierta; solo esta sesión consulta sus puntos
+if st.session_state.sesion_abierta:
+    sesion = catalogo_sesiones(supabase, st.session_state['curso_actual']).get(st.session_state.sesion_abierta)
+    if sesion:
+        mostrar_detalle_sesion(sesion)
+    else:
+        st.session_state.sesion_abierta = None
+
+mostrar_sesiones_eliminadas()
+
 # Información adicional
 with st.expander("ℹ️ Ayuda"):
     st.markdown("""
     ### Gestión de Sesiones:
     - Los nombres se autogeneran secuencialmente
     - Cada sesión tiene un puntaje máximo configurable
-    - Se inicializan los puntos individuales y grupales en 0
-    - Puedes ordenar y filtrar las sesiones
+    - Al cambiar el puntaje máximo puedes reescalar los puntos ya asignados
+    - Programa el calendario del periodo eligiendo los días de clase; se crea en una sola operación
+    - Los puntos de una sesión se inicializan en 0 al abrirla por primera vez
+    - Puedes ordenar y filtrar las sesiones; la lista se muestra por páginas
+    - Abre una sesión para ver sus estadísticas y editarla
+    - Una sesión eliminada se puede restaurar durante unos días desde "Sesiones eliminadas"
     
     ### Para asignar puntos:
     1. Crea una nueva sesión o selecciona una existente
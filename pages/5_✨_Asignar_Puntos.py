@@ -1,22 +1,22 @@
 # pages/5_asignar_puntos.py
 import streamlit as st
-import pandas as pd
-from supabase import create_client
 import time
 from datetime import datetime
+from utils.catalogo import catalogo_sesiones, seleccionar
+from utils.cargador import cargador_puntos
+from utils.importacion import leer_archivo, plantilla_puntos, preparar_puntos, puntos_importados
+from utils.operaciones import mostrar_operaciones_masivas, limpiar_widgets_puntos
+from utils.totales import obtener_totales
+from utils.vistas import seleccionar_vista
+from utils.conexion import obtener_cliente
+from utils.historial import autor_actual, guardar_con_historial, mostrar_deshacer_rehacer
+from utils.instantanea import obtener_instantanea
 
 # Configuración de la página
 st.set_page_config(page_title="Asignación de Puntos", page_icon="🎯", layout="wide")
 
-# Inicializar conexión con Supabase
-@st.cache_resource
-def init_connection():
-    return create_client(
-        st.secrets["supabase_url"],
-        st.secrets["supabase_key"]
-    )
-
-supabase = init_connection()
+# Conexión compartida con Supabase
+supabase = obtener_cliente()
 
 # Inicializar estados si no existen
 if 'puntos_individuales_pendientes' not in st.session_state:
@@ -30,20 +30,13 @@ if 'ultimo_cambio' not in st.session_state:
 def guardar_puntos():
     with st.spinner('Guardando puntos...'):
         try:
-            # Guardar puntos individuales
-            for punto_id, puntos in st.session_state.puntos_individuales_pendientes.items():
-                supabase.table('puntos_individuales')\
-                    .update({'puntos': puntos})\
-                    .eq('id', punto_id)\
-                    .execute()
+            # Guardar todos los cambios y su historial en un solo lote
+            guardar_con_historial(
+                supabase,
+                st.session_state.puntos_individuales_pendientes,
+                st.session_state.puntos_grupales_pendientes
+            )
             st.session_state.puntos_individuales_pendientes = {}
-
-            # Guardar puntos grupales
-            for punto_id, puntos in st.session_state.puntos_grupales_pendientes.items():
-                supabase.table('puntos_grupales')\
-                    .update({'puntos': puntos})\
-                    .eq('id', punto_id)\
-                    .execute()
             st.session_state.puntos_grupales_pendientes = {}
 
             st.success('✅ Puntos guardados exitosamente')
@@ -52,45 +45,106 @@ def guardar_puntos():
         except Exception as e:
             st.error(f"Error al guardar puntos: {str(e)}")
 
+def importar_puntos_desde_archivo():
+    with st.expander("📤 Importar puntos desde archivo"):
+        estudiantes_curso = instantanea.estudiantes
+        
+        st.download_button(
+            label="📥 Descargar plantilla con los estudiantes del curso",
+            data=lambda: plantilla_puntos(estudiantes_curso),
+            file_name=f"puntos_{st.session_state.get('sesion_nombre', 'sesion').replace(' ', '_')}.csv",
+            mime="text/csv"
+        )
+        
+        archivo = st.file_uploader(
+            "Archivo de puntos (CSV o Excel)",
+            type=['csv', 'xlsx', 'xls'],
+            help="El archivo debe contener las columnas: apellidos,nombres,puntos",
+            key="archivo_puntos"
+        )
+        if archivo is None:
+            return
+        
+        try:
+            coincidencias, sin_coincidencia, ambiguos, invalidos = preparar_puntos(
+                leer_archivo(archivo), estudiantes_curso, float(sesion['puntaje_maximo'])
+            )
+        except Exception as e:
+            st.error(f"Error al procesar el archivo: {str(e)}")
+            return
+        
+        st.write(f"**{len(coincidencias)}** estudiantes encontrados en el curso")
+        if not sin_coincidencia.empty:
+            st.warning(f"⚠️ {len(sin_coincidencia)} filas no coinciden con ningún estudiante del curso")
+            st.dataframe(sin_coincidencia, hide_index=True)
+        if not ambiguos.empty:
+            st.warning(f"⚠️ {len(ambiguos)} filas coinciden con varios estudiantes del mismo nombre; "
+                       "asígnales los puntos a mano")
+            st.dataframe(ambiguos, hide_index=True)
+        if not invalidos.empty:
+            st.error(f"❌ {len(invalidos)} filas tienen puntos vacíos o fuera del rango "
+                     f"0 - {sesion['puntaje_maximo']}. Corrige el archivo para importar.")
+            st.dataframe(invalidos, hide_index=True)
+            return
+        
+        cambios_pendientes = len(st.session_state.puntos_individuales_pendientes) + \
+                            len(st.session_state.puntos_grupales_pendientes)
+        if cambios_pendientes > 0:
+            st.info("Guarda los cambios pendientes antes de importar puntos")
+        
+        if st.button("Importar puntos", key="importar_puntos",
+                     disabled=cambios_pendientes > 0 or coincidencias.empty):
+            try:
+                # La importación es un lote más del historial: se puede deshacer
+                importados = puntos_importados(
+                    supabase, st.session_state.sesion_actual, coincidencias
+                )
+                guardar_con_historial(supabase, importados, {})
+                limpiar_widgets_puntos()
+                st.success(f"✅ {len(importados)} puntajes importados exitosamente")
+                time.sleep(1)
+                st.rerun()
+            except Exception as e:
+                st.error(f"Error al importar puntos: {str(e)}")
+
 # Verificar curso y sesión seleccionados
 if 'curso_actual' not in st.session_state:
     st.warning("⚠️ Por favor, selecciona un curso en la página de Gestión de Cursos")
     st.page_link("pages/1_📚_Mis_Cursos.py", label="Ir a Gestión de Cursos")
     st.stop()
 
+# Catálogo de sesiones del curso desde la caché compartida, indexado por id
+sesiones = catalogo_sesiones(supabase, st.session_state['curso_actual'])
+
 # Selector de sesión
 if 'sesion_actual' not in st.session_state:
-    sesiones = supabase.table('sesiones')\
-        .select('*')\
-        .eq('curso_id', st.session_state['curso_actual'])\
-        .order('fecha', desc=True)\
-        .execute()
-
-    if not sesiones.data:
+    if not sesiones:
         st.warning("No hay sesiones creadas para este curso")
         st.stop()
 
-    sesion_seleccionada = st.selectbox(
-        "Seleccionar Sesión",
-        options=[s['id'] for s in sesiones.data],
-        format_func=lambda x: next(s['nombre'] + f" ({s['fecha']})" for s in sesiones.data if s['id'] == x)
-    )
+    sesion_seleccionada = seleccionar("Seleccionar Sesión", sesiones, clave='sesion')
 
     if sesion_seleccionada:
         st.session_state.sesion_actual = sesion_seleccionada
-        st.session_state.sesion_nombre = next(s['nombre'] for s in sesiones.data if s['id'] == sesion_seleccionada)
+        st.session_state.sesion_nombre = sesiones.get(sesion_seleccionada)['nombre']
         st.rerun()
 
 # Obtener información de la sesión actual
-sesion = supabase.table('sesiones')\
-    .select('*')\
-    .eq('id', st.session_state.sesion_actual)\
-    .execute()
+sesion = sesiones.get(st.session_state.sesion_actual)
 
-if not sesion.data:
+if not sesion:
     st.error("Error al cargar la información de la sesión")
     st.stop()
 
+# Cargadores de la ejecución actual: cada fila se consulta una sola vez y
+# las claves encoladas se resuelven juntas con un filtro in_()
+puntos_individuales = cargador_puntos(
+    supabase, 'puntos_individuales', 'estudiante_id', st.session_state.sesion_actual
+)
+puntos_grupales = cargador_puntos(
+    supabase, 'puntos_grupales', 'grupo_id', st.session_state.sesion_actual
+)
+
 # Mostrar información de la sesión
 col1, col2, col3 = st.columns([2,2,1])
 with col1:
@@ -98,90 +152,75 @@ with col1:
 with col2:
     st.info(f"📅 Sesión: {st.session_state.get('sesion_nombre', 'No seleccionada')}")
 with col3:
-    st.info(f"Máximo: {sesion.data[0]['puntaje_maximo']}")
+    st.info(f"Máximo: {sesion['puntaje_maximo']}")
+
+# Estudiantes, grupos e integrantes del curso, compartidos con las demás sesiones
+# que ven el mismo curso; solo se vuelven a consultar cuando cambia su versión
+instantanea = obtener_instantanea(supabase, st.session_state['curso_actual'])
+grupos = instantanea.grupos
+
+mostrar_operaciones_masivas(supabase, sesion, grupos, instantanea.estudiantes, autor_actual())
+importar_puntos_desde_archivo()
+
+# Encolar todos los grupos para consultar sus puntos en lote
+ids_grupos = [g.id for g in grupos]
+puntos_grupales.encolar(ids_grupos)
 
-# Tabs para diferentes vistas
-tab1, tab2 = st.tabs(["👥 Vista por Grupos", "👤 Vista Individual"])
+# Totales por estudiante; solo se recalculan los integrantes de grupos que cambiaron
+totales = obtener_totales(st.session_state.sesion_actual, instantanea)
+for grupo_id, pg in zip(ids_grupos, puntos_grupales.cargar_varios(ids_grupos)):
+    totales.fijar_grupo(grupo_id, st.session_state.puntos_grupales_pendientes.get(pg['id'], pg['puntos']))
+
+# Selector de vista: solo se consulta y dibuja la vista elegida
+vista = seleccionar_vista()
 
 # Vista de Grupos
-with tab1:
-    grupos = supabase.table('grupos')\
-        .select('*')\
-        .eq('curso_id', st.session_state['curso_actual'])\
-        .execute()
-
-    if grupos.data:
-        for grupo in grupos.data:
+if vista == 'grupos':
+    # Encolar a todos los integrantes para consultar sus puntos en un solo lote
+    puntos_individuales.encolar(m.estudiante_id for m in instantanea.miembros)
+
+    if grupos:
+        for grupo in grupos:
             with st.expander(f"👥 {grupo['nombre']}", expanded=True):
-                # Obtener puntos grupales
-                puntos_grupales = supabase.table('puntos_grupales')\
-                    .select('*')\
-                    .eq('sesion_id', st.session_state.sesion_actual)\
-                    .eq('grupo_id', grupo['id'])\
-                    .execute()
-
-                if not puntos_grupales.data:
-                    # Crear registro de puntos grupales si no existe
-                    puntos_grupales = supabase.table('puntos_grupales').insert({
-                        'sesion_id': st.session_state.sesion_actual,
-                        'grupo_id': grupo['id'],
-                        'puntos': 0
-                    }).execute()
-
-                punto_grupal = puntos_grupales.data[0]
-
-                # Obtener estudiantes del grupo
-                estudiantes_grupo = supabase.table('estudiantes_grupo')\
-                    .select('estudiante_id, estudiantes_curso!inner(*)')\
-                    .eq('grupo_id', grupo['id'])\
-                    .execute()
+                punto_grupal = puntos_grupales.cargar(grupo['id'])
 
                 col1, col2 = st.columns([3, 1])
                 
+                puntos_grupales_actuales = st.session_state.puntos_grupales_pendientes.get(
+                    punto_grupal['id'], punto_grupal['puntos']
+                )
+
                 with col1:
-                    if estudiantes_grupo.data:
-                        for estudiante in estudiantes_grupo.data:
-                            est = estudiante['estudiantes_curso']
-                            # Obtener puntos individuales del estudiante
-                            puntos_ind = supabase.table('puntos_individuales')\
-                                .select('*')\
-                                .eq('sesion_id', st.session_state.sesion_actual)\
-                                .eq('estudiante_id', est['id'])\
-                                .execute()
-
-                            if not puntos_ind.data:
-                                # Crear registro de puntos individuales si no existe
-                                puntos_ind = supabase.table('puntos_individuales').insert({
-                                    'sesion_id': st.session_state.sesion_actual,
-                                    'estudiante_id': est['id'],
-                                    'puntos': 0
-                                }).execute()
-
-                            punto_individual = puntos_ind.data[0]
-                            
-                            puntos_actuales = {
-                                'individual': st.session_state.puntos_individuales_pendientes.get(
-                                    punto_individual['id'], punto_individual['puntos']
-                                ),
-                                'grupal': st.session_state.puntos_grupales_pendientes.get(
-                                    punto_grupal['id'], punto_grupal['puntos']
-                                )
-                            }
-                            
-                            total = puntos_actuales['individual'] + puntos_actuales['grupal']
-                            st.write(
-                                f"- {est['apellidos']}, {est['nombres']} "
-                                f"(Individual: {puntos_actuales['individual']}, "
-                                f"Grupal: {puntos_actuales['grupal']}, "
-                                f"Total: {total})"
-                            )
+                    for est in instantanea.integrantes_de(grupo['id']):
+                        punto_individual = puntos_individuales.cargar(est['id'])
+                        
+                        puntos_actuales = {
+                            'individual': st.session_state.puntos_individuales_pendientes.get(
+                                punto_individual['id'], punto_individual['puntos']
+                            ),
+                            'grupal': puntos_grupales_actuales
+                        }
+                        
+                        totales.fijar_individual(est['id'], puntos_actuales['individual'])
+                        total = totales.total_de(est['id'])
+                        # El total suma los puntos de todos los grupos del estudiante
+                        grupal_total = totales.grupal_de(est['id'])
+                        otros_grupos = (f"Todos sus grupos: {grupal_total}, "
+                                        if grupal_total != puntos_actuales['grupal'] else "")
+                        st.write(
+                            f"- {est['apellidos']}, {est['nombres']} "
+                            f"(Individual: {puntos_actuales['individual']}, "
+                            f"Grupal: {puntos_actuales['grupal']}, "
+                            f"{otros_grupos}"
+                            f"Total: {total})"
+                        )
                 
                 with col2:
                     nuevo_puntaje = st.number_input(
                         "Puntos grupales",
                         min_value=0.0,
-                        max_value=float(sesion.data[0]['puntaje_maximo']),
-                        value=float(punto_grupal['puntos']),
+                        max_value=float(sesion['puntaje_maximo']),
+                        value=float(puntos_grupales_actuales),
                         step=0.5,
                         key=f"grupo_{grupo['id']}"
                     )
@@ -189,69 +228,28 @@ with tab1:
                     if st.button("Asignar", key=f"btn_grupo_{grupo['id']}"):
                         st.session_state.puntos_grupales_pendientes[punto_grupal['id']] = nuevo_puntaje
                         st.session_state.ultimo_cambio = time.time()
+                        totales.fijar_grupo(grupo['id'], nuevo_puntaje)
                         st.success(f"Puntos asignados al grupo: {nuevo_puntaje}")
     else:
         st.info("No hay grupos creados en este curso")
 
 # Vista Individual
-with tab2:
+else:
     # Agregar buscador
     busqueda = st.text_input("🔍 Buscar estudiante (nombre o apellido)", "")
     
-    estudiantes = supabase.table('estudiantes_curso')\
-        .select('*')\
-        .eq('curso_id', st.session_state['curso_actual'])\
-        .order('apellidos')\
-        .execute()
-
-    if estudiantes.data:
+    if instantanea.estudiantes:
         # Filtrar estudiantes según la búsqueda
-        estudiantes_filtrados = estudiantes.data
-        if busqueda:
-            busqueda = busqueda.lower()
-            estudiantes_filtrados = [
-                est for est in estudiantes.data
-                if busqueda in f"{est['nombres']} {est['apellidos']}".lower()
-            ]
+        indice = instantanea.indice()
+        estudiantes_filtrados = indice.buscar(busqueda, aproximada=True)
+
+        # Encolar estudiantes visibles para consultarlos en lote
+        puntos_individuales.encolar(e['id'] for e in estudiantes_filtrados)
 
         # Contenedor para centrar el contenido
         with st.container():
             for estudiante in estudiantes_filtrados:
-                # Obtener puntos individuales
-                puntos_ind = supabase.table('puntos_individuales')\
-                    .select('*')\
-                    .eq('sesion_id', st.session_state.sesion_actual)\
-                    .eq('estudiante_id', estudiante['id'])\
-                    .execute()
-
-                if not puntos_ind.data:
-                    puntos_ind = supabase.table('puntos_individuales').insert({
-                        'sesion_id': st.session_state.sesion_actual,
-                        'estudiante_id': estudiante['id'],
-                        'puntos': 0
-                    }).execute()
-
-                punto_individual = puntos_ind.data[0]
-
-                # Obtener puntos grupales (si pertenece a grupos)
-                puntos_grupales_total = 0
-                grupos_est = supabase.table('estudiantes_grupo')\
-                    .select('grupo_id')\
-                    .eq('estudiante_id', estudiante['id'])\
-                    .execute()
-
-                if grupos_est.data:
-                    for grupo in grupos_est.data:
-                        pg = supabase.table('puntos_grupales')\
-                            .select('*')\
-                            .eq('sesion_id', st.session_state.sesion_actual)\
-                            .eq('grupo_id', grupo['grupo_id'])\
-                            .execute()
-                        
-                        if pg.data:
-                            puntos_grupales_total += st.session_state.puntos_grupales_pendientes.get(
-                                pg.data[0]['id'], pg.data[0]['puntos']
-                            )
+                punto_individual = puntos_individuales.cargar(estudiante['id'])
 
                 # Centrar el contenido usando columnas
                 _, col_central, _ = st.columns([1, 2, 1])
@@ -269,7 +267,7 @@ with tab2:
                     nuevo_puntaje = st.number_input(
                         f"**{nombre_estudiante}**",
                         min_value=0.0,
-                        max_value=float(sesion.data[0]['puntaje_maximo']),
+                        max_value=float(sesion['puntaje_maximo']),
                         value=float(puntos_ind_actuales),
                         step=0.5,
                         key=f"ind_{estudiante['id']}"
@@ -279,9 +277,15 @@ with tab2:
                         st.session_state.puntos_individuales_pendientes[punto_individual['id']] = nuevo_puntaje
                         st.session_state.ultimo_cambio = time.time()
                     
+                    # Total con los puntos de todos sus grupos
+                    totales.fijar_individual(estudiante['id'], nuevo_puntaje)
+                    if totales.grupal_de(estudiante['id']):
+                        st.caption(f"Grupal: {totales.grupal_de(estudiante['id'])} · "
+                                   f"Total: {totales.total_de(estudiante['id'])}")
+                    
 # Barra inferior con estado y botón de guardar
 st.markdown("---")
-col1, col2 = st.columns([3,1])
+col1, col2, col3 = st.columns([3,1,1])
 
 cambios_pendientes = len(st.session_state.puntos_individuales_pendientes) + \
                     len(st.session_state.puntos_grupales_pendientes)
@@ -297,6 +301,9 @@ with col2:
         if st.button("💾 Guardar Ahora", key="guardar_manual", use_container_width=True):
             guardar_puntos()
 
+with col3:
+    mostrar_deshacer_rehacer(supabase, sesion['id'], deshabilitado=cambios_pendientes > 0)
+
 # Guardado automático después de 5 segundos
 if cambios_pendientes > 0 and (time.time() - st.session_state.ultimo_cambio) >= 5:
     guardar_puntos()
\ No newline at end of file
@@ -0,0 +1,162 @@
+# pages/6_notas_finales.py
+import streamlit as st
+import io
+import time
+from utils.catalogo import catalogo_cursos
+from utils.conexion import obtener_cliente
+from utils.exportacion import escribir_excel
+from utils.notas import ESCALA, filas_notas, guardar_pesos, obtener_matriz, obtener_notas, version_datos
+
+# Configuración de la página
+st.set_page_config(page_title="Notas Finales", page_icon="🎓", layout="wide")
+
+# Conexión compartida con Supabase
+supabase = obtener_cliente()
+
+# Función para mostrar el encabezado con información del curso
+def mostrar_encabezado():
+    if 'curso_actual' not in st.session_state:
+        st.warning("⚠️ No hay curso seleccionado")
+        st.info("Por favor, selecciona un curso en la página de Gestión de Cursos")
+        st.page_link("pages/1_📚_Mis_Cursos.py", label="Ir a Gestión de Cursos")
+        st.stop()
+    else:
+        # Información del curso desde el catálogo compartido
+        curso = catalogo_cursos(supabase).get(st.session_state.curso_actual)
+
+        if not curso:
+            st.error("El curso seleccionado ya no existe")
+            del st.session_state.curso_actual
+            st.session_state.pop('curso_nombre', None)
+            st.rerun()
+
+        st.info(f"📚 Curso actual: {curso['nombre']}")
+
+def editar_pesos(matriz):
+    """Tabla editable con el peso de cada sesión; se guarda en una sola llamada"""
+    with st.expander("⚖️ Pesos de las sesiones"):
+        with st.form("pesos_sesiones"):
+            editadas = st.data_editor(
+                [
+                    {'id': s['id'], 'Sesión': s['nombre'], 'Fecha': s['fecha'],
+                     'Máximo': s['puntaje_maximo'], 'Peso': float(s.get('peso', 1))}
+                    for s in matriz.sesiones
+                ],
+                column_config={
+                    'id': None,
+                    'Peso': st.column_config.NumberColumn(min_value=0.0, step=0.5, required=True),
+                },
+                disabled=['Sesión', 'Fecha', 'Máximo'],
+                hide_index=True,
+                use_container_width=True,
+                key="editor_pesos"
+            )
+            st.caption("Con peso 0 la sesión no cuenta para la nota final")
+
+            if st.form_submit_button("💾 Guardar pesos", use_container_width=True):
+                anteriores = {s['id']: float(s.get('peso', 1)) for s in matriz.sesiones}
+                cambios = {f['id']: float(f['Peso']) for f in editadas if float(f['Peso']) != anteriores[f['id']]}
+                if not cambios:
+                    st.info("No hay pesos modificados")
+                    return
+                exito, mensaje = guardar_pesos(supabase, matriz.curso_id, cambios)
+                if exito:
+                    st.success(f"✅ {mensaje}")
+                    time.sleep(1)
+                    st.rerun()
+                else:
+                    st.error(f"❌ {mensaje}")
+
+# Título y encabezado
+st.title("🎓 Notas Finales")
+mostrar_encabezado()
+
+try:
+    # Una consulta por versión de los datos del curso; los recálculos salen de la caché
+    version = version_datos(supabase, st.session_state['curso_actual'])
+    matriz = obtener_matriz(supabase, st.session_state['curso_actual'], version)
+except Exception as e:
+    st.error(f"Error al cargar los puntos del curso: {str(e)}")
+    st.stop()
+
+if not matriz.sesiones or not matriz.estudiantes:
+    st.info("El curso necesita estudiantes y sesiones para calcular notas")
+    st.stop()
+
+editar_pesos(matriz)
+
+# Reglas de cálculo
+col1, col2 = st.columns(2)
+with col1:
+    sesiones_con_peso = int((matriz.pesos > 0).sum())
+    descartar = st.number_input(
+        "Descartar las sesiones más bajas",
+        min_value=0,
+        max_value=max(sesiones_con_peso - 1, 0),
+        value=0,
+        step=1,
+        help="Por estudiante, no se cuentan sus N sesiones con menor nota"
+    )
+with col2:
+    escala = st.number_input("Escala de la nota final", min_value=1, max_value=100, value=ESCALA, step=1)
+
+inicio = time.perf_counter()
+notas = obtener_notas(matriz, descartar, escala)
+filas = filas_notas(matriz, notas)
+duracion = (time.perf_counter() - inicio) * 1000
+
+# Resumen
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Promedio", f"{notas.mean():.2f}")
+with col2:
+    st.metric("Máxima", f"{notas.max():.2f}")
+with col3:
+    st.metric("Mínima", f"{notas.min():.2f}")
+
+st.dataframe(filas, hide_index=True, use_container_width=True)
+st.caption(f"{len(matriz.estudiantes)} estudiantes × {len(matriz.sesiones)} sesiones, "
+           f"calculado en {duracion:.1f} ms")
+
+# Descargas; los archivos se generan recién al hacer clic
+def crear_excel():
+    import pandas as pd
+
+    buffer = io.BytesIO()
+    escribir_excel({'Notas': pd.DataFrame(filas)}, buffer)
+    return buffer.getvalue()
+
+def crear_csv():
+    import pandas as pd
+
+    return pd.DataFrame(filas).to_csv(index=False).encode('utf-8')
+
+nombre_archivo = f"notas_{st.session_state.get('curso_nombre', 'curso').replace(' ', '_')}"
+col1, col2 = st.columns(2)
+with col1:
+    st.download_button(
+        label="📥 Descargar Excel",
+        data=crear_excel,
+        file_name=f"{nombre_archivo}.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        use_container_width=True
+    )
+with col2:
+    st.download_button(
+        label="📥 Descargar CSV",
+        data=crear_csv,
+        file_name=f"{nombre_archivo}.csv",
+        mime="text/csv",
+        use_container_width=True
+    )
+
+# Información adicional
+with st.expander("ℹ️ Ayuda"):
+    st.markdown("""
+    ### Cálculo de la nota final:
+    - El total de cada sesión (individual más grupal) se divide entre su puntaje máximo
+    - Un total por encima del máximo cuenta como el máximo
+    - Cada sesión pesa según su peso; con peso 0 no cuenta
+    - Si descartas N sesiones, a cada estudiante se le quitan sus N sesiones más bajas
+    - El promedio ponderado se lleva a la escala elegida
+    """)
@@ -0,0 +1,109 @@
+# pages/7_participacion.py
+import streamlit as st
+from utils.catalogo import catalogo_cursos
+from utils.conexion import obtener_cliente
+from utils.notas import obtener_matriz, version_datos
+from utils.participacion import (MINIMO_CEROS, ULTIMAS_SESIONES, csv_participacion,
+                                 obtener_reporte, sesiones_pasadas)
+
+# Configuración de la página
+st.set_page_config(page_title="Participación", page_icon="🚨", layout="wide")
+
+# Conexión compartida con Supabase
+supabase = obtener_cliente()
+
+# Función para mostrar el encabezado con información del curso
+def mostrar_encabezado():
+    if 'curso_actual' not in st.session_state:
+        st.warning("⚠️ No hay curso seleccionado")
+        st.info("Por favor, selecciona un curso en la página de Gestión de Cursos")
+        st.page_link("pages/1_📚_Mis_Cursos.py", label="Ir a Gestión de Cursos")
+        st.stop()
+    else:
+        # Información del curso desde el catálogo compartido
+        curso = catalogo_cursos(supabase).get(st.session_state.curso_actual)
+
+        if not curso:
+            st.error("El curso seleccionado ya no existe")
+            del st.session_state.curso_actual
+            st.session_state.pop('curso_nombre', None)
+            st.rerun()
+
+        st.info(f"📚 Curso actual: {curso['nombre']}")
+
+# Título y encabezado
+st.title("🚨 Participación")
+mostrar_encabezado()
+
+try:
+    # La misma matriz del curso que usan las notas finales, una consulta por versión de datos
+    version = version_datos(supabase, st.session_state['curso_actual'])
+    matriz = obtener_matriz(supabase, st.session_state['curso_actual'], version)
+except Exception as e:
+    st.error(f"Error al cargar los puntos del curso: {str(e)}")
+    st.stop()
+
+dictadas = len(sesiones_pasadas(matriz))
+if not matriz.estudiantes or not dictadas:
+    st.info("El curso necesita estudiantes y sesiones ya dictadas para el reporte")
+    st.stop()
+
+# Criterio de riesgo
+col1, col2, col3 = st.columns(3)
+with col1:
+    ultimas = st.number_input("Últimas sesiones", min_value=1, max_value=dictadas,
+                              value=min(ULTIMAS_SESIONES, dictadas), step=1)
+with col2:
+    minimo = st.number_input("Con 0 puntos en al menos", min_value=1, max_value=int(ultimas),
+                             value=min(MINIMO_CEROS, int(ultimas)), step=1)
+with col3:
+    solo_riesgo = st.toggle("Solo estudiantes en riesgo", value=True)
+
+filas = obtener_reporte(matriz, int(ultimas), int(minimo))
+en_riesgo = [f for f in filas if f['en_riesgo']]
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("En riesgo", f"{len(en_riesgo)} de {len(filas)}")
+with col2:
+    st.metric("Participación promedio", f"{sum(f['participacion'] for f in filas) / len(filas):.1f}%")
+with col3:
+    st.metric("Sesiones dictadas", dictadas)
+
+mostrar = en_riesgo if solo_riesgo else filas
+if mostrar:
+    st.dataframe(
+        [
+            {
+                'Apellidos': f['apellidos'],
+                'Nombres': f['nombres'],
+                f"Ceros en las últimas {f['sesiones_recientes']}": f['ceros_recientes'],
+                'Racha actual': f['racha_actual'],
+                'Racha máxima': f['racha_maxima'],
+                'Participación %': f['participacion'],
+            }
+            for f in mostrar
+        ],
+        hide_index=True,
+        use_container_width=True
+    )
+else:
+    st.success("✅ Ningún estudiante cumple el criterio de riesgo")
+
+st.download_button(
+    label="📥 Descargar reporte CSV",
+    data=lambda: csv_participacion(filas),
+    file_name=f"participacion_{st.session_state.get('curso_nombre', 'curso').replace(' ', '_')}.csv",
+    mime="text/csv"
+)
+
+# Información adicional
+with st.expander("ℹ️ Ayuda"):
+    st.markdown("""
+    ### Cómo se calcula:
+    - Solo cuentan las sesiones anteriores a hoy que ya tienen puntos registrados
+    - Una sesión sin puntos individuales (o con 0) cuenta como no participada
+    - **Racha actual**: sesiones seguidas sin puntos hasta la más reciente
+    - **Racha máxima**: la mayor cantidad de sesiones seguidas sin puntos
+    - **Participación**: porcentaje de sesiones dictadas con puntos individuales
+    """)
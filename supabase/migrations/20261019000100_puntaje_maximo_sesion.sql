@@ -0,0 +1,48 @@
+-- Validación y reescalado del puntaje máximo de una sesión en el servidor
+
+-- Máximo de puntos individuales y grupales de una sesión en una sola consulta
+create or replace function maximo_puntos_sesion(p_sesion_id bigint)
+returns table (maximo_individual numeric, maximo_grupal numeric)
+language sql
+stable
+as $$
+    select
+        (select coalesce(max(puntos), 0) from puntos_individuales where sesion_id = p_sesion_id),
+        (select coalesce(max(puntos), 0) from puntos_grupales where sesion_id = p_sesion_id);
+$$;
+
+-- Cambia el puntaje máximo reescalando proporcionalmente todos los puntos
+-- de la sesión (redondeados al paso de 0.5 que usa la interfaz)
+create or replace function reescalar_puntaje_sesion(p_sesion_id bigint, p_nuevo_maximo numeric)
+returns void
+language plpgsql
+as $$
+declare
+    v_maximo_actual numeric;
+begin
+    if p_nuevo_maximo is null or p_nuevo_maximo <= 0 then
+        raise exception 'El puntaje debe ser un número positivo';
+    end if;
+
+    select puntaje_maximo into v_maximo_actual
+    from sesiones
+    where id = p_sesion_id
+    for update;
+
+    if v_maximo_actual is null then
+        raise exception 'La sesión % no existe', p_sesion_id;
+    end if;
+
+    update puntos_individuales
+    set puntos = least(round(puntos * p_nuevo_maximo / v_maximo_actual * 2) / 2, p_nuevo_maximo)
+    where sesion_id = p_sesion_id;
+
+    update puntos_grupales
+    set puntos = least(round(puntos * p_nuevo_maximo / v_maximo_actual * 2) / 2, p_nuevo_maximo)
+    where sesion_id = p_sesion_id;
+
+    update sesiones
+    set puntaje_maximo = p_nuevo_maximo
+    where id = p_sesion_id;
+end;
+$$;
@@ -0,0 +1,190 @@
+-- Operaciones masivas sobre los puntos de una sesión
+-- Cada operación valida contra el puntaje máximo y se aplica en una sola transacción
+
+-- Crea los registros de puntos en 0 que falten para los estudiantes y grupos del curso
+create or replace function asegurar_puntos_sesion(p_sesion_id bigint)
+returns void
+language sql
+as $$
+    insert into puntos_individuales (sesion_id, estudiante_id, puntos)
+    select s.id, e.id, 0
+    from sesiones s
+    join estudiantes_curso e on e.curso_id = s.curso_id
+    where s.id = p_sesion_id
+      and not exists (
+          select 1 from puntos_individuales p
+          where p.sesion_id = s.id and p.estudiante_id = e.id
+      );
+
+    insert into puntos_grupales (sesion_id, grupo_id, puntos)
+    select s.id, g.id, 0
+    from sesiones s
+    join grupos g on g.curso_id = s.curso_id
+    where s.id = p_sesion_id
+      and not exists (
+          select 1 from puntos_grupales p
+          where p.sesion_id = s.id and p.grupo_id = g.id
+      );
+$$;
+
+-- Puntaje máximo de la sesión, con error si no existe
+create or replace function puntaje_maximo_sesion(p_sesion_id bigint)
+returns numeric
+language plpgsql
+stable
+as $$
+declare
+    v_maximo numeric;
+begin
+    select puntaje_maximo into v_maximo from sesiones where id = p_sesion_id;
+    if v_maximo is null then
+        raise exception 'La sesión % no existe', p_sesion_id;
+    end if;
+    return v_maximo;
+end;
+$$;
+
+-- Asigna el mismo puntaje individual a todos los estudiantes
+create or replace function puntos_fijar_todos(p_sesion_id bigint, p_puntos numeric)
+returns integer
+language plpgsql
+as $$
+declare
+    v_filas integer;
+begin
+    if p_puntos < 0 or p_puntos > puntaje_maximo_sesion(p_sesion_id) then
+        raise exception 'Los puntos deben estar entre 0 y el puntaje máximo de la sesión';
+    end if;
+
+    perform asegurar_puntos_sesion(p_sesion_id);
+
+    update puntos_individuales set puntos = p_puntos where sesion_id = p_sesion_id;
+    get diagnostics v_filas = row_count;
+    return v_filas;
+end;
+$$;
+
+-- Suma (o resta) puntos individuales a todos menos los estudiantes de p_excluir
+-- (los ausentes; la asistencia no se guarda, así que la indica quien aplica la operación)
+create or replace function puntos_sumar_todos(
+    p_sesion_id bigint,
+    p_delta numeric,
+    p_excluir bigint[] default '{}'
+)
+returns integer
+language plpgsql
+as $$
+declare
+    v_maximo numeric := puntaje_maximo_sesion(p_sesion_id);
+    v_filas integer;
+begin
+    perform asegurar_puntos_sesion(p_sesion_id);
+
+    if exists (
+        select 1 from puntos_individuales
+        where sesion_id = p_sesion_id
+          and estudiante_id <> all (coalesce(p_excluir, '{}'))
+          and (puntos + p_delta > v_maximo or puntos + p_delta < 0)
+    ) then
+        raise exception 'La operación dejaría estudiantes fuera del rango 0 - %', v_maximo;
+    end if;
+
+    update puntos_individuales
+    set puntos = puntos + p_delta
+    where sesion_id = p_sesion_id
+      and estudiante_id <> all (coalesce(p_excluir, '{}'));
+    get diagnostics v_filas = row_count;
+    return v_filas;
+end;
+$$;
+
+-- Suma (o resta) puntos individuales a todos los integrantes de un grupo
+create or replace function puntos_sumar_grupo(p_sesion_id bigint, p_grupo_id bigint, p_delta numeric)
+returns integer
+language plpgsql
+as $$
+declare
+    v_maximo numeric := puntaje_maximo_sesion(p_sesion_id);
+    v_filas integer;
+begin
+    perform asegurar_puntos_sesion(p_sesion_id);
+
+    if exists (
+        select 1 from puntos_individuales p
+        join estudiantes_grupo eg on eg.estudiante_id = p.estudiante_id
+        where p.sesion_id = p_sesion_id
+          and eg.grupo_id = p_grupo_id
+          and (p.puntos + p_delta > v_maximo or p.puntos + p_delta < 0)
+    ) then
+        raise exception 'La operación dejaría integrantes del grupo fuera del rango 0 - %', v_maximo;
+    end if;
+
+    update puntos_individuales p
+    set puntos = p.puntos + p_delta
+    from estudiantes_grupo eg
+    where eg.estudiante_id = p.estudiante_id
+      and eg.grupo_id = p_grupo_id
+      and p.sesion_id = p_sesion_id;
+    get diagnostics v_filas = row_count;
+    return v_filas;
+end;
+$$;
+
+-- Copia los puntos individuales y grupales de otra sesión del mismo curso
+create or replace function puntos_copiar_sesion(p_origen_id bigint, p_destino_id bigint)
+returns integer
+language plpgsql
+as $$
+declare
+    v_maximo numeric := puntaje_maximo_sesion(p_destino_id);
+    v_filas integer;
+begin
+    if (select curso_id from sesiones where id = p_origen_id)
+       is distinct from (select curso_id from sesiones where id = p_destino_id) then
+        raise exception 'Las sesiones deben pertenecer al mismo curso';
+    end if;
+
+    if exists (select 1 from puntos_individuales where sesion_id = p_origen_id and puntos > v_maximo)
+       or exists (select 1 from puntos_grupales where sesion_id = p_origen_id and puntos > v_maximo) then
+        raise exception 'La sesión de origen tiene puntos mayores al máximo de esta sesión (%)', v_maximo;
+    end if;
+
+    perform asegurar_puntos_sesion(p_destino_id);
+
+    update puntos_individuales d
+    set puntos = coalesce(o.puntos, 0)
+    from puntos_individuales d2
+    left join puntos_individuales o
+      on o.sesion_id = p_origen_id and o.estudiante_id = d2.estudiante_id
+    where d.id = d2.id and d.sesion_id = p_destino_id;
+    get diagnostics v_filas = row_count;
+
+    update puntos_grupales d
+    set puntos = coalesce(o.puntos, 0)
+    from puntos_grupales d2
+    left join puntos_grupales o
+      on o.sesion_id = p_origen_id and o.grupo_id = d2.grupo_id
+    where d.id = d2.id and d.sesion_id = p_destino_id;
+
+    return v_filas;
+end;
+$$;
+
+-- Deja en 0 todos los puntos individuales y grupales de la sesión
+create or replace function puntos_reiniciar(p_sesion_id bigint)
+returns integer
+language plpgsql
+as $$
+declare
+    v_filas integer;
+begin
+    perform puntaje_maximo_sesion(p_sesion_id);
+
+    update puntos_individuales set puntos = 0 where sesion_id = p_sesion_id;
+    get diagnostics v_filas = row_count;
+
+    update puntos_grupales set puntos = 0 where sesion_id = p_sesion_id;
+
+    return v_filas;
+end;
+$$;
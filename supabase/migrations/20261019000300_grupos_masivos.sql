@@ -0,0 +1,43 @@
+-- Generación automática de grupos
+
+-- Puntos individuales acumulados por estudiante en todas las sesiones del curso
+create or replace function puntos_acumulados_curso(p_curso_id bigint)
+returns table (estudiante_id bigint, puntos numeric)
+language sql
+stable
+as $$
+    select p.estudiante_id, sum(p.puntos)
+    from puntos_individuales p
+    join sesiones s on s.id = p.sesion_id
+    where s.curso_id = p_curso_id
+    group by p.estudiante_id;
+$$;
+
+-- Crea varios grupos con sus integrantes en una sola transacción
+-- p_grupos: [{"nombre": "Grupo 1", "estudiantes": [1, 2, 3]}, ...]
+create or replace function crear_grupos_masivo(p_curso_id bigint, p_grupos jsonb)
+returns integer
+language plpgsql
+as $$
+declare
+    v_creados integer;
+begin
+    with entrada as (
+        select g.ordinal, g.valor ->> 'nombre' as nombre, g.valor -> 'estudiantes' as estudiantes
+        from jsonb_array_elements(p_grupos) with ordinality as g(valor, ordinal)
+    ),
+    nuevos as (
+        insert into grupos (curso_id, nombre)
+        select p_curso_id, nombre from entrada order by ordinal
+        returning id, nombre
+    )
+    insert into estudiantes_grupo (grupo_id, estudiante_id)
+    select n.id, e.estudiante_id::bigint
+    from nuevos n
+    join entrada en on en.nombre = n.nombre
+    cross join lateral jsonb_array_elements_text(en.estudiantes) as e(estudiante_id);
+
+    select jsonb_array_length(p_grupos) into v_creados;
+    return v_creados;
+end;
+$$;
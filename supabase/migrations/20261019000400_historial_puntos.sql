@@ -0,0 +1,159 @@
+-- Historial de cambios de puntos con deshacer / rehacer por lotes
+
+create table if not exists historial_puntos (
+    id bigint generated always as identity primary key,
+    lote uuid not null,
+    sesion_id bigint not null references sesiones (id) on delete cascade,
+    tabla text not null check (tabla in ('puntos_individuales', 'puntos_grupales')),
+    fila_id bigint not null,
+    anterior numeric not null,
+    nuevo numeric not null,
+    autor text,
+    creado_en timestamptz not null default now(),
+    deshecho boolean not null default false
+);
+
+create index if not exists historial_puntos_sesion_idx on historial_puntos (sesion_id, id);
+create index if not exists historial_puntos_lote_idx on historial_puntos (lote);
+
+-- Guarda los cambios pendientes y registra su historial en la misma transacción
+-- p_individuales / p_grupales: {"<id de la fila>": puntos, ...}
+create or replace function guardar_puntos_con_historial(
+    p_individuales jsonb,
+    p_grupales jsonb,
+    p_autor text default null
+)
+returns uuid
+language plpgsql
+as $$
+declare
+    v_lote uuid := gen_random_uuid();
+begin
+    insert into historial_puntos (lote, sesion_id, tabla, fila_id, anterior, nuevo, autor)
+    select v_lote, p.sesion_id, 'puntos_individuales', p.id, p.puntos, c.value::numeric, p_autor
+    from jsonb_each_text(coalesce(p_individuales, '{}')) c
+    join puntos_individuales p on p.id = c.key::bigint
+    where p.puntos is distinct from c.value::numeric;
+
+    insert into historial_puntos (lote, sesion_id, tabla, fila_id, anterior, nuevo, autor)
+    select v_lote, p.sesion_id, 'puntos_grupales', p.id, p.puntos, c.value::numeric, p_autor
+    from jsonb_each_text(coalesce(p_grupales, '{}')) c
+    join puntos_grupales p on p.id = c.key::bigint
+    where p.puntos is distinct from c.value::numeric;
+
+    update puntos_individuales p
+    set puntos = h.nuevo
+    from historial_puntos h
+    where h.lote = v_lote and h.tabla = 'puntos_individuales' and p.id = h.fila_id;
+
+    update puntos_grupales p
+    set puntos = h.nuevo
+    from historial_puntos h
+    where h.lote = v_lote and h.tabla = 'puntos_grupales' and p.id = h.fila_id;
+
+    -- Un cambio nuevo descarta los lotes deshechos de las mismas sesiones
+    delete from historial_puntos
+    where deshecho
+      and sesion_id in (select distinct sesion_id from historial_puntos where lote = v_lote);
+
+    return v_lote;
+end;
+$$;
+
+-- Aplica los valores anteriores (p_deshacer) o nuevos de un lote
+create or replace function aplicar_lote_historial(p_lote uuid, p_deshacer boolean)
+returns void
+language plpgsql
+as $$
+begin
+    update puntos_individuales p
+    set puntos = case when p_deshacer then h.anterior else h.nuevo end
+    from historial_puntos h
+    where h.lote = p_lote and h.tabla = 'puntos_individuales' and p.id = h.fila_id;
+
+    update puntos_grupales p
+    set puntos = case when p_deshacer then h.anterior else h.nuevo end
+    from historial_puntos h
+    where h.lote = p_lote and h.tabla = 'puntos_grupales' and p.id = h.fila_id;
+
+    update historial_puntos set deshecho = p_deshacer where lote = p_lote;
+end;
+$$;
+
+-- Deshace el último lote guardado de la sesión; devuelve el lote o null
+create or replace function deshacer_lote(p_sesion_id bigint)
+returns uuid
+language plpgsql
+as $$
+declare
+    v_lote uuid;
+begin
+    select lote into v_lote
+    from historial_puntos
+    where sesion_id = p_sesion_id and not deshecho
+    order by id desc
+    limit 1;
+
+    if v_lote is not null then
+        perform aplicar_lote_historial(v_lote, true);
+    end if;
+    return v_lote;
+end;
+$$;
+
+-- Rehace el último lote deshecho de la sesión; devuelve el lote o null
+create or replace function rehacer_lote(p_sesion_id bigint)
+returns uuid
+language plpgsql
+as $$
+declare
+    v_lote uuid;
+begin
+    -- Los lotes se deshacen del más nuevo al más viejo, así que el último
+    -- deshecho es el más antiguo de los que siguen deshechos
+    select lote into v_lote
+    from historial_puntos
+    where sesion_id = p_sesion_id and deshecho
+    order by id asc
+    limit 1;
+
+    if v_lote is not null then
+        perform aplicar_lote_historial(v_lote, false);
+    end if;
+    return v_lote;
+end;
+$$;
+
+-- Conserva solo los últimos p_conservar lotes de cada sesión
+create or replace function compactar_historial(p_conservar integer default 20)
+returns integer
+language plpgsql
+as $$
+declare
+    v_borradas integer;
+begin
+    with lotes as (
+        select lote, sesion_id, max(id) as ultimo
+        from historial_puntos
+        group by lote, sesion_id
+    ),
+    ordenados as (
+        select lote, row_number() over (partition by sesion_id order by ultimo desc) as posicion
+        from lotes
+    )
+    delete from historial_puntos h
+    using ordenados o
+    where h.lote = o.lote and o.posicion > p_conservar;
+    get diagnostics v_borradas = row_count;
+    return v_borradas;
+end;
+$$;
+
+-- Compactación periódica si la extensión pg_cron está disponible
+do $$
+begin
+    if exists (select 1 from pg_extension where extname = 'pg_cron') then
+        perform cron.schedule('compactar_historial_puntos', '0 4 * * *', 'select compactar_historial(20)');
+    end if;
+end;
+$$;
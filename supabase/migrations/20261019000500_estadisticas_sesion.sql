@@ -0,0 +1,43 @@
+-- Estadísticas precalculadas por sesión, recalculadas en lote desde la línea de comandos
+
+create table if not exists estadisticas_sesion (
+    sesion_id bigint primary key references sesiones (id) on delete cascade,
+    estudiantes integer not null default 0,
+    promedio numeric not null default 0,
+    maximo numeric not null default 0,
+    minimo numeric not null default 0,
+    sin_puntos integer not null default 0,
+    actualizado_en timestamptz not null default now()
+);
+
+-- Recalcula las estadísticas de todas las sesiones de un curso; devuelve cuántas se actualizaron
+create or replace function recalcular_estadisticas_curso(p_curso_id bigint)
+returns integer
+language plpgsql
+as $$
+declare
+    v_sesiones integer;
+begin
+    insert into estadisticas_sesion (sesion_id, estudiantes, promedio, maximo, minimo, sin_puntos, actualizado_en)
+    select s.id,
+           count(t.sesion_id),
+           coalesce(round(avg(t.total), 2), 0),
+           coalesce(max(t.total), 0),
+           coalesce(min(t.total), 0),
+           count(*) filter (where t.total = 0),
+           now()
+    from sesiones s
+    left join puntos_totales t on t.sesion_id = s.id
+    where s.curso_id = p_curso_id
+    group by s.id
+    on conflict (sesion_id) do update
+    set estudiantes = excluded.estudiantes,
+        promedio = excluded.promedio,
+        maximo = excluded.maximo,
+        minimo = excluded.minimo,
+        sin_puntos = excluded.sin_puntos,
+        actualizado_en = excluded.actualizado_en;
+    get diagnostics v_sesiones = row_count;
+    return v_sesiones;
+end;
+$$;
@@ -0,0 +1,71 @@
+-- Versión de los datos de cada curso; la API de solo lectura la usa para su caché y ETag
+
+create table if not exists versiones_curso (
+    curso_id bigint primary key references cursos (id) on delete cascade,
+    version bigint not null default 1,
+    actualizado_en timestamptz not null default now()
+);
+
+-- Incrementa la versión de los cursos afectados por una sentencia.
+-- Se usa desde triggers por sentencia cuya tabla de transición se llama "cambios",
+-- así una importación o un guardado masivo incrementa la versión una sola vez.
+create or replace function incrementar_version_curso()
+returns trigger
+language plpgsql
+as $$
+begin
+    if TG_TABLE_NAME in ('estudiantes_curso', 'grupos', 'sesiones') then
+        insert into versiones_curso (curso_id, version)
+        select distinct c.curso_id, 2 from cambios c
+        join cursos on cursos.id = c.curso_id
+        on conflict (curso_id) do update
+        set version = versiones_curso.version + 1, actualizado_en = now();
+    elsif TG_TABLE_NAME = 'estudiantes_grupo' then
+        insert into versiones_curso (curso_id, version)
+        select distinct g.curso_id, 2 from cambios c
+        join grupos g on g.id = c.grupo_id
+        on conflict (curso_id) do update
+        set version = versiones_curso.version + 1, actualizado_en = now();
+    elsif TG_TABLE_NAME in ('puntos_individuales', 'puntos_grupales') then
+        insert into versiones_curso (curso_id, version)
+        select distinct s.curso_id, 2 from cambios c
+        join sesiones s on s.id = c.sesion_id
+        on conflict (curso_id) do update
+        set version = versiones_curso.version + 1, actualizado_en = now();
+    end if;
+    return null;
+end;
+$$;
+
+do $$
+declare
+    v_tabla text;
+begin
+    foreach v_tabla in array array[
+        'estudiantes_curso', 'grupos', 'sesiones', 'estudiantes_grupo',
+        'puntos_individuales', 'puntos_grupales'
+    ] loop
+        execute format('drop trigger if exists version_insert on %I', v_tabla);
+        execute format('drop trigger if exists version_update on %I', v_tabla);
+        execute format('drop trigger if exists version_delete on %I', v_tabla);
+        execute format(
+            'create trigger version_insert after insert on %I referencing new table as cambios '
+            'for each statement execute function incrementar_version_curso()', v_tabla);
+        execute format(
+            'create trigger version_update after update on %I referencing new table as cambios '
+            'for each statement execute function incrementar_version_curso()', v_tabla);
+        execute format(
+            'create trigger version_delete after delete on %I referencing old table as cambios '
+            'for each statement execute function incrementar_version_curso()', v_tabla);
+    end loop;
+end;
+$$;
+
+-- Versión actual de un curso (1 si todavía no tiene cambios registrados)
+create or replace function version_curso(p_curso_id bigint)
+returns bigint
+language sql
+stable
+as $$
+    select coalesce((select version from versiones_curso where curso_id = p_curso_id), 1);
+$$;
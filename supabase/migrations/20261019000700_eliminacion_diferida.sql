@@ -0,0 +1,216 @@
+-- Eliminación diferida de cursos, sesiones y estudiantes
+-- Eliminar solo marca la fila; purgar_eliminados borra después sus datos en lotes acotados
+
+alter table cursos add column if not exists eliminado_en timestamptz;
+alter table sesiones add column if not exists eliminado_en timestamptz;
+alter table estudiantes_curso add column if not exists eliminado_en timestamptz;
+
+create index if not exists cursos_eliminado_idx on cursos (eliminado_en) where eliminado_en is not null;
+create index if not exists sesiones_eliminado_idx on sesiones (eliminado_en) where eliminado_en is not null;
+create index if not exists estudiantes_curso_eliminado_idx on estudiantes_curso (eliminado_en) where eliminado_en is not null;
+
+-- Un curso, sesión o estudiante eliminado no debe impedir volver a crearlo con
+-- el mismo nombre: la unicidad por nombre pasa a aplicarse solo a las filas activas.
+-- Se quitan únicamente las restricciones únicas sobre esas columnas de nombre
+do $$
+declare
+    v_restriccion record;
+begin
+    for v_restriccion in
+        select c.conrelid::regclass::text as tabla, c.conname as nombre
+        from pg_constraint c
+        cross join lateral (
+            select array_agg(a.attname::text order by a.attname) as columnas
+            from unnest(c.conkey) as k (attnum)
+            join pg_attribute a on a.attrelid = c.conrelid and a.attnum = k.attnum
+        ) claves
+        where c.contype = 'u'
+          and (
+              (c.conrelid = 'cursos'::regclass
+                  and claves.columnas = array['nombre'])
+              or (c.conrelid = 'sesiones'::regclass
+                  and claves.columnas = array['curso_id', 'nombre'])
+              or (c.conrelid = 'estudiantes_curso'::regclass
+                  and claves.columnas = array['apellidos', 'curso_id', 'nombres'])
+          )
+    loop
+        execute format('alter table %s drop constraint %I', v_restriccion.tabla, v_restriccion.nombre);
+    end loop;
+end;
+$$;
+
+create unique index if not exists cursos_activos_unicos
+    on cursos (nombre)
+    where eliminado_en is null;
+
+-- Conserva el nombre de la restricción anterior, que las páginas reconocen en los errores
+create unique index if not exists unique_sesion_curso
+    on sesiones (curso_id, nombre)
+    where eliminado_en is null;
+
+create unique index if not exists estudiantes_curso_activos_unicos
+    on estudiantes_curso (curso_id, apellidos, nombres)
+    where eliminado_en is null;
+
+-- Los puntos en 0 solo se crean para estudiantes activos
+create or replace function asegurar_puntos_sesion(p_sesion_id bigint)
+returns void
+language sql
+as $$
+    insert into puntos_individuales (sesion_id, estudiante_id, puntos)
+    select s.id, e.id, 0
+    from sesiones s
+    join estudiantes_curso e on e.curso_id = s.curso_id and e.eliminado_en is null
+    where s.id = p_sesion_id
+      and not exists (
+          select 1 from puntos_individuales p
+          where p.sesion_id = s.id and p.estudiante_id = e.id
+      );
+
+    insert into puntos_grupales (sesion_id, grupo_id, puntos)
+    select s.id, g.id, 0
+    from sesiones s
+    join grupos g on g.curso_id = s.curso_id
+    where s.id = p_sesion_id
+      and not exists (
+          select 1 from puntos_grupales p
+          where p.sesion_id = s.id and p.grupo_id = g.id
+      );
+$$;
+
+create or replace function puntos_acumulados_curso(p_curso_id bigint)
+returns table (estudiante_id bigint, puntos numeric)
+language sql
+stable
+as $$
+    select p.estudiante_id, sum(p.puntos)
+    from puntos_individuales p
+    join sesiones s on s.id = p.sesion_id
+    where s.curso_id = p_curso_id
+      and s.eliminado_en is null
+    group by p.estudiante_id;
+$$;
+
+-- Borra hasta p_lote filas dependientes de cursos, sesiones y estudiantes eliminados
+-- hace más de p_retencion. Las filas marcadas se borran recién cuando ya no les
+-- quedan datos dependientes. Devuelve la cantidad de filas borradas; se llama
+-- repetidamente hasta que devuelve 0.
+create or replace function purgar_eliminados(
+    p_lote integer default 5000,
+    p_retencion interval default interval '7 days'
+)
+returns integer
+language plpgsql
+as $$
+declare
+    v_limite timestamptz := now() - p_retencion;
+    v_total integer := 0;
+    v_filas integer;
+begin
+    create temporary table if not exists purga_cursos (id bigint primary key) on commit drop;
+    create temporary table if not exists purga_sesiones (id bigint primary key) on commit drop;
+    create temporary table if not exists purga_estudiantes (id bigint primary key) on commit drop;
+    create temporary table if not exists purga_grupos (id bigint primary key) on commit drop;
+    truncate purga_cursos, purga_sesiones, purga_estudiantes, purga_grupos;
+
+    insert into purga_cursos
+    select id from cursos where eliminado_en < v_limite;
+
+    insert into purga_sesiones
+    select id from sesiones
+    where eliminado_en < v_limite or curso_id in (select id from purga_cursos);
+
+    insert into purga_estudiantes
+    select id from estudiantes_curso
+    where eliminado_en < v_limite or curso_id in (select id from purga_cursos);
+
+    insert into purga_grupos
+    select id from grupos where curso_id in (select id from purga_cursos);
+
+    -- Puntos e integrantes, en lotes
+    delete from puntos_individuales where id in (
+        select id from puntos_individuales
+        where sesion_id in (select id from purga_sesiones)
+           or estudiante_id in (select id from purga_estudiantes)
+        limit p_lote
+    );
+    get diagnostics v_filas = row_count;
+    v_total := v_total + v_filas;
+
+    if v_total < p_lote then
+        delete from puntos_grupales where id in (
+            select id from puntos_grupales
+            where sesion_id in (select id from purga_sesiones)
+               or grupo_id in (select id from purga_grupos)
+            limit p_lote - v_total
+        );
+        get diagnostics v_filas = row_count;
+        v_total := v_total + v_filas;
+    end if;
+
+    if v_total < p_lote then
+        delete from estudiantes_grupo where id in (
+            select id from estudiantes_grupo
+            where estudiante_id in (select id from purga_estudiantes)
+               or grupo_id in (select id from purga_grupos)
+            limit p_lote - v_total
+        );
+        get diagnostics v_filas = row_count;
+        v_total := v_total + v_filas;
+    end if;
+
+    if v_total < p_lote then
+        delete from historial_puntos where id in (
+            select id from historial_puntos
+            where sesion_id in (select id from purga_sesiones)
+            limit p_lote - v_total
+        );
+        get diagnostics v_filas = row_count;
+        v_total := v_total + v_filas;
+    end if;
+
+    -- Filas marcadas que ya no tienen datos dependientes
+    if v_total < p_lote then
+        delete from sesiones s
+        where s.id in (select id from purga_sesiones)
+          and not exists (select 1 from puntos_individuales p where p.sesion_id = s.id)
+          and not exists (select 1 from puntos_grupales p where p.sesion_id = s.id)
+          and not exists (select 1 from historial_puntos h where h.sesion_id = s.id);
+        get diagnostics v_filas = row_count;
+        v_total := v_total + v_filas;
+
+        delete from estudiantes_curso e
+        where e.id in (select id from purga_estudiantes)
+          and not exists (select 1 from puntos_individuales p where p.estudiante_id = e.id)
+          and not exists (select 1 from estudiantes_grupo g where g.estudiante_id = e.id);
+        get diagnostics v_filas = row_count;
+        v_total := v_total + v_filas;
+
+        delete from grupos g
+        where g.id in (select id from purga_grupos)
+          and not exists (select 1 from puntos_grupales p where p.grupo_id = g.id)
+          and not exists (select 1 from estudiantes_grupo m where m.grupo_id = g.id);
+        get diagnostics v_filas = row_count;
+        v_total := v_total + v_filas;
+
+        delete from cursos c
+        where c.id in (select id from purga_cursos)
+          and not exists (select 1 from sesiones s where s.curso_id = c.id)
+          and not exists (select 1 from estudiantes_curso e where e.curso_id = c.id)
+          and not exists (select 1 from grupos g where g.curso_id = c.id);
+        get diagnostics v_filas = row_count;
+        v_total := v_total + v_filas;
+    end if;
+
+    return v_total;
+end;
+$$;
+
+-- Purga periódica si la extensión pg_cron está disponible
+do $$
+begin
+    if exists (select 1 from pg_extension where extname = 'pg_cron') then
+        perform cron.schedule('purgar_eliminados', '*/5 * * * *', 'select purgar_eliminados(5000)');
+    end if;
+end;
+$$;
@@ -0,0 +1,190 @@
+-- Archivo de cursos terminados en archivos Parquet del bucket "archivos"
+
+alter table cursos add column if not exists archivado_en timestamptz;
+alter table cursos add column if not exists archivo_ruta text;
+-- Un curso congelado es de solo lectura mientras se archiva (y después)
+alter table cursos add column if not exists congelado_en timestamptz;
+-- Versión de datos del curso que contiene el archivo; se sigue al vaciarlo
+alter table cursos add column if not exists archivo_version bigint;
+
+insert into storage.buckets (id, name, public)
+values ('archivos', 'archivos', false)
+on conflict (id) do nothing;
+
+-- Rechaza las altas y cambios en cursos congelados o archivados; los borrados
+-- se permiten para poder vaciarlos. Trigger por sentencia con tabla "cambios".
+create or replace function rechazar_curso_congelado()
+returns trigger
+language plpgsql
+as $$
+declare
+    v_curso_id bigint;
+begin
+    if TG_TABLE_NAME in ('estudiantes_curso', 'grupos', 'sesiones') then
+        select c.curso_id into v_curso_id from cambios c
+        join cursos on cursos.id = c.curso_id
+        where cursos.congelado_en is not null or cursos.archivado_en is not null
+        limit 1;
+    elsif TG_TABLE_NAME = 'estudiantes_grupo' then
+        select g.curso_id into v_curso_id from cambios c
+        join grupos g on g.id = c.grupo_id
+        join cursos on cursos.id = g.curso_id
+        where cursos.congelado_en is not null or cursos.archivado_en is not null
+        limit 1;
+    elsif TG_TABLE_NAME in ('puntos_individuales', 'puntos_grupales') then
+        select s.curso_id into v_curso_id from cambios c
+        join sesiones s on s.id = c.sesion_id
+        join cursos on cursos.id = s.curso_id
+        where cursos.congelado_en is not null or cursos.archivado_en is not null
+        limit 1;
+    end if;
+
+    if v_curso_id is not null then
+        raise exception 'curso_congelado: el curso % se está archivando o ya está archivado', v_curso_id;
+    end if;
+    return null;
+end;
+$$;
+
+do $$
+declare
+    v_tabla text;
+begin
+    foreach v_tabla in array array[
+        'estudiantes_curso', 'grupos', 'sesiones', 'estudiantes_grupo',
+        'puntos_individuales', 'puntos_grupales'
+    ] loop
+        execute format('drop trigger if exists congelado_insert on %I', v_tabla);
+        execute format('drop trigger if exists congelado_update on %I', v_tabla);
+        execute format(
+            'create trigger congelado_insert after insert on %I referencing new table as cambios '
+            'for each statement execute function rechazar_curso_congelado()', v_tabla);
+        execute format(
+            'create trigger congelado_update after update on %I referencing new table as cambios '
+            'for each statement execute function rechazar_curso_congelado()', v_tabla);
+    end loop;
+end;
+$$;
+
+-- Congela (o descongela si falla el archivo) un curso antes de leerlo para
+-- archivarlo. Devuelve la versión de sus datos en ese momento.
+create or replace function congelar_curso(p_curso_id bigint, p_congelar boolean default true)
+returns bigint
+language plpgsql
+as $$
+begin
+    update cursos
+    set congelado_en = case when p_congelar then now() end
+    where id = p_curso_id and eliminado_en is null and archivado_en is null;
+    if not found then
+        raise exception 'El curso % no existe o ya está archivado', p_curso_id;
+    end if;
+    return version_curso(p_curso_id);
+end;
+$$;
+
+-- Marca un curso congelado como archivado; desde ese momento se lee desde su archivo.
+-- p_version es la versión de los datos escritos en el archivo: si el curso
+-- cambió después de leerlo, no se marca.
+drop function if exists marcar_curso_archivado(bigint, text);
+create or replace function marcar_curso_archivado(p_curso_id bigint, p_ruta text, p_version bigint)
+returns void
+language plpgsql
+as $$
+begin
+    perform 1 from cursos
+    where id = p_curso_id and eliminado_en is null and congelado_en is not null
+    for update;
+    if not found then
+        raise exception 'El curso % no existe o no está congelado', p_curso_id;
+    end if;
+    if version_curso(p_curso_id) <> p_version then
+        raise exception 'El curso % cambió después de leerlo para archivarlo', p_curso_id;
+    end if;
+
+    update cursos
+    set archivado_en = now(), archivo_ruta = p_ruta, archivo_version = p_version
+    where id = p_curso_id;
+end;
+$$;
+
+-- Borra hasta p_lote filas de un curso ya archivado; se llama hasta que devuelve 0.
+-- La fila del curso se conserva con la ruta de su archivo.
+create or replace function vaciar_curso_archivado(p_curso_id bigint, p_lote integer default 5000)
+returns integer
+language plpgsql
+as $$
+declare
+    v_total integer := 0;
+    v_filas integer;
+begin
+    if not exists (select 1 from cursos where id = p_curso_id and archivado_en is not null) then
+        raise exception 'El curso % no está archivado', p_curso_id;
+    end if;
+    -- Solo este borrado cambia un curso archivado; cualquier otra diferencia
+    -- con la versión del archivo significa datos que el archivo no tiene
+    if version_curso(p_curso_id) is distinct from
+       (select archivo_version from cursos where id = p_curso_id for update) then
+        raise exception 'El curso % cambió después de archivarlo; no se borran sus filas', p_curso_id;
+    end if;
+
+    delete from puntos_individuales where id in (
+        select p.id from puntos_individuales p
+        join sesiones s on s.id = p.sesion_id
+        where s.curso_id = p_curso_id
+        limit p_lote
+    );
+    get diagnostics v_filas = row_count;
+    v_total := v_total + v_filas;
+
+    if v_total < p_lote then
+        delete from puntos_grupales where id in (
+            select p.id from puntos_grupales p
+            join sesiones s on s.id = p.sesion_id
+            where s.curso_id = p_curso_id
+            limit p_lote - v_total
+        );
+        get diagnostics v_filas = row_count;
+        v_total := v_total + v_filas;
+    end if;
+
+    if v_total < p_lote then
+        delete from historial_puntos where id in (
+            select h.id from historial_puntos h
+            join sesiones s on s.id = h.sesion_id
+            where s.curso_id = p_curso_id
+            limit p_lote - v_total
+        );
+        get diagnostics v_filas = row_count;
+        v_total := v_total + v_filas;
+    end if;
+
+    if v_total < p_lote then
+        delete from estudiantes_grupo where id in (
+            select m.id from estudiantes_grupo m
+            join grupos g on g.id = m.grupo_id
+            where g.curso_id = p_curso_id
+            limit p_lote - v_total
+        );
+        get diagnostics v_filas = row_count;
+        v_total := v_total + v_filas;
+    end if;
+
+    if v_total < p_lote then
+        delete from sesiones where curso_id = p_curso_id;
+        get diagnostics v_filas = row_count;
+        v_total := v_total + v_filas;
+
+        delete from grupos where curso_id = p_curso_id;
+        get diagnostics v_filas = row_count;
+        v_total := v_total + v_filas;
+
+        delete from estudiantes_curso where curso_id = p_curso_id;
+        get diagnostics v_filas = row_count;
+        v_total := v_total + v_filas;
+    end if;
+
+    update cursos set archivo_version = version_curso(p_curso_id) where id = p_curso_id;
+    return v_total;
+end;
+$$;
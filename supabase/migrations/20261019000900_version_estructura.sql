@@ -0,0 +1,54 @@
+-- Versión de la estructura de cada curso (estudiantes, grupos e integrantes).
+-- A diferencia de versiones_curso.version no cambia al guardar puntos, así la
+-- instantánea compartida del curso en la aplicación solo se reconstruye cuando
+-- cambia la lista de estudiantes o los grupos.
+
+alter table versiones_curso
+    add column if not exists version_estructura bigint not null default 1;
+
+create or replace function incrementar_version_curso()
+returns trigger
+language plpgsql
+as $$
+begin
+    if TG_TABLE_NAME in ('estudiantes_curso', 'grupos') then
+        insert into versiones_curso (curso_id, version, version_estructura)
+        select distinct c.curso_id, 2, 2 from cambios c
+        join cursos on cursos.id = c.curso_id
+        on conflict (curso_id) do update
+        set version = versiones_curso.version + 1,
+            version_estructura = versiones_curso.version_estructura + 1,
+            actualizado_en = now();
+    elsif TG_TABLE_NAME = 'sesiones' then
+        insert into versiones_curso (curso_id, version)
+        select distinct c.curso_id, 2 from cambios c
+        join cursos on cursos.id = c.curso_id
+        on conflict (curso_id) do update
+        set version = versiones_curso.version + 1, actualizado_en = now();
+    elsif TG_TABLE_NAME = 'estudiantes_grupo' then
+        insert into versiones_curso (curso_id, version, version_estructura)
+        select distinct g.curso_id, 2, 2 from cambios c
+        join grupos g on g.id = c.grupo_id
+        on conflict (curso_id) do update
+        set version = versiones_curso.version + 1,
+            version_estructura = versiones_curso.version_estructura + 1,
+            actualizado_en = now();
+    elsif TG_TABLE_NAME in ('puntos_individuales', 'puntos_grupales') then
+        insert into versiones_curso (curso_id, version)
+        select distinct s.curso_id, 2 from cambios c
+        join sesiones s on s.id = c.sesion_id
+        on conflict (curso_id) do update
+        set version = versiones_curso.version + 1, actualizado_en = now();
+    end if;
+    return null;
+end;
+$$;
+
+-- Versión de la estructura de un curso (1 si todavía no tiene cambios registrados)
+create or replace function version_estructura_curso(p_curso_id bigint)
+returns bigint
+language sql
+stable
+as $$
+    select coalesce((select version_estructura from versiones_curso where curso_id = p_curso_id), 1);
+$$;
@@ -0,0 +1,71 @@
+-- Versiones que usa la caché compartida de la aplicación.
+-- Las sesiones pasan a contar como estructura del curso, y la lista de cursos
+-- tiene su propia versión de catálogo. Así la aplicación puede comprobar con una
+-- sola llamada si lo que tiene guardado sigue vigente.
+
+create or replace function incrementar_version_curso()
+returns trigger
+language plpgsql
+as $$
+begin
+    if TG_TABLE_NAME in ('estudiantes_curso', 'grupos', 'sesiones') then
+        insert into versiones_curso (curso_id, version, version_estructura)
+        select distinct c.curso_id, 2, 2 from cambios c
+        join cursos on cursos.id = c.curso_id
+        on conflict (curso_id) do update
+        set version = versiones_curso.version + 1,
+            version_estructura = versiones_curso.version_estructura + 1,
+            actualizado_en = now();
+    elsif TG_TABLE_NAME = 'estudiantes_grupo' then
+        insert into versiones_curso (curso_id, version, version_estructura)
+        select distinct g.curso_id, 2, 2 from cambios c
+        join grupos g on g.id = c.grupo_id
+        on conflict (curso_id) do update
+        set version = versiones_curso.version + 1,
+            version_estructura = versiones_curso.version_estructura + 1,
+            actualizado_en = now();
+    elsif TG_TABLE_NAME in ('puntos_individuales', 'puntos_grupales') then
+        insert into versiones_curso (curso_id, version)
+        select distinct s.curso_id, 2 from cambios c
+        join sesiones s on s.id = c.sesion_id
+        on conflict (curso_id) do update
+        set version = versiones_curso.version + 1, actualizado_en = now();
+    end if;
+    return null;
+end;
+$$;
+
+-- Versión de la lista de cursos (altas, cambios de nombre, eliminados y archivados)
+create table if not exists version_catalogo (
+    id smallint primary key default 1 check (id = 1),
+    version bigint not null default 1,
+    actualizado_en timestamptz not null default now()
+);
+
+insert into version_catalogo (id) values (1) on conflict (id) do nothing;
+
+create or replace function incrementar_version_catalogo()
+returns trigger
+language plpgsql
+as $$
+begin
+    update version_catalogo set version = version + 1, actualizado_en = now() where id = 1;
+    return null;
+end;
+$$;
+
+drop trigger if exists version_catalogo on cursos;
+create trigger version_catalogo after insert or update or delete on cursos
+for each statement execute function incrementar_version_catalogo();
+
+-- Versión del catálogo y, si se indica un curso, la de su estructura
+create or replace function versiones_cache(p_curso_id bigint default null)
+returns jsonb
+language sql
+stable
+as $$
+    select jsonb_build_object(
+        'catalogo', (select version from version_catalogo where id = 1),
+        'estructura', case when p_curso_id is not null then version_estructura_curso(p_curso_id) end
+    );
+$$;
@@ -0,0 +1,75 @@
+-- Peso de cada sesión en la nota final y matriz de totales para calcularla.
+-- La matriz se arma en el servidor y viaja como un solo jsonb, así un curso de
+-- 500 estudiantes y 60 sesiones no choca con el límite de filas de PostgREST.
+
+alter table sesiones add column if not exists peso numeric not null default 1;
+
+alter table sesiones drop constraint if exists sesiones_peso_no_negativo;
+alter table sesiones add constraint sesiones_peso_no_negativo check (peso >= 0);
+
+-- {sesiones: [...], estudiantes: [...], totales: [[total por sesión] por estudiante]}
+-- Sesiones por fecha y estudiantes por apellidos; el total es el puntaje individual
+-- más los puntos de todos los grupos del estudiante, igual que en la aplicación.
+create or replace function matriz_notas_curso(p_curso_id bigint)
+returns jsonb
+language sql
+stable
+as $$
+    with sesiones_curso as (
+        select id, nombre, fecha, puntaje_maximo, peso
+        from sesiones
+        where curso_id = p_curso_id and eliminado_en is null
+    ),
+    estudiantes as (
+        select id, apellidos, nombres
+        from estudiantes_curso
+        where curso_id = p_curso_id and eliminado_en is null
+    ),
+    grupales as (
+        select pg.sesion_id, eg.estudiante_id, sum(pg.puntos) as puntos
+        from puntos_grupales pg
+        join sesiones_curso s on s.id = pg.sesion_id
+        join estudiantes_grupo eg on eg.grupo_id = pg.grupo_id
+        group by pg.sesion_id, eg.estudiante_id
+    ),
+    filas as (
+        select e.id as estudiante_id,
+               jsonb_agg(
+                   coalesce(pi.puntos, 0) + coalesce(g.puntos, 0)
+                   order by s.fecha, s.id
+               ) as totales
+        from estudiantes e
+        cross join sesiones_curso s
+        left join puntos_individuales pi on pi.sesion_id = s.id and pi.estudiante_id = e.id
+        left join grupales g on g.sesion_id = s.id and g.estudiante_id = e.id
+        group by e.id
+    )
+    select jsonb_build_object(
+        'sesiones', coalesce(
+            (select jsonb_agg(to_jsonb(s) order by s.fecha, s.id) from sesiones_curso s), '[]'::jsonb),
+        'estudiantes', coalesce(
+            (select jsonb_agg(to_jsonb(e) order by e.apellidos, e.nombres, e.id) from estudiantes e), '[]'::jsonb),
+        'totales', coalesce(
+            (select jsonb_agg(coalesce(f.totales, '[]'::jsonb) order by e.apellidos, e.nombres, e.id)
+             from estudiantes e
+             left join filas f on f.estudiante_id = e.id), '[]'::jsonb)
+    );
+$$;
+
+-- Actualiza el peso de varias sesiones del curso con una sentencia; p_pesos es {sesion_id: peso}
+create or replace function fijar_pesos_sesiones(p_curso_id bigint, p_pesos jsonb)
+returns integer
+language plpgsql
+as $$
+declare
+    v_sesiones integer;
+begin
+    update sesiones s
+    set peso = (p_pesos ->> s.id::text)::numeric
+    where s.curso_id = p_curso_id
+      and p_pesos ? s.id::text
+      and s.peso is distinct from (p_pesos ->> s.id::text)::numeric;
+    get diagnostics v_sesiones = row_count;
+    return v_sesiones;
+end;
+$$;
@@ -0,0 +1,56 @@
+-- La matriz del curso incluye también los puntos individuales de cada sesión,
+-- que el reporte de participación usa para detectar estudiantes sin puntos.
+-- Una fila de puntos que todavía no existe cuenta como 0; `con_puntos` indica
+-- si la sesión ya se abrió y tiene filas de puntos, porque se crean al abrirla.
+
+create or replace function matriz_notas_curso(p_curso_id bigint)
+returns jsonb
+language sql
+stable
+as $$
+    with sesiones_curso as (
+        select s.id, s.nombre, s.fecha, s.puntaje_maximo, s.peso,
+               exists (select 1 from puntos_individuales p where p.sesion_id = s.id) as con_puntos
+        from sesiones s
+        where s.curso_id = p_curso_id and s.eliminado_en is null
+    ),
+    estudiantes as (
+        select id, apellidos, nombres
+        from estudiantes_curso
+        where curso_id = p_curso_id and eliminado_en is null
+    ),
+    grupales as (
+        select pg.sesion_id, eg.estudiante_id, sum(pg.puntos) as puntos
+        from puntos_grupales pg
+        join sesiones_curso s on s.id = pg.sesion_id
+        join estudiantes_grupo eg on eg.grupo_id = pg.grupo_id
+        group by pg.sesion_id, eg.estudiante_id
+    ),
+    filas as (
+        select e.id as estudiante_id,
+               jsonb_agg(
+                   coalesce(pi.puntos, 0) + coalesce(g.puntos, 0)
+                   order by s.fecha, s.id
+               ) as totales,
+               jsonb_agg(coalesce(pi.puntos, 0) order by s.fecha, s.id) as individuales
+        from estudiantes e
+        cross join sesiones_curso s
+        left join puntos_individuales pi on pi.sesion_id = s.id and pi.estudiante_id = e.id
+        left join grupales g on g.sesion_id = s.id and g.estudiante_id = e.id
+        group by e.id
+    )
+    select jsonb_build_object(
+        'sesiones', coalesce(
+            (select jsonb_agg(to_jsonb(s) order by s.fecha, s.id) from sesiones_curso s), '[]'::jsonb),
+        'estudiantes', coalesce(
+            (select jsonb_agg(to_jsonb(e) order by e.apellidos, e.nombres, e.id) from estudiantes e), '[]'::jsonb),
+        'totales', coalesce(
+            (select jsonb_agg(coalesce(f.totales, '[]'::jsonb) order by e.apellidos, e.nombres, e.id)
+             from estudiantes e
+             left join filas f on f.estudiante_id = e.id), '[]'::jsonb),
+        'individuales', coalesce(
+            (select jsonb_agg(coalesce(f.individuales, '[]'::jsonb) order by e.apellidos, e.nombres, e.id)
+             from estudiantes e
+             left join filas f on f.estudiante_id = e.id), '[]'::jsonb)
+    );
+$$;
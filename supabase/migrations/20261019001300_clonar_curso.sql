@@ -0,0 +1,95 @@
+-- Clona un curso para un nuevo periodo en una sola transacción: estudiantes,
+-- grupos con sus integrantes y, opcionalmente, el calendario de sesiones.
+-- Los ids nuevos se reservan de las secuencias antes de insertar, así las
+-- integrantes de cada grupo se reasignan con un join y no fila por fila.
+-- Los puntos no se copian; las páginas los crean al abrir cada sesión.
+
+-- p_inicio_sesiones: si no es null se copian las sesiones, corridas para que
+-- la primera caiga en esa fecha y conservando la distancia entre ellas.
+-- Devuelve {curso_id, estudiantes, grupos, miembros, sesiones}.
+create or replace function clonar_curso(
+    p_curso_id bigint,
+    p_nombre text,
+    p_inicio_sesiones date default null
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_curso_id bigint;
+    v_estudiantes integer;
+    v_grupos integer;
+    v_miembros integer;
+    v_sesiones integer := 0;
+    v_desplazamiento integer;
+begin
+    if not exists (
+        select 1 from cursos
+        where id = p_curso_id and eliminado_en is null and archivado_en is null
+    ) then
+        raise exception 'El curso % no existe o está archivado', p_curso_id;
+    end if;
+
+    insert into cursos (nombre) values (p_nombre) returning id into v_curso_id;
+
+    with mapa_estudiantes as (
+        select id as viejo,
+               nextval(pg_get_serial_sequence('estudiantes_curso', 'id')) as nuevo,
+               apellidos, nombres
+        from estudiantes_curso
+        where curso_id = p_curso_id and eliminado_en is null
+    ),
+    mapa_grupos as (
+        select id as viejo,
+               nextval(pg_get_serial_sequence('grupos', 'id')) as nuevo,
+               nombre
+        from grupos
+        where curso_id = p_curso_id
+    ),
+    estudiantes_nuevos as (
+        insert into estudiantes_curso (id, curso_id, apellidos, nombres)
+        overriding system value
+        select nuevo, v_curso_id, apellidos, nombres from mapa_estudiantes
+        returning 1
+    ),
+    grupos_nuevos as (
+        insert into grupos (id, curso_id, nombre)
+        overriding system value
+        select nuevo, v_curso_id, nombre from mapa_grupos
+        returning 1
+    ),
+    miembros_nuevos as (
+        insert into estudiantes_grupo (grupo_id, estudiante_id)
+        select g.nuevo, e.nuevo
+        from estudiantes_grupo eg
+        join mapa_grupos g on g.viejo = eg.grupo_id
+        join mapa_estudiantes e on e.viejo = eg.estudiante_id
+        returning 1
+    )
+    select (select count(*) from estudiantes_nuevos),
+           (select count(*) from grupos_nuevos),
+           (select count(*) from miembros_nuevos)
+    into v_estudiantes, v_grupos, v_miembros;
+
+    if p_inicio_sesiones is not null then
+        select p_inicio_sesiones - min(fecha)::date into v_desplazamiento
+        from sesiones
+        where curso_id = p_curso_id and eliminado_en is null;
+
+        insert into sesiones (curso_id, nombre, fecha, puntaje_maximo, peso)
+        select v_curso_id, nombre, fecha::date + v_desplazamiento, puntaje_maximo, peso
+        from sesiones
+        where curso_id = p_curso_id and eliminado_en is null
+        order by fecha, id;
+        get diagnostics v_sesiones = row_count;
+    end if;
+
+    return jsonb_build_object(
+        'curso_id', v_curso_id,
+        'estudiantes', v_estudiantes,
+        'grupos', v_grupos,
+        'miembros', v_miembros,
+        'sesiones', v_sesiones
+    );
+end;
+$$;
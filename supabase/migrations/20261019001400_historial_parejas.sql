@@ -0,0 +1,44 @@
+-- Historial de compañeros de grupo por curso
+-- Cada vez que alguien entra a un grupo se registran sus parejas con los demás
+-- integrantes; el registro queda aunque después el grupo se disuelva, así el
+-- modo "Evitar compañeros anteriores" puede consultarlo al rearmar grupos.
+
+create table if not exists parejas_historial (
+    id bigint generated always as identity primary key,
+    curso_id bigint not null references cursos (id) on delete cascade,
+    estudiante_a bigint not null references estudiantes_curso (id) on delete cascade,
+    estudiante_b bigint not null references estudiantes_curso (id) on delete cascade,
+    creado_en timestamptz not null default now(),
+    check (estudiante_a < estudiante_b),
+    unique (curso_id, estudiante_a, estudiante_b)
+);
+
+create or replace function registrar_parejas()
+returns trigger
+language plpgsql
+as $$
+begin
+    insert into parejas_historial (curso_id, estudiante_a, estudiante_b)
+    select distinct g.curso_id,
+           least(n.estudiante_id, eg.estudiante_id),
+           greatest(n.estudiante_id, eg.estudiante_id)
+    from nuevos n
+    join grupos g on g.id = n.grupo_id
+    join estudiantes_grupo eg on eg.grupo_id = n.grupo_id and eg.estudiante_id <> n.estudiante_id
+    on conflict (curso_id, estudiante_a, estudiante_b) do nothing;
+    return null;
+end;
+$$;
+
+drop trigger if exists parejas_insert on estudiantes_grupo;
+create trigger parejas_insert after insert on estudiantes_grupo
+    referencing new table as nuevos
+    for each statement execute function registrar_parejas();
+
+-- Los grupos que ya existen forman el historial inicial
+insert into parejas_historial (curso_id, estudiante_a, estudiante_b)
+select distinct g.curso_id, a.estudiante_id, b.estudiante_id
+from estudiantes_grupo a
+join estudiantes_grupo b on b.grupo_id = a.grupo_id and a.estudiante_id < b.estudiante_id
+join grupos g on g.id = a.grupo_id
+on conflict (curso_id, estudiante_a, estudiante_b) do nothing;
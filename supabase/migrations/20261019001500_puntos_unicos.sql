@@ -0,0 +1,48 @@
+-- Un solo registro de puntos por estudiante (o grupo) y sesión.
+-- Los registros se crean al abrir cada sesión; con estos índices dos personas
+-- que la abren a la vez no pueden duplicarlos.
+
+-- Si ya hay duplicados se conserva el de más puntos (y el más antiguo si empatan)
+delete from puntos_individuales p
+using (
+    select id, row_number() over (
+        partition by sesion_id, estudiante_id order by puntos desc, id
+    ) as posicion
+    from puntos_individuales
+) d
+where d.id = p.id and d.posicion > 1;
+
+delete from puntos_grupales p
+using (
+    select id, row_number() over (
+        partition by sesion_id, grupo_id order by puntos desc, id
+    ) as posicion
+    from puntos_grupales
+) d
+where d.id = p.id and d.posicion > 1;
+
+create unique index if not exists puntos_individuales_sesion_estudiante_unico
+    on puntos_individuales (sesion_id, estudiante_id);
+
+create unique index if not exists puntos_grupales_sesion_grupo_unico
+    on puntos_grupales (sesion_id, grupo_id);
+
+-- Los puntos en 0 que falten, sin chocar con los que cree otra sesión a la vez
+create or replace function asegurar_puntos_sesion(p_sesion_id bigint)
+returns void
+language sql
+as $$
+    insert into puntos_individuales (sesion_id, estudiante_id, puntos)
+    select s.id, e.id, 0
+    from sesiones s
+    join estudiantes_curso e on e.curso_id = s.curso_id and e.eliminado_en is null
+    where s.id = p_sesion_id
+    on conflict (sesion_id, estudiante_id) do nothing;
+
+    insert into puntos_grupales (sesion_id, grupo_id, puntos)
+    select s.id, g.id, 0
+    from sesiones s
+    join grupos g on g.curso_id = s.curso_id
+    where s.id = p_sesion_id
+    on conflict (sesion_id, grupo_id) do nothing;
+$$;
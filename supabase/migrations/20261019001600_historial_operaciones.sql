@@ -0,0 +1,267 @@
+-- Las operaciones masivas y el reescalado registran sus cambios en el historial.
+-- Cada una arma {id de la fila: puntos nuevos} y lo guarda con
+-- guardar_puntos_con_historial, así todas las escrituras de puntos de una sesión
+-- forman una sola secuencia de lotes y deshacer / rehacer nunca pisa un cambio
+-- que no está registrado.
+
+drop function if exists puntos_fijar_todos(bigint, numeric);
+drop function if exists puntos_sumar_todos(bigint, numeric, bigint[]);
+drop function if exists puntos_sumar_grupo(bigint, bigint, numeric);
+drop function if exists puntos_copiar_sesion(bigint, bigint);
+drop function if exists puntos_reiniciar(bigint);
+drop function if exists reescalar_puntaje_sesion(bigint, numeric);
+
+-- Asigna el mismo puntaje individual a todos los estudiantes
+create or replace function puntos_fijar_todos(p_sesion_id bigint, p_puntos numeric, p_autor text default null)
+returns integer
+language plpgsql
+as $$
+declare
+    v_filas integer;
+    v_cambios jsonb;
+begin
+    if p_puntos < 0 or p_puntos > puntaje_maximo_sesion(p_sesion_id) then
+        raise exception 'Los puntos deben estar entre 0 y el puntaje máximo de la sesión';
+    end if;
+
+    perform asegurar_puntos_sesion(p_sesion_id);
+
+    select count(*), coalesce(jsonb_object_agg(id, p_puntos), '{}')
+    into v_filas, v_cambios
+    from puntos_individuales
+    where sesion_id = p_sesion_id;
+
+    perform guardar_puntos_con_historial(v_cambios, '{}', p_autor);
+    return v_filas;
+end;
+$$;
+
+-- Suma (o resta) puntos individuales a todos menos los estudiantes de p_excluir
+create or replace function puntos_sumar_todos(
+    p_sesion_id bigint,
+    p_delta numeric,
+    p_excluir bigint[] default '{}',
+    p_autor text default null
+)
+returns integer
+language plpgsql
+as $$
+declare
+    v_maximo numeric := puntaje_maximo_sesion(p_sesion_id);
+    v_filas integer;
+    v_cambios jsonb;
+begin
+    perform asegurar_puntos_sesion(p_sesion_id);
+
+    if exists (
+        select 1 from puntos_individuales
+        where sesion_id = p_sesion_id
+          and estudiante_id <> all (coalesce(p_excluir, '{}'))
+          and (puntos + p_delta > v_maximo or puntos + p_delta < 0)
+    ) then
+        raise exception 'La operación dejaría estudiantes fuera del rango 0 - %', v_maximo;
+    end if;
+
+    select count(*), coalesce(jsonb_object_agg(id, puntos + p_delta), '{}')
+    into v_filas, v_cambios
+    from puntos_individuales
+    where sesion_id = p_sesion_id
+      and estudiante_id <> all (coalesce(p_excluir, '{}'));
+
+    perform guardar_puntos_con_historial(v_cambios, '{}', p_autor);
+    return v_filas;
+end;
+$$;
+
+-- Suma (o resta) puntos individuales a todos los integrantes de un grupo
+create or replace function puntos_sumar_grupo(
+    p_sesion_id bigint,
+    p_grupo_id bigint,
+    p_delta numeric,
+    p_autor text default null
+)
+returns integer
+language plpgsql
+as $$
+declare
+    v_maximo numeric := puntaje_maximo_sesion(p_sesion_id);
+    v_filas integer;
+    v_cambios jsonb;
+begin
+    perform asegurar_puntos_sesion(p_sesion_id);
+
+    if exists (
+        select 1 from puntos_individuales p
+        join estudiantes_grupo eg on eg.estudiante_id = p.estudiante_id
+        where p.sesion_id = p_sesion_id
+          and eg.grupo_id = p_grupo_id
+          and (p.puntos + p_delta > v_maximo or p.puntos + p_delta < 0)
+    ) then
+        raise exception 'La operación dejaría integrantes del grupo fuera del rango 0 - %', v_maximo;
+    end if;
+
+    select count(*), coalesce(jsonb_object_agg(p.id, p.puntos + p_delta), '{}')
+    into v_filas, v_cambios
+    from puntos_individuales p
+    join estudiantes_grupo eg on eg.estudiante_id = p.estudiante_id
+    where eg.grupo_id = p_grupo_id
+      and p.sesion_id = p_sesion_id;
+
+    perform guardar_puntos_con_historial(v_cambios, '{}', p_autor);
+    return v_filas;
+end;
+$$;
+
+-- Copia los puntos individuales y grupales de otra sesión del mismo curso
+create or replace function puntos_copiar_sesion(p_origen_id bigint, p_destino_id bigint, p_autor text default null)
+returns integer
+language plpgsql
+as $$
+declare
+    v_maximo numeric := puntaje_maximo_sesion(p_destino_id);
+    v_filas integer;
+    v_individuales jsonb;
+    v_grupales jsonb;
+begin
+    if (select curso_id from sesiones where id = p_origen_id)
+       is distinct from (select curso_id from sesiones where id = p_destino_id) then
+        raise exception 'Las sesiones deben pertenecer al mismo curso';
+    end if;
+
+    if exists (select 1 from puntos_individuales where sesion_id = p_origen_id and puntos > v_maximo)
+       or exists (select 1 from puntos_grupales where sesion_id = p_origen_id and puntos > v_maximo) then
+        raise exception 'La sesión de origen tiene puntos mayores al máximo de esta sesión (%)', v_maximo;
+    end if;
+
+    perform asegurar_puntos_sesion(p_destino_id);
+
+    select count(*), coalesce(jsonb_object_agg(d.id, coalesce(o.puntos, 0)), '{}')
+    into v_filas, v_individuales
+    from puntos_individuales d
+    left join puntos_individuales o
+      on o.sesion_id = p_origen_id and o.estudiante_id = d.estudiante_id
+    where d.sesion_id = p_destino_id;
+
+    select coalesce(jsonb_object_agg(d.id, coalesce(o.puntos, 0)), '{}')
+    into v_grupales
+    from puntos_grupales d
+    left join puntos_grupales o
+      on o.sesion_id = p_origen_id and o.grupo_id = d.grupo_id
+    where d.sesion_id = p_destino_id;
+
+    perform guardar_puntos_con_historial(v_individuales, v_grupales, p_autor);
+    return v_filas;
+end;
+$$;
+
+-- Deja en 0 todos los puntos individuales y grupales de la sesión
+create or replace function puntos_reiniciar(p_sesion_id bigint, p_autor text default null)
+returns integer
+language plpgsql
+as $$
+declare
+    v_filas integer;
+    v_individuales jsonb;
+    v_grupales jsonb;
+begin
+    perform puntaje_maximo_sesion(p_sesion_id);
+
+    select count(*), coalesce(jsonb_object_agg(id, 0), '{}')
+    into v_filas, v_individuales
+    from puntos_individuales
+    where sesion_id = p_sesion_id;
+
+    select coalesce(jsonb_object_agg(id, 0), '{}')
+    into v_grupales
+    from puntos_grupales
+    where sesion_id = p_sesion_id;
+
+    perform guardar_puntos_con_historial(v_individuales, v_grupales, p_autor);
+    return v_filas;
+end;
+$$;
+
+-- Cambia el puntaje máximo reescalando proporcionalmente todos los puntos
+-- de la sesión (redondeados al paso de 0.5 que usa la interfaz)
+create or replace function reescalar_puntaje_sesion(
+    p_sesion_id bigint,
+    p_nuevo_maximo numeric,
+    p_autor text default null
+)
+returns void
+language plpgsql
+as $$
+declare
+    v_maximo_actual numeric;
+    v_individuales jsonb;
+    v_grupales jsonb;
+begin
+    if p_nuevo_maximo is null or p_nuevo_maximo <= 0 then
+        raise exception 'El puntaje debe ser un número positivo';
+    end if;
+
+    select puntaje_maximo into v_maximo_actual
+    from sesiones
+    where id = p_sesion_id
+    for update;
+
+    if v_maximo_actual is null then
+        raise exception 'La sesión % no existe', p_sesion_id;
+    end if;
+
+    select coalesce(jsonb_object_agg(
+               id, least(round(puntos * p_nuevo_maximo / v_maximo_actual * 2) / 2, p_nuevo_maximo)
+           ), '{}')
+    into v_individuales
+    from puntos_individuales
+    where sesion_id = p_sesion_id;
+
+    select coalesce(jsonb_object_agg(
+               id, least(round(puntos * p_nuevo_maximo / v_maximo_actual * 2) / 2, p_nuevo_maximo)
+           ), '{}')
+    into v_grupales
+    from puntos_grupales
+    where sesion_id = p_sesion_id;
+
+    perform guardar_puntos_con_historial(v_individuales, v_grupales, p_autor);
+
+    update sesiones
+    set puntaje_maximo = p_nuevo_maximo
+    where id = p_sesion_id;
+end;
+$$;
+
+-- Aplica los valores anteriores (p_deshacer) o nuevos de un lote.
+-- El puntaje máximo de la sesión no forma parte del historial: si deshacer un
+-- reescalado devolvería puntos mayores al máximo actual, se rechaza hasta que
+-- se vuelva a subir el máximo
+create or replace function aplicar_lote_historial(p_lote uuid, p_deshacer boolean)
+returns void
+language plpgsql
+as $$
+declare
+    v_maximo numeric;
+begin
+    select max(s.puntaje_maximo) into v_maximo
+    from historial_puntos h
+    join sesiones s on s.id = h.sesion_id
+    where h.lote = p_lote
+      and case when p_deshacer then h.anterior else h.nuevo end > s.puntaje_maximo;
+
+    if v_maximo is not null then
+        raise exception 'lote_fuera_de_rango: el lote tiene puntos mayores al máximo de la sesión (%)', v_maximo;
+    end if;
+
+    update puntos_individuales p
+    set puntos = case when p_deshacer then h.anterior else h.nuevo end
+    from historial_puntos h
+    where h.lote = p_lote and h.tabla = 'puntos_individuales' and p.id = h.fila_id;
+
+    update puntos_grupales p
+    set puntos = case when p_deshacer then h.anterior else h.nuevo end
+    from historial_puntos h
+    where h.lote = p_lote and h.tabla = 'puntos_grupales' and p.id = h.fila_id;
+
+    update historial_puntos set deshecho = p_deshacer where lote = p_lote;
+end;
+$$;
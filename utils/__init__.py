@@ -0,0 +1,2 @@
+# utils/__init__.py
+# Módulos compartidos por la página principal y las páginas de la aplicación
@@ -0,0 +1,175 @@
+# utils/archivo.py
+import hashlib
+import io
+import json
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from utils.cargador import TAMANO_LOTE
+
+BUCKET = 'archivos'
+# Filas por página al leer un curso completo (límite de filas por respuesta de PostgREST)
+TAMANO_PAGINA = 1000
+# Tablas descargadas que se guardan en memoria; los archivos no cambian una vez escritos
+MAX_TABLAS_EN_MEMORIA = 64
+
+TABLAS = ['sesiones', 'estudiantes', 'grupos', 'miembros', 'puntos_individuales', 'puntos_grupales']
+# Orden en que exportacion.datos_curso devuelve las tablas; el archivo se guarda por id
+ORDEN = {'sesiones': 'fecha', 'estudiantes': 'apellidos'}
+
+_tablas_descargadas = OrderedDict()
+
+
+def leer_todo(consulta):
+    """Lee todas las filas de una consulta paginando por id
+
+    `consulta` devuelve la consulta base sin ejecutar.
+    """
+    filas, inicio = [], 0
+    while True:
+        pagina = consulta().order('id').range(inicio, inicio + TAMANO_PAGINA - 1).execute().data
+        filas.extend(pagina)
+        if len(pagina) < TAMANO_PAGINA:
+            return filas
+        inicio += TAMANO_PAGINA
+
+
+def leer_curso_vivo(supabase, curso_id):
+    """Todas las filas activas de un curso, con el formato de exportacion.datos_curso"""
+    sesiones = leer_todo(lambda: supabase.table('sesiones').select('*')
+                         .eq('curso_id', curso_id).is_('eliminado_en', 'null'))
+    estudiantes = leer_todo(lambda: supabase.table('estudiantes_curso').select('*')
+                            .eq('curso_id', curso_id).is_('eliminado_en', 'null'))
+    grupos = leer_todo(lambda: supabase.table('grupos').select('*').eq('curso_id', curso_id))
+
+    ids_estudiantes = {e['id'] for e in estudiantes}
+    miembros = [
+        {k: v for k, v in m.items() if k != 'grupos'}
+        for m in leer_todo(lambda: supabase.table('estudiantes_grupo')
+                           .select('*, grupos!inner(curso_id)').eq('grupos.curso_id', curso_id))
+        if m['estudiante_id'] in ids_estudiantes
+    ]
+
+    datos = {
+        'sesiones': sesiones,
+        'estudiantes': estudiantes,
+        'grupos': grupos,
+        'miembros': miembros,
+        'puntos_individuales': [],
+        'puntos_grupales': [],
+    }
+    ids_sesiones = [s['id'] for s in sesiones]
+    for tabla in ('puntos_individuales', 'puntos_grupales'):
+        for i in range(0, len(ids_sesiones), TAMANO_LOTE):
+            lote = ids_sesiones[i:i + TAMANO_LOTE]
+            datos[tabla].extend(leer_todo(
+                lambda: supabase.table(tabla).select('*').in_('sesion_id', lote)
+            ))
+    return datos
+
+
+def a_parquet(filas):
+    """Serializa una lista de filas en Parquet comprimido con zstd"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pylist(filas), buffer, compression='zstd')
+    return buffer.getvalue()
+
+
+def de_parquet(contenido):
+    """Lee un archivo Parquet como lista de filas con tipos de Python"""
+    import pyarrow.parquet as pq
+
+    return pq.read_table(io.BytesIO(contenido)).to_pylist()
+
+
+def _ruta_tabla(ruta, nombre):
+    return f"{ruta}/{nombre}.parquet"
+
+
+def verificar_archivo(supabase, ruta, datos):
+    """Descarga el archivo escrito y comprueba que coincide fila por fila con `datos`"""
+    almacenamiento = supabase.storage.from_(BUCKET)
+    manifiesto = json.loads(almacenamiento.download(f"{ruta}/manifiesto.json"))
+    for nombre in TABLAS:
+        contenido = almacenamiento.download(_ruta_tabla(ruta, nombre))
+        esperado = manifiesto['tablas'][nombre]
+        if hashlib.sha256(contenido).hexdigest() != esperado['sha256']:
+            raise ValueError(f"El archivo de {nombre} no coincide con su suma de verificación")
+        if de_parquet(contenido) != datos[nombre]:
+            raise ValueError(f"El archivo de {nombre} no coincide con los datos del curso")
+
+
+def archivar_curso(supabase, curso_id, lote=5000):
+    """Escribe el curso en Parquet, lo verifica y quita sus filas de las tablas activas
+
+    El curso se congela antes de leerlo, así nadie guarda puntos que el archivo
+    no tendría; si algo falla antes de marcarlo como archivado se descongela.
+    Las filas se borran en lotes de `lote` y el curso queda con la ruta de su
+    archivo. Devuelve el manifiesto con la cantidad de filas por tabla.
+    """
+    version = supabase.rpc('congelar_curso', {'p_curso_id': curso_id}).execute().data
+    try:
+        datos = leer_curso_vivo(supabase, curso_id)
+        marca = datetime.now(timezone.utc)
+        ruta = f"cursos/{curso_id}/{marca.strftime('%Y%m%d%H%M%S')}"
+
+        almacenamiento = supabase.storage.from_(BUCKET)
+        manifiesto = {'curso_id': curso_id, 'version': version, 'creado_en': marca.isoformat(), 'tablas': {}}
+        for nombre in TABLAS:
+            contenido = a_parquet(datos[nombre])
+            almacenamiento.upload(_ruta_tabla(ruta, nombre), contenido,
+                                  {'content-type': 'application/vnd.apache.parquet'})
+            manifiesto['tablas'][nombre] = {
+                'filas': len(datos[nombre]),
+                'sha256': hashlib.sha256(contenido).hexdigest(),
+            }
+        almacenamiento.upload(f"{ruta}/manifiesto.json", json.dumps(manifiesto).encode('utf-8'),
+                              {'content-type': 'application/json'})
+
+        verificar_archivo(supabase, ruta, datos)
+
+        # Falla si los datos cambiaron desde que se congeló el curso
+        supabase.rpc('marcar_curso_archivado', {
+            'p_curso_id': curso_id, 'p_ruta': ruta, 'p_version': version
+        }).execute()
+    except Exception:
+        supabase.rpc('congelar_curso', {'p_curso_id': curso_id, 'p_congelar': False}).execute()
+        raise
+
+    while supabase.rpc('vaciar_curso_archivado', {'p_curso_id': curso_id, 'p_lote': lote}).execute().data:
+        pass
+    return manifiesto
+
+
+def leer_tabla_archivada(supabase, ruta, nombre):
+    """Descarga y lee una tabla de un curso archivado, guardándola en memoria"""
+    clave = (ruta, nombre)
+    if clave in _tablas_descargadas:
+        _tablas_descargadas.move_to_end(clave)
+        return _tablas_descargadas[clave]
+    filas = de_parquet(supabase.storage.from_(BUCKET).download(_ruta_tabla(ruta, nombre)))
+    _tablas_descargadas[clave] = filas
+    while len(_tablas_descargadas) > MAX_TABLAS_EN_MEMORIA:
+        _tablas_descargadas.popitem(last=False)
+    return filas
+
+
+class DatosArchivados(dict):
+    """Datos de un curso archivado; cada tabla se descarga recién al usarla"""
+
+    def __init__(self, supabase, ruta):
+        super().__init__()
+        self.supabase = supabase
+        self.ruta = ruta
+
+    def __missing__(self, nombre):
+        if nombre not in TABLAS:
+            raise KeyError(nombre)
+        filas = leer_tabla_archivada(self.supabase, self.ruta, nombre)
+        if nombre in ORDEN:
+            filas = sorted(filas, key=lambda f: f[ORDEN[nombre]])
+        self[nombre] = filas
+        return filas
@@ -0,0 +1,93 @@
+# utils/arranque.py
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+# Línea base con el costo de arranque de cada página
+ARCHIVO_BASE = RAIZ / 'arranque.json'
+# Módulos que solo deberían cargarse en las rutas de exportación, importación y análisis
+MODULOS_PESADOS = ('pandas', 'numpy', 'pyarrow', 'openpyxl', 'xlsxwriter', 'plotly')
+# Diferencia mínima en segundos para considerar una regresión, por el ruido de la medición
+MARGEN = 0.1
+
+# Se ejecuta en un proceso nuevo: importa solo lo que la página importa al inicio.
+# Streamlit se importa antes de medir porque el servidor ya lo tiene cargado
+# (y trae plotly consigo); se mide y se informa solo lo que agrega la página.
+_MEDIR = """
+import ast, json, sys, time
+import streamlit
+ruta, pesados = sys.argv[1], sys.argv[2].split(',')
+previos = set(sys.modules)
+with open(ruta, encoding='utf-8') as f:
+    arbol = ast.parse(f.read())
+arbol.body = [n for n in arbol.body if isinstance(n, (ast.Import, ast.ImportFrom))]
+codigo = compile(arbol, ruta, 'exec')
+inicio = time.perf_counter()
+exec(codigo, {'__name__': '__arranque__'})
+segundos = time.perf_counter() - inicio
+print(json.dumps({'segundos': segundos, 'pesados': [m for m in pesados if m in sys.modules and m not in previos]}))
+"""
+
+
+def paginas():
+    """Rutas relativas de Home.py y de cada página, en el orden del menú"""
+    return ['Home.py'] + sorted(str(p.relative_to(RAIZ)) for p in (RAIZ / 'pages').glob('*.py'))
+
+
+def medir_pagina(ruta, repeticiones=3):
+    """Costo de importar una página en un proceso nuevo
+
+    Devuelve {'segundos': mínimo de las repeticiones, 'pesados': módulos pesados que agrega}.
+    """
+    mediciones = []
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, '-c', _MEDIR, ruta, ','.join(MODULOS_PESADOS)],
+            cwd=RAIZ, capture_output=True, text=True
+        )
+        if salida.returncode != 0:
+            raise RuntimeError(f"No se pudo importar {ruta}: {salida.stderr.strip().splitlines()[-1]}")
+        mediciones.append(json.loads(salida.stdout))
+    return {
+        'segundos': round(min(m['segundos'] for m in mediciones), 3),
+        'pesados': mediciones[0]['pesados'],
+    }
+
+
+def medir_paginas(repeticiones=3):
+    return {ruta: medir_pagina(ruta, repeticiones) for ruta in paginas()}
+
+
+def leer_base(archivo=ARCHIVO_BASE):
+    if not Path(archivo).exists():
+        return {}
+    with open(archivo, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def guardar_base(mediciones, archivo=ARCHIVO_BASE):
+    with open(archivo, 'w', encoding='utf-8') as f:
+        json.dump(mediciones, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def regresiones(mediciones, base, tolerancia=0.2):
+    """Páginas más lentas que la línea base o que cargan módulos pesados nuevos
+
+    Una página es más lenta si supera la base en más de `tolerancia` (fracción)
+    y en más de MARGEN segundos.
+    """
+    encontradas = []
+    for ruta, actual in mediciones.items():
+        anterior = base.get(ruta)
+        if not anterior:
+            continue
+        limite = max(anterior['segundos'] * (1 + tolerancia), anterior['segundos'] + MARGEN)
+        if actual['segundos'] > limite:
+            encontradas.append(f"{ruta}: {actual['segundos']:.3f}s (antes {anterior['segundos']:.3f}s)")
+        nuevos = sorted(set(actual['pesados']) - set(anterior['pesados']))
+        if nuevos:
+            encontradas.append(f"{ruta}: ahora carga {', '.join(nuevos)}")
+    return encontradas
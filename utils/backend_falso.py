@@ -0,0 +1,379 @@
+# utils/backend_falso.py
+"""Backend en memoria con la interfaz del cliente de Supabase que usa la aplicación
+
+Sirve para las pruebas de carga: cada petición espera una latencia
+configurable y queda registrada con la cantidad de filas que escribe.
+Solo implementa las consultas y funciones que usan las páginas de puntos.
+"""
+import random
+import re
+import threading
+import time
+import uuid
+
+from utils.cache import FUNCIONES_ESTRUCTURA, TABLAS_CACHEADAS
+
+# Columna de la tabla consultada que apunta a cada tabla de las uniones tabla!inner(...)
+RELACIONES = {
+    'grupos': 'grupo_id',
+    'estudiantes_curso': 'estudiante_id',
+    'sesiones': 'sesion_id',
+    'cursos': 'curso_id',
+}
+_UNION = re.compile(r'(\w+)!inner\(([^)]*)\)')
+
+
+class Respuesta:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _columnas(seleccion):
+    """Columnas propias y uniones ({tabla: columnas}) de un select de PostgREST"""
+    uniones = {tabla: [c.strip() for c in cols.split(',')] for tabla, cols in _UNION.findall(seleccion)}
+    propias = [c.strip() for c in _UNION.sub('', seleccion).split(',') if c.strip()]
+    return propias, uniones
+
+
+def _proyectar(fila, columnas):
+    if not columnas or '*' in columnas:
+        return dict(fila)
+    return {c: fila.get(c) for c in columnas}
+
+
+class ConsultaFalsa:
+    """Consulta sobre una tabla en memoria con los filtros de postgrest que usa la app"""
+
+    def __init__(self, backend, tabla):
+        self.backend = backend
+        self.tabla = tabla
+        self.operacion = 'select'
+        self.seleccion = '*'
+        self.contar = False
+        self.filtros = []
+        self.orden = []
+        self.limite = None
+        self.rango = None
+        self.una = None
+        self.valores = None
+        self.conflicto = None
+        self.ignorar_repetidas = False
+        self._negar = False
+
+    # Selección y escritura
+    def select(self, columnas='*', count=None, **kwargs):
+        self.seleccion = columnas
+        self.contar = count is not None
+        return self
+
+    def insert(self, valores, **kwargs):
+        self.operacion, self.valores = 'insert', valores
+        return self
+
+    def upsert(self, valores, on_conflict=None, ignore_duplicates=False, **kwargs):
+        self.operacion, self.valores, self.conflicto = 'upsert', valores, on_conflict
+        self.ignorar_repetidas = ignore_duplicates
+        return self
+
+    def update(self, valores, **kwargs):
+        self.operacion, self.valores = 'update', valores
+        return self
+
+    def delete(self, **kwargs):
+        self.operacion = 'delete'
+        return self
+
+    # Filtros
+    @property
+    def not_(self):
+        self._negar = True
+        return self
+
+    def _filtro(self, columna, predicado):
+        if self._negar:
+            self._negar = False
+            original = predicado
+            predicado = lambda valor: not original(valor)
+        self.filtros.append((columna, predicado))
+        return self
+
+    def eq(self, columna, valor):
+        return self._filtro(columna, lambda v: v == valor)
+
+    def neq(self, columna, valor):
+        return self._filtro(columna, lambda v: v != valor)
+
+    def gt(self, columna, valor):
+        return self._filtro(columna, lambda v: v is not None and v > valor)
+
+    def gte(self, columna, valor):
+        return self._filtro(columna, lambda v: v is not None and v >= valor)
+
+    def lt(self, columna, valor):
+        return self._filtro(columna, lambda v: v is not None and v < valor)
+
+    def lte(self, columna, valor):
+        return self._filtro(columna, lambda v: v is not None and v <= valor)
+
+    def in_(self, columna, valores):
+        valores = set(valores)
+        return self._filtro(columna, lambda v: v in valores)
+
+    def is_(self, columna, valor):
+        if valor in ('null', None):
+            return self._filtro(columna, lambda v: v is None)
+        return self._filtro(columna, lambda v: v is valor)
+
+    def order(self, columna, desc=False, **kwargs):
+        self.orden.append((columna, desc))
+        return self
+
+    def limit(self, cantidad, **kwargs):
+        self.limite = cantidad
+        return self
+
+    def range(self, inicio, fin, **kwargs):
+        self.rango = (inicio, fin)
+        return self
+
+    def single(self):
+        self.una = 'single'
+        return self
+
+    def maybe_single(self):
+        self.una = 'maybe'
+        return self
+
+    # Ejecución
+    def _cumple(self, fila):
+        for columna, predicado in self.filtros:
+            if '.' in columna:
+                tabla, campo = columna.split('.', 1)
+                valor = (fila.get(tabla) or {}).get(campo)
+            else:
+                valor = fila.get(columna)
+            if not predicado(valor):
+                return False
+        return True
+
+    def _seleccionar(self, filas):
+        propias, uniones = _columnas(self.seleccion)
+        resultado = []
+        for fila in filas:
+            salida = _proyectar(fila, propias)
+            for tabla, columnas in uniones.items():
+                relacionada = self.backend.por_id(tabla, fila.get(RELACIONES[tabla]))
+                if relacionada is None:
+                    break
+                salida[tabla] = _proyectar(relacionada, columnas)
+            else:
+                if self._cumple({**fila, **salida}):
+                    resultado.append(salida)
+        for columna, desc in reversed(self.orden):
+            resultado.sort(key=lambda f: (f.get(columna) is None, f.get(columna)), reverse=desc)
+        total = len(resultado)
+        if self.rango:
+            resultado = resultado[self.rango[0]:self.rango[1] + 1]
+        if self.limite is not None:
+            resultado = resultado[:self.limite]
+        return resultado, total
+
+    def _escribir(self, filas):
+        if self.operacion == 'update':
+            cambiadas = [f for f in filas if self._cumple(f)]
+            for fila in cambiadas:
+                fila.update(self.valores)
+            return [dict(f) for f in cambiadas]
+        if self.operacion == 'delete':
+            borradas = [f for f in filas if self._cumple(f)]
+            ids = {id(f) for f in borradas}
+            filas[:] = [f for f in filas if id(f) not in ids]
+            return [dict(f) for f in borradas]
+
+        nuevas = self.valores if isinstance(self.valores, list) else [self.valores]
+        resultado = []
+        for valores in nuevas:
+            existente = None
+            if self.operacion == 'upsert':
+                columnas = self.conflicto.split(',') if self.conflicto else ['id']
+                existente = next(
+                    (f for f in filas if all(f.get(c) == valores.get(c) for c in columnas)), None
+                )
+            if existente is not None and self.ignorar_repetidas:
+                continue
+            if existente is not None:
+                existente.update(valores)
+                resultado.append(dict(existente))
+            else:
+                fila = {'id': self.backend.siguiente_id(), **valores}
+                filas.append(fila)
+                resultado.append(dict(fila))
+        return resultado
+
+    def execute(self):
+        self.backend.esperar()
+        with self.backend.lock:
+            filas = self.backend.tablas.setdefault(self.tabla, [])
+            if self.operacion == 'select':
+                datos, total = self._seleccionar(filas)
+                self.backend.registrar('lectura', self.tabla, len(datos))
+            else:
+                datos, total = self._escribir(filas), None
+                self.backend.registrar('escritura', self.tabla, len(datos))
+                if self.tabla in TABLAS_CACHEADAS and datos:
+                    self.backend.cambiar_version(catalogo=self.tabla == 'cursos')
+        if self.una == 'single':
+            if len(datos) != 1:
+                raise Exception("Se esperaba exactamente una fila")
+            datos = datos[0]
+        elif self.una == 'maybe':
+            datos = datos[0] if datos else None
+        return Respuesta(datos, total if self.contar else None)
+
+
+class LlamadaFalsa:
+    def __init__(self, backend, nombre, parametros):
+        self.backend = backend
+        self.nombre = nombre
+        self.parametros = parametros or {}
+
+    def execute(self):
+        funcion = self.backend.funciones.get(self.nombre)
+        if funcion is None:
+            raise Exception(f"Función no disponible en el backend falso: {self.nombre}")
+        self.backend.esperar()
+        with self.backend.lock:
+            datos, escritas = funcion(self.backend, **self.parametros)
+            self.backend.registrar('escritura' if escritas else 'lectura', self.nombre, escritas)
+            if self.nombre in FUNCIONES_ESTRUCTURA and escritas:
+                self.backend.cambiar_version()
+        return Respuesta(datos)
+
+
+# Funciones del servidor; devuelven (datos, filas escritas)
+
+def _versiones_cache(backend, p_curso_id=None):
+    return {
+        'catalogo': backend.versiones['catalogo'],
+        'estructura': backend.versiones['estructura'] if p_curso_id is not None else None,
+    }, 0
+
+
+def _guardar_puntos_con_historial(backend, p_individuales, p_grupales, p_autor=None):
+    escritas = 0
+    for tabla, cambios in (('puntos_individuales', p_individuales), ('puntos_grupales', p_grupales)):
+        for fila_id, puntos in cambios.items():
+            fila = backend.por_id(tabla, int(fila_id))
+            if fila is not None:
+                fila['puntos'] = puntos
+                escritas += 1
+    return str(uuid.uuid4()), escritas
+
+
+def _sin_historial(backend, p_sesion_id):
+    # El backend falso no guarda historial: no hay lotes para deshacer ni rehacer
+    return None, 0
+
+
+FUNCIONES = {
+    'versiones_cache': _versiones_cache,
+    'guardar_puntos_con_historial': _guardar_puntos_con_historial,
+    'deshacer_lote': _sin_historial,
+    'rehacer_lote': _sin_historial,
+}
+
+
+class BackendFalso:
+    """Cliente falso de Supabase con latencia simulada y registro de peticiones
+
+    Cada petición espera `latencia` segundos más un extra aleatorio de hasta
+    `variacion`. `peticiones` guarda (instante, tipo, tabla o función, filas).
+    Las escrituras de estructura suben las versiones (las mismas para todos
+    los cursos) y llaman a `al_cambiar_version`, como el hook de httpx del
+    cliente real.
+    """
+
+    def __init__(self, latencia=0.0, variacion=0.0, semilla=None):
+        self.latencia = latencia
+        self.variacion = variacion
+        self.tablas = {}
+        self.funciones = dict(FUNCIONES)
+        self.versiones = {'catalogo': 1, 'estructura': 1}
+        self.al_cambiar_version = []
+        self.cambios_version = 0
+        self.peticiones = []
+        self.lock = threading.RLock()
+        self._azar = random.Random(semilla)
+        self._ids = 1
+
+    def table(self, tabla):
+        return ConsultaFalsa(self, tabla)
+
+    from_ = table
+
+    def rpc(self, nombre, parametros=None):
+        return LlamadaFalsa(self, nombre, parametros)
+
+    def esperar(self):
+        espera = self.latencia + (self._azar.uniform(0, self.variacion) if self.variacion else 0)
+        if espera:
+            time.sleep(espera)
+
+    def registrar(self, tipo, nombre, filas):
+        self.peticiones.append((time.time(), tipo, nombre, filas))
+
+    def cambiar_version(self, catalogo=False):
+        self.versiones['estructura'] += 1
+        if catalogo:
+            self.versiones['catalogo'] += 1
+        self.cambios_version += 1
+        for avisar in self.al_cambiar_version:
+            avisar()
+
+    def siguiente_id(self):
+        self._ids += 1
+        return self._ids
+
+    def por_id(self, tabla, fila_id):
+        indice = self.tablas.get(tabla, [])
+        return next((f for f in indice if f['id'] == fila_id), None)
+
+
+def poblar(backend, cursos=1, estudiantes=40, tamano_grupo=5, sesiones=4):
+    """Crea cursos de ejemplo con estudiantes, grupos y sesiones sin puntos
+
+    Devuelve [(curso_id, [sesion_id, ...]), ...].
+    """
+    apellidos = ['Pérez', 'García', 'Martínez', 'López', 'Sánchez', 'Ramírez', 'Flores', 'Torres']
+    nombres = ['María', 'Juan', 'Ana', 'Luis', 'Carmen', 'José', 'Rosa', 'Pedro']
+    t = backend.tablas
+    creados = []
+    for c in range(cursos):
+        curso = {'id': backend.siguiente_id(), 'nombre': f"Curso {c + 1}", 'eliminado_en': None, 'archivado_en': None}
+        t.setdefault('cursos', []).append(curso)
+        lista = []
+        for i in range(estudiantes):
+            lista.append({
+                'id': backend.siguiente_id(), 'curso_id': curso['id'], 'eliminado_en': None,
+                'apellidos': f"{apellidos[i % len(apellidos)]} {apellidos[(i // len(apellidos)) % len(apellidos)]}",
+                'nombres': f"{nombres[i % len(nombres)]} {i + 1}",
+            })
+        t.setdefault('estudiantes_curso', []).extend(lista)
+        for g in range(max(1, estudiantes // tamano_grupo)):
+            grupo = {'id': backend.siguiente_id(), 'curso_id': curso['id'], 'nombre': f"Grupo {g + 1}"}
+            t.setdefault('grupos', []).append(grupo)
+            t.setdefault('estudiantes_grupo', []).extend(
+                {'id': backend.siguiente_id(), 'grupo_id': grupo['id'], 'estudiante_id': e['id']}
+                for e in lista[g * tamano_grupo:(g + 1) * tamano_grupo]
+            )
+        ids_sesiones = []
+        for s in range(sesiones):
+            sesion = {
+                'id': backend.siguiente_id(), 'curso_id': curso['id'], 'nombre': f"Sesión {s + 1}",
+                'fecha': f"2026-03-{s + 2:02d}", 'puntaje_maximo': 20, 'eliminado_en': None,
+            }
+            t.setdefault('sesiones', []).append(sesion)
+            ids_sesiones.append(sesion['id'])
+        creados.append((curso['id'], ids_sesiones))
+    return creados
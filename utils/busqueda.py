@@ -0,0 +1,98 @@
+# utils/busqueda.py
+import bisect
+import difflib
+import unicodedata
+
+import streamlit as st
+
+
+def normalizar_texto(texto):
+    """Quita tildes, mayúsculas y espacios repetidos de un texto"""
+    texto = unicodedata.normalize('NFKD', str(texto or ''))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.casefold().split())
+
+
+class IndiceBusqueda:
+    """Índice de estudiantes por palabras normalizadas (apellidos y nombres)"""
+
+    def __init__(self, estudiantes):
+        self.estudiantes = list(estudiantes)
+        self.textos = []
+        palabras = {}
+        for pos, estudiante in enumerate(self.estudiantes):
+            texto = normalizar_texto(f"{estudiante['apellidos']} {estudiante['nombres']}")
+            self.textos.append(texto)
+            for palabra in texto.split():
+                palabras.setdefault(palabra, set()).add(pos)
+
+        # Palabras ordenadas para búsqueda por prefijo con bisect
+        self.palabras = sorted(palabras)
+        self.posiciones = [frozenset(palabras[p]) for p in self.palabras]
+
+    def _coincidencias(self, termino):
+        """Devuelve {posición: relevancia} de los estudiantes que contienen el término"""
+        resultado = {}
+        inicio = bisect.bisect_left(self.palabras, termino)
+        for i in range(inicio, len(self.palabras)):
+            palabra = self.palabras[i]
+            if not palabra.startswith(termino):
+                break
+            relevancia = 3 if palabra == termino else 2
+            for pos in self.posiciones[i]:
+                if resultado.get(pos, 0) < relevancia:
+                    resultado[pos] = relevancia
+
+        # Si ninguna palabra empieza con el término, buscar dentro del texto
+        if not resultado:
+            resultado = {pos: 1 for pos, texto in enumerate(self.textos) if termino in texto}
+        return resultado
+
+    def _coincidencias_aproximadas(self, termino):
+        """Coincidencias tolerantes a errores de tipeo"""
+        resultado = {}
+        for palabra in difflib.get_close_matches(termino, self.palabras, n=5, cutoff=0.75):
+            for pos in self.posiciones[bisect.bisect_left(self.palabras, palabra)]:
+                resultado[pos] = 1
+        return resultado
+
+    def buscar(self, consulta, aproximada=False):
+        """Devuelve los estudiantes que coinciden con la consulta, ordenados por relevancia"""
+        terminos = normalizar_texto(consulta).split()
+        if not terminos:
+            return self.estudiantes
+
+        relevancia = None
+        for termino in terminos:
+            coincidencias = self._coincidencias(termino)
+            if not coincidencias and aproximada:
+                coincidencias = self._coincidencias_aproximadas(termino)
+            if relevancia is None:
+                relevancia = coincidencias
+            else:
+                relevancia = {pos: relevancia[pos] + r
+                              for pos, r in coincidencias.items() if pos in relevancia}
+            if not relevancia:
+                return []
+
+        # Mayor relevancia primero; a igual relevancia se mantiene el orden original
+        consulta_normalizada = ' '.join(terminos)
+        return [
+            self.estudiantes[pos] for pos in sorted(
+                relevancia,
+                key=lambda pos: (-relevancia[pos],
+                                 not self.textos[pos].startswith(consulta_normalizada),
+                                 pos)
+            )
+        ]
+
+
+@st.cache_resource(max_entries=64)
+def _construir_indice(curso_id, firma, _estudiantes):
+    return IndiceBusqueda(_estudiantes)
+
+
+def obtener_indice(curso_id, estudiantes):
+    """Devuelve el índice de búsqueda del curso, construyéndolo solo si cambió la lista"""
+    firma = hash(tuple((e['id'], e['apellidos'], e['nombres']) for e in estudiantes))
+    return _construir_indice(curso_id, firma, estudiantes)
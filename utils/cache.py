@@ -0,0 +1,157 @@
+# utils/cache.py
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import streamlit as st
+
+# Segundos que se confía en una versión leída antes de volver a consultarla;
+# las escrituras hechas desde la aplicación la descartan enseguida
+TTL_VERSION = 5.0
+# Entradas guardadas como máximo en la caché compartida
+MAX_ENTRADAS = 256
+
+# Escrituras que cambian datos guardados en la caché de la aplicación.
+# Las funciones que solo tocan puntos no están aquí porque los puntos no se guardan.
+TABLAS_CACHEADAS = {'cursos', 'sesiones', 'grupos', 'estudiantes_curso', 'estudiantes_grupo'}
+FUNCIONES_ESTRUCTURA = {
+    'crear_grupos_masivo', 'reescalar_puntaje_sesion',
+    'congelar_curso', 'marcar_curso_archivado', 'vaciar_curso_archivado', 'purgar_eliminados',
+    'fijar_pesos_sesiones', 'clonar_curso',
+}
+METODOS_ESCRITURA = {'POST', 'PATCH', 'PUT', 'DELETE'}
+_RUTA_REST = re.compile(r'/rest/v1/(rpc/)?([^/?]+)')
+
+
+class CacheVersionada:
+    """Caché LRU compartida entre hilos; las claves incluyen la versión de los datos
+
+    Cuando los datos cambian de versión sus entradas viejas dejan de pedirse y
+    salen de la caché por antigüedad.
+    """
+
+    def __init__(self, maximo=MAX_ENTRADAS):
+        self.maximo = maximo
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave, calcular):
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+            self.fallos += 1
+        valor = calcular()
+        with self._lock:
+            self._datos[clave] = valor
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+        return valor
+
+    def __len__(self):
+        return len(self._datos)
+
+
+class VersionesCompartidas:
+    """Versiones leídas de la base de datos, reutilizadas durante `ttl` segundos"""
+
+    def __init__(self, ttl=TTL_VERSION):
+        self.ttl = ttl
+        self._versiones = {}
+        self._lock = threading.Lock()
+        self.lecturas = 0
+
+    def obtener(self, clave, leer):
+        ahora = time.monotonic()
+        with self._lock:
+            guardada = self._versiones.get(clave)
+        if guardada and ahora - guardada[1] < self.ttl:
+            return guardada[0]
+        version = leer()
+        with self._lock:
+            self.lecturas += 1
+            self._versiones[clave] = (version, ahora)
+        return version
+
+    def olvidar(self):
+        with self._lock:
+            self._versiones.clear()
+
+    def registrar_respuesta(self, response):
+        """Hook de httpx: tras una escritura que cambia datos cacheados, vuelve a leer las versiones"""
+        if response.status_code < 400 and es_escritura_cacheada(response.request):
+            self.olvidar()
+
+
+def es_escritura_cacheada(request):
+    if request.method not in METODOS_ESCRITURA:
+        return False
+    ruta = _RUTA_REST.search(request.url.path)
+    if not ruta:
+        return False
+    es_funcion, nombre = ruta.groups()
+    return nombre in (FUNCIONES_ESTRUCTURA if es_funcion else TABLAS_CACHEADAS)
+
+
+@st.cache_resource
+def _cache():
+    return CacheVersionada()
+
+
+@st.cache_resource
+def versiones_compartidas():
+    return VersionesCompartidas()
+
+
+def versiones(supabase, curso_id=None):
+    """{'catalogo': versión de la lista de cursos, 'estructura': versión del curso}"""
+    return versiones_compartidas().obtener(
+        curso_id,
+        lambda: supabase.rpc('versiones_cache', {'p_curso_id': curso_id}).execute().data
+    )
+
+
+def compartido(clave, calcular):
+    """Valor guardado en la caché del servidor; `clave` debe incluir la versión de los datos"""
+    return _cache().obtener(clave, calcular)
+
+
+def cursos_activos(supabase):
+    """Cursos sin eliminar ni archivar, compartidos por todas las sesiones"""
+    version = versiones(supabase)['catalogo']
+    return compartido(
+        ('cursos', version),
+        lambda: supabase.table('cursos')
+            .select('*')
+            .is_('eliminado_en', 'null')
+            .is_('archivado_en', 'null')
+            .execute().data
+    )
+
+
+def sesiones_curso(supabase, curso_id):
+    """Sesiones activas del curso, de la más reciente a la más antigua"""
+    version = versiones(supabase, curso_id)['estructura']
+    return compartido(
+        ('sesiones', curso_id, version),
+        lambda: supabase.table('sesiones')
+            .select('*')
+            .eq('curso_id', curso_id)
+            .is_('eliminado_en', 'null')
+            .order('fecha', desc=True)
+            .execute().data
+    )
+
+
+def estadisticas_cache():
+    cache = _cache()
+    return {
+        'aciertos': cache.aciertos,
+        'fallos': cache.fallos,
+        'entradas': len(cache),
+        'lecturas_version': versiones_compartidas().lecturas,
+    }
@@ -0,0 +1,236 @@
+# utils/carga.py
+"""Prueba de carga de las páginas de puntos con AppTest y un backend falso
+
+AppTest no se puede ejecutar en varios hilos a la vez (comparte un Runtime
+global), así que cada proceso hace de un servidor de Streamlit: sus usuarios
+se turnan paso a paso y comparten las cachés del proceso y el mismo backend
+falso. Con varios procesos los usuarios se reparten entre ellos.
+"""
+import random
+import statistics
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+PAGINAS = {
+    'home': RAIZ / 'Home.py',
+    'puntos': RAIZ / 'pages' / '5_✨_Asignar_Puntos.py',
+}
+# Segundos sin cambios tras los que las páginas guardan solas
+ESPERA_AUTOGUARDADO = 5
+# Probabilidad de que un paso cambie de vista en lugar de editar puntos
+PROB_CAMBIO_VISTA = 0.1
+# Probabilidad por defecto de que un paso agregue un estudiante al curso, lo
+# que invalida las cachés del curso y obliga a reconstruirlas
+PROB_CAMBIO_ESTRUCTURA = 0.02
+
+
+def percentiles(valores):
+    """p50, p95, p99 y máximo de una lista de duraciones, en milisegundos"""
+    if not valores:
+        return {}
+    if len(valores) == 1:
+        cortes = valores * 99
+    else:
+        cortes = statistics.quantiles(valores, n=100, method='inclusive')
+    return {
+        'p50': round(cortes[49] * 1000, 1),
+        'p95': round(cortes[94] * 1000, 1),
+        'p99': round(cortes[98] * 1000, 1),
+        'max': round(max(valores) * 1000, 1),
+        'renders': len(valores),
+    }
+
+
+class UsuarioSimulado:
+    """Una sesión del navegador que edita puntos y deja correr el guardado automático
+
+    De vez en cuando agrega un estudiante al curso directamente en el backend,
+    como otro docente editando la lista, y mide el render que reconstruye las cachés.
+    """
+
+    def __init__(self, pagina, curso_id, sesion_id, azar, ediciones_por_guardado,
+                 backend=None, prob_cambio_estructura=0.0):
+        from streamlit.testing.v1 import AppTest
+
+        self.pagina = pagina
+        self.curso_id = curso_id
+        self.azar = azar
+        self.ediciones_por_guardado = ediciones_por_guardado
+        self.backend = backend
+        self.prob_cambio_estructura = prob_cambio_estructura if backend is not None else 0.0
+        self.ediciones = 0
+        self.at = AppTest.from_file(str(PAGINAS[pagina]), default_timeout=120)
+        self.at.session_state['curso_actual'] = curso_id
+        self.at.session_state['curso_nombre'] = f"Curso {curso_id}"
+        self.at.session_state['sesion_actual'] = sesion_id
+        self.at.session_state['sesion_nombre'] = f"Sesión {sesion_id}"
+
+    def _correr(self, accion):
+        inicio = time.perf_counter()
+        accion()
+        duracion = time.perf_counter() - inicio
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].value)
+        return duracion
+
+    def _entradas(self, prefijo):
+        return [n for n in self.at.number_input if n.key and n.key.startswith(prefijo)]
+
+    def abrir(self):
+        return 'apertura', self._correr(self.at.run)
+
+    def paso(self):
+        """Ejecuta una acción y devuelve (tipo, segundos del render)"""
+        if self.ediciones and self.ediciones % self.ediciones_por_guardado == 0:
+            # Simula que pasaron los segundos de espera sin más cambios
+            self.ediciones = 0
+            self.at.session_state['ultimo_cambio'] = time.time() - ESPERA_AUTOGUARDADO - 1
+            return 'guardado', self._correr(self.at.run)
+
+        if self.azar.random() < self.prob_cambio_estructura:
+            self.backend.table('estudiantes_curso').insert({
+                'curso_id': self.curso_id, 'apellidos': f"Nuevo {self.azar.randrange(10**6)}",
+                'nombres': "Estudiante", 'eliminado_en': None,
+            }).execute()
+            return 'estructura', self._correr(self.at.run)
+
+        vista = self.at.segmented_control(key='vista_puntos')
+        if self.azar.random() < PROB_CAMBIO_VISTA:
+            otra = 'grupos' if vista.value == 'individual' else 'individual'
+            return 'vista', self._correr(vista.set_value(otra).run)
+
+        prefijo = 'ind_' if vista.value == 'individual' else 'grupo_'
+        entradas = self._entradas(prefijo)
+        if not entradas:
+            return 'recarga', self._correr(self.at.run)
+        entrada = self.azar.choice(entradas)
+        entrada.set_value(self.azar.randint(0, int(entrada.max * 2)) / 2)
+        self.ediciones += 1
+        if prefijo == 'grupo_' and self.pagina == 'puntos':
+            # En esta página los puntos grupales se aplican con el botón Asignar
+            boton = self.at.button(key=f"btn_{entrada.key}")
+            return 'edicion', self._correr(boton.click().run)
+        return 'edicion', self._correr(self.at.run)
+
+
+def _simular(usuarios, pasos, latencia, variacion, estudiantes, tamano_grupo,
+             cursos, paginas, ediciones_por_guardado, prob_cambio_estructura, semilla):
+    """Simula `usuarios` sesiones en este proceso y devuelve sus mediciones"""
+    import logging
+
+    from utils.backend_falso import BackendFalso, poblar
+    from utils.cache import versiones_compartidas
+    from utils.conexion import inyectar_cliente
+
+    # Los avisos de AppTest por ejecutarse fuera de `streamlit run` no interesan aquí
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+    azar = random.Random(semilla)
+    backend = BackendFalso(latencia, variacion, semilla)
+    creados = poblar(backend, cursos, estudiantes, tamano_grupo)
+    # Sin httpx no corre el hook del cliente real: el backend avisa directamente
+    backend.al_cambiar_version.append(versiones_compartidas().olvidar)
+    inyectar_cliente(backend)
+
+    simulados = []
+    for i in range(usuarios):
+        curso_id, sesiones = creados[i % len(creados)]
+        simulados.append(UsuarioSimulado(
+            paginas[i % len(paginas)], curso_id, azar.choice(sesiones),
+            random.Random(azar.random()), ediciones_por_guardado,
+            backend, prob_cambio_estructura
+        ))
+
+    renders = []
+    errores = []
+    inicio = time.time()
+    try:
+        for ronda in range(pasos + 1):
+            for usuario in simulados:
+                try:
+                    tipo, segundos = usuario.abrir() if ronda == 0 else usuario.paso()
+                    renders.append((usuario.pagina, tipo, segundos))
+                except Exception as e:
+                    errores.append(f"{usuario.pagina}: {e}")
+    finally:
+        inyectar_cliente(None)
+    return {
+        'inicio': inicio,
+        'fin': time.time(),
+        'renders': renders,
+        'peticiones': backend.peticiones,
+        'cambios_version': backend.cambios_version,
+        'errores': errores,
+    }
+
+
+def resumir(resultados):
+    """Junta las mediciones de todos los procesos en un reporte"""
+    inicio = min(r['inicio'] for r in resultados)
+    duracion = max(r['fin'] for r in resultados) - inicio
+    renders = [x for r in resultados for x in r['renders']]
+    peticiones = [p for r in resultados for p in r['peticiones']]
+
+    por_tipo = defaultdict(list)
+    for pagina, tipo, segundos in renders:
+        por_tipo[f"{pagina}/{tipo}"].append(segundos)
+
+    # Peticiones por segundo de reloj, para ver los picos de guardado
+    por_segundo = Counter(int(instante - inicio) for instante, *_ in peticiones)
+    lotes = defaultdict(list)
+    for _, tipo, nombre, filas in peticiones:
+        if tipo == 'escritura':
+            lotes[nombre].append(filas)
+
+    return {
+        'duracion': round(duracion, 2),
+        'render': percentiles([s for *_, s in renders]),
+        'render_por_tipo': {tipo: percentiles(v) for tipo, v in sorted(por_tipo.items())},
+        'backend': {
+            'peticiones': len(peticiones),
+            'lecturas': sum(1 for p in peticiones if p[1] == 'lectura'),
+            'escrituras': sum(1 for p in peticiones if p[1] == 'escritura'),
+            'qps': round(len(peticiones) / duracion, 1) if duracion else 0.0,
+            'qps_pico': max(por_segundo.values(), default=0),
+            'por_tabla': dict(Counter(p[2] for p in peticiones).most_common()),
+            'cambios_version': sum(r['cambios_version'] for r in resultados),
+        },
+        'lotes_escritura': {
+            nombre: {
+                'lotes': len(filas),
+                'filas_promedio': round(statistics.mean(filas), 1),
+                'filas_max': max(filas),
+            }
+            for nombre, filas in sorted(lotes.items())
+        },
+        'errores': [e for r in resultados for e in r['errores']],
+    }
+
+
+def prueba_de_carga(usuarios=50, pasos=20, latencia=0.02, variacion=0.01, estudiantes=40,
+                    tamano_grupo=5, cursos=1, paginas=('home', 'puntos'),
+                    ediciones_por_guardado=4, prob_cambio_estructura=PROB_CAMBIO_ESTRUCTURA,
+                    procesos=None, semilla=0):
+    """Reparte los usuarios entre procesos, los simula y devuelve el reporte
+
+    Cada usuario abre su página, hace `pasos` acciones (ediciones y algún
+    cambio de vista) y cada `ediciones_por_guardado` ediciones deja que
+    corra el guardado automático. Con `prob_cambio_estructura` un paso agrega
+    un estudiante al curso. Por defecto todo corre en un solo proceso, que
+    hace de un servidor con sus cachés.
+    """
+    procesos = max(1, min(procesos or 1, usuarios))
+    reparto = [usuarios // procesos + (1 if i < usuarios % procesos else 0) for i in range(procesos)]
+    argumentos = [
+        (n, pasos, latencia, variacion, estudiantes, tamano_grupo, cursos,
+         list(paginas), ediciones_por_guardado, prob_cambio_estructura, semilla + i)
+        for i, n in enumerate(reparto)
+    ]
+    if procesos == 1:
+        return resumir([_simular(*argumentos[0])])
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        futuros = [pool.submit(_simular, *a) for a in argumentos]
+        return resumir([f.result() for f in futuros])
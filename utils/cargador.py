@@ -0,0 +1,91 @@
+# utils/cargador.py
+
+# Máximo de claves por consulta in_() para no exceder el largo de la URL
+TAMANO_LOTE = 200
+
+
+class Cargador:
+    """Memoriza y agrupa búsquedas por clave durante una ejecución de la página
+
+    Las claves encoladas se resuelven juntas, con una sola consulta, en la
+    siguiente llamada a `cargar`. Una clave ya resuelta no se vuelve a consultar.
+    Se crea un cargador nuevo en cada ejecución del script, así los datos nunca
+    quedan desactualizados entre reruns.
+    """
+
+    def __init__(self, funcion_lote):
+        self.funcion_lote = funcion_lote
+        self.cache = {}
+        self.pendientes = {}
+
+    def encolar(self, claves):
+        """Registra claves para resolverlas en el próximo lote"""
+        for clave in claves:
+            if clave not in self.cache:
+                self.pendientes[clave] = None
+
+    def cargar(self, clave):
+        """Devuelve el valor de una clave, resolviendo junto con ella las encoladas"""
+        if clave not in self.cache:
+            self.pendientes[clave] = None
+            self._despachar()
+        return self.cache[clave]
+
+    def cargar_varios(self, claves):
+        """Devuelve los valores de varias claves con un solo lote"""
+        claves = list(claves)
+        self.encolar(claves)
+        if self.pendientes:
+            self._despachar()
+        return [self.cache[clave] for clave in claves]
+
+    def _despachar(self):
+        claves = list(self.pendientes)
+        self.pendientes = {}
+        resultados = {}
+        for i in range(0, len(claves), TAMANO_LOTE):
+            resultados.update(self.funcion_lote(claves[i:i + TAMANO_LOTE]))
+        for clave in claves:
+            self.cache[clave] = resultados.get(clave)
+
+
+def crear_puntos_faltantes(supabase, tabla, columna, sesion_id, claves):
+    """Crea en 0 los registros de puntos de `claves` y devuelve {clave: fila}
+
+    Con un solo upsert que ignora los que ya existen, así dos sesiones que
+    abren la misma sesión a la vez no duplican registros; los que creó la
+    otra se leen después.
+    """
+    nuevos = supabase.table(tabla).upsert(
+        [{'sesion_id': sesion_id, columna: clave, 'puntos': 0} for clave in claves],
+        on_conflict=f'sesion_id,{columna}',
+        ignore_duplicates=True
+    ).execute().data
+    resultado = {fila[columna]: fila for fila in nuevos}
+    ajenos = [clave for clave in claves if clave not in resultado]
+    for i in range(0, len(ajenos), TAMANO_LOTE):
+        filas = supabase.table(tabla)\
+            .select('*')\
+            .eq('sesion_id', sesion_id)\
+            .in_(columna, ajenos[i:i + TAMANO_LOTE])\
+            .execute().data
+        resultado.update({fila[columna]: fila for fila in filas})
+    return resultado
+
+
+def cargador_puntos(supabase, tabla, columna, sesion_id):
+    """Cargador de puntos de una sesión que crea en un solo upsert los registros faltantes"""
+    def lote(claves):
+        filas = supabase.table(tabla)\
+            .select('*')\
+            .eq('sesion_id', sesion_id)\
+            .in_(columna, claves)\
+            .execute().data
+        resultado = {fila[columna]: fila for fila in filas}
+
+        faltantes = [clave for clave in claves if clave not in resultado]
+        if faltantes:
+            resultado.update(crear_puntos_faltantes(supabase, tabla, columna, sesion_id, faltantes))
+        return resultado
+
+    return Cargador(lote)
@@ -0,0 +1,99 @@
+# utils/catalogo.py
+import streamlit as st
+
+from utils.busqueda import normalizar_texto
+from utils.cache import compartido, cursos_activos, sesiones_curso, versiones
+
+# Opciones que muestra un selector como máximo; con más aparece un buscador
+MAX_OPCIONES = 50
+
+
+class Catalogo:
+    """Registros indexados por id, con las opciones ya ordenadas y sus etiquetas
+
+    Se comparte entre todas las sesiones del navegador, así que nunca debe modificarse.
+    """
+
+    def __init__(self, registros, etiqueta):
+        self.ids = [r['id'] for r in registros]
+        self.por_id = {r['id']: r for r in registros}
+        self.etiquetas = {r['id']: etiqueta(r) for r in registros}
+        self.posicion = {i: pos for pos, i in enumerate(self.ids)}
+        self._textos = [normalizar_texto(self.etiquetas[i]) for i in self.ids]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, registro_id):
+        return registro_id in self.por_id
+
+    def get(self, registro_id, defecto=None):
+        return self.por_id.get(registro_id, defecto)
+
+    def etiqueta(self, registro_id):
+        return self.etiquetas.get(registro_id, '')
+
+    def buscar(self, consulta):
+        """Ids cuyas etiquetas contienen la consulta, sin importar tildes ni mayúsculas"""
+        termino = normalizar_texto(consulta)
+        if not termino:
+            return self.ids
+        return [i for i, texto in zip(self.ids, self._textos) if termino in texto]
+
+
+def etiqueta_sesion(sesion):
+    return f"{sesion['nombre']} ({sesion['fecha']})"
+
+
+def catalogo_cursos(supabase):
+    """Cursos activos ordenados por nombre"""
+    version = versiones(supabase)['catalogo']
+    return compartido(
+        ('catalogo_cursos', version),
+        lambda: Catalogo(
+            sorted(cursos_activos(supabase), key=lambda c: normalizar_texto(c['nombre'])),
+            lambda c: c['nombre']
+        )
+    )
+
+
+def catalogo_sesiones(supabase, curso_id):
+    """Sesiones activas del curso, de la más reciente a la más antigua"""
+    version = versiones(supabase, curso_id)['estructura']
+    return compartido(
+        ('catalogo_sesiones', curso_id, version),
+        lambda: Catalogo(sesiones_curso(supabase, curso_id), etiqueta_sesion)
+    )
+
+
+def seleccionar(etiqueta, catalogo, actual=None, clave='selector'):
+    """Selectbox sobre un catálogo que parte de la opción actual
+
+    Con más de MAX_OPCIONES opciones aparece un buscador y solo se listan
+    las primeras coincidencias; la opción actual siempre se mantiene.
+    """
+    opciones = catalogo.ids
+    if len(catalogo) > MAX_OPCIONES:
+        consulta = st.text_input(
+            f"🔍 Buscar ({etiqueta})", key=f"buscar_{clave}",
+            placeholder="🔍 Escribe para filtrar", label_visibility="collapsed"
+        )
+        coincidencias = catalogo.buscar(consulta)
+        opciones = coincidencias[:MAX_OPCIONES]
+        if actual in catalogo and actual not in opciones:
+            opciones = [actual] + opciones
+        if len(coincidencias) > MAX_OPCIONES:
+            st.caption(f"Mostrando {MAX_OPCIONES} de {len(coincidencias)}")
+        if not opciones:
+            st.caption("Sin coincidencias")
+            return actual
+        indice = opciones.index(actual) if actual in opciones else 0
+    else:
+        indice = catalogo.posicion.get(actual, 0)
+
+    return st.selectbox(
+        etiqueta,
+        options=opciones,
+        format_func=catalogo.etiquetas.get,
+        index=indice
+    )
@@ -0,0 +1,18 @@
+# utils/clonacion.py
+
+
+def clonar_curso(supabase, curso_id, nombre, inicio_sesiones=None):
+    """Copia los estudiantes, grupos e integrantes de un curso a un curso nuevo
+
+    Todo se hace en el servidor con una sola llamada. Con `inicio_sesiones`
+    (una fecha) también se copian las sesiones, corridas para que la primera
+    caiga ese día. Devuelve {curso_id, estudiantes, grupos, miembros, sesiones}.
+    """
+    nombre = (nombre or '').strip()
+    if not nombre:
+        raise ValueError("El nombre del curso nuevo es obligatorio")
+    return supabase.rpc('clonar_curso', {
+        'p_curso_id': curso_id,
+        'p_nombre': nombre,
+        'p_inicio_sesiones': inicio_sesiones.isoformat() if inicio_sesiones else None,
+    }).execute().data
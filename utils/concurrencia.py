@@ -0,0 +1,27 @@
+# utils/concurrencia.py
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+# Hilos compartidos por todas las sesiones del servidor
+MAX_HILOS = 16
+
+
+@st.cache_resource
+def _ejecutor():
+    return ThreadPoolExecutor(max_workers=MAX_HILOS, thread_name_prefix='consultas')
+
+
+def consultar_en_paralelo(**consultas):
+    """Ejecuta consultas independientes en paralelo y devuelve sus resultados por nombre
+
+    Cada consulta puede ser una consulta de Supabase sin ejecutar o cualquier
+    función sin argumentos. Los errores se propagan igual que en una ejecución
+    secuencial.
+    """
+    ejecutor = _ejecutor()
+    futuros = {
+        nombre: ejecutor.submit(consulta.execute if hasattr(consulta, 'execute') else consulta)
+        for nombre, consulta in consultas.items()
+    }
+    return {nombre: futuro.result() for nombre, futuro in futuros.items()}
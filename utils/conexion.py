@@ -0,0 +1,194 @@
+# utils/conexion.py
+import threading
+import time
+
+import httpx
+import streamlit as st
+from supabase import ClientOptions, create_client
+
+from utils.cache import versiones_compartidas
+
+# Valores por defecto; se pueden sobrescribir en secrets.toml
+TIMEOUT_CONEXION = 5.0        # segundos para abrir la conexión
+TIMEOUT_LECTURA = 20.0        # segundos esperando la respuesta
+MAX_CONEXIONES = 20
+MAX_CONEXIONES_LIBRES = 10    # conexiones keep-alive que se conservan
+EXPIRACION_KEEPALIVE = 30.0   # segundos antes de cerrar una conexión libre
+REINTENTOS = 3
+ESPERA_REINTENTO = 0.5        # segundos, se duplica en cada intento
+UMBRAL_LENTA = 2.0            # segundos para considerar una petición lenta
+
+# Solo se reintentan automáticamente las peticiones que no modifican datos
+METODOS_IDEMPOTENTES = {'GET', 'HEAD', 'OPTIONS'}
+
+
+class EstadisticasConexion:
+    """Contadores de peticiones HTTP para diagnosticar picos de latencia"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.peticiones = 0
+        self.errores = 0
+        self.reintentos = 0
+        self.lentas = 0
+        self.http2 = 0
+        self.latencia_total = 0.0
+        self.latencia_maxima = 0.0
+
+    def registrar_inicio(self, request):
+        request.extensions['inicio'] = time.perf_counter()
+
+    def registrar_respuesta(self, response):
+        inicio = response.request.extensions.get('inicio')
+        latencia = time.perf_counter() - inicio if inicio else 0.0
+        with self._lock:
+            self.peticiones += 1
+            self.latencia_total += latencia
+            self.latencia_maxima = max(self.latencia_maxima, latencia)
+            if latencia >= UMBRAL_LENTA:
+                self.lentas += 1
+            if response.status_code >= 500:
+                self.errores += 1
+            if response.extensions.get('http_version') == b'HTTP/2':
+                self.http2 += 1
+
+    def registrar_reintento(self):
+        with self._lock:
+            self.reintentos += 1
+
+    def resumen(self):
+        with self._lock:
+            return {
+                'peticiones': self.peticiones,
+                'errores': self.errores,
+                'reintentos': self.reintentos,
+                'lentas': self.lentas,
+                'respuestas_http2': self.http2,
+                'latencia_promedio': self.latencia_total / self.peticiones if self.peticiones else 0.0,
+                'latencia_maxima': self.latencia_maxima,
+            }
+
+
+class TransporteConReintentos(httpx.HTTPTransport):
+    """Transporte HTTP que reintenta las lecturas ante timeouts o cortes de red"""
+
+    def __init__(self, estadisticas, reintentos=REINTENTOS, **kwargs):
+        # retries= cubre los fallos al abrir la conexión para todos los métodos
+        super().__init__(retries=reintentos, **kwargs)
+        self.estadisticas = estadisticas
+        self.max_reintentos = reintentos
+
+    def handle_request(self, request):
+        for intento in range(self.max_reintentos + 1):
+            try:
+                return super().handle_request(request)
+            except (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError):
+                if request.method not in METODOS_IDEMPOTENTES or intento == self.max_reintentos:
+                    raise
+                self.estadisticas.registrar_reintento()
+                time.sleep(ESPERA_REINTENTO * 2 ** intento)
+
+    def conexiones(self):
+        """Estado actual del pool de conexiones, o {} si httpx no lo expone
+
+        El pool es un detalle interno de httpx; si cambia, las estadísticas
+        simplemente dejan de mostrarlo.
+        """
+        try:
+            conexiones = list(self._pool.connections)
+            libres = sum(1 for c in conexiones if c.is_idle())
+        except Exception:
+            return {}
+        return {
+            'abiertas': len(conexiones),
+            'libres': libres,
+            'en_uso': len(conexiones) - libres,
+        }
+
+
+def _config(nombre, defecto):
+    """Lee un ajuste de conexión desde secrets.toml si existe"""
+    try:
+        return st.secrets.get(nombre, defecto)
+    except Exception:
+        return defecto
+
+
+def crear_cliente_http(estadisticas, al_responder=()):
+    """Crea el cliente HTTP con pool, timeouts y reintentos configurados
+
+    `al_responder` son hooks extra que reciben cada respuesta.
+    """
+    transporte = TransporteConReintentos(
+        estadisticas,
+        reintentos=int(_config('supabase_reintentos', REINTENTOS)),
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=int(_config('supabase_max_conexiones', MAX_CONEXIONES)),
+            max_keepalive_connections=MAX_CONEXIONES_LIBRES,
+            keepalive_expiry=EXPIRACION_KEEPALIVE,
+        ),
+    )
+    return httpx.Client(
+        transport=transporte,
+        timeout=httpx.Timeout(
+            float(_config('supabase_timeout_lectura', TIMEOUT_LECTURA)),
+            connect=float(_config('supabase_timeout_conexion', TIMEOUT_CONEXION)),
+        ),
+        follow_redirects=True,
+        event_hooks={
+            'request': [estadisticas.registrar_inicio],
+            'response': [estadisticas.registrar_respuesta, *al_responder],
+        },
+    )
+
+
+def crear_cliente(url, key, cliente_http=None):
+    """Crea un cliente de Supabase sobre un cliente HTTP configurado"""
+    cliente_http = cliente_http or crear_cliente_http(EstadisticasConexion())
+    return create_client(url, key, options=ClientOptions(httpx_client=cliente_http))
+
+
+@st.cache_resource
+def _estadisticas():
+    return EstadisticasConexion()
+
+
+@st.cache_resource
+def _cliente_http():
+    # Las escrituras de la aplicación invalidan las versiones de la caché compartida
+    return crear_cliente_http(_estadisticas(), [versiones_compartidas().registrar_respuesta])
+
+
+@st.cache_resource
+def _cliente_supabase():
+    return crear_cliente(
+        st.secrets["supabase_url"],
+        st.secrets["supabase_key"],
+        _cliente_http()
+    )
+
+
+# Cliente que reemplaza a Supabase en las pruebas de carga (ver utils/carga.py)
+_cliente_inyectado = None
+
+
+def inyectar_cliente(cliente):
+    """Hace que todas las páginas usen `cliente`; con None se vuelve a Supabase"""
+    global _cliente_inyectado
+    _cliente_inyectado = cliente
+
+
+def obtener_cliente():
+    """Cliente de Supabase compartido por todas las páginas"""
+    if _cliente_inyectado is not None:
+        return _cliente_inyectado
+    return _cliente_supabase()
+
+
+def estadisticas_conexion():
+    """Devuelve los contadores de peticiones y el estado del pool de conexiones"""
+    resumen = _estadisticas().resumen()
+    transporte = getattr(_cliente_http(), '_transport', None)
+    resumen['pool'] = transporte.conexiones() if isinstance(transporte, TransporteConReintentos) else {}
+    return resumen
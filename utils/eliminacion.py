@@ -0,0 +1,48 @@
+# utils/eliminacion.py
+from datetime import datetime, timedelta, timezone
+
+# Días que una fila eliminada se puede restaurar antes de que la purga la borre
+DIAS_RETENCION = 7
+
+
+def marcar_eliminado(supabase, tabla, fila_id):
+    """Oculta una fila al instante; sus datos dependientes se borran luego con purgar_eliminados"""
+    supabase.table(tabla)\
+        .update({'eliminado_en': datetime.now(timezone.utc).isoformat()})\
+        .eq('id', fila_id)\
+        .execute()
+
+
+def restaurar(supabase, tabla, fila_id):
+    """Vuelve a mostrar una fila eliminada que todavía no se purgó; devuelve si existía"""
+    restauradas = supabase.table(tabla)\
+        .update({'eliminado_en': None})\
+        .eq('id', fila_id)\
+        .execute()
+    return bool(restauradas.data)
+
+
+def eliminados_recientes(supabase, tabla, columnas, curso_id=None, retencion_dias=DIAS_RETENCION):
+    """Filas eliminadas que todavía se pueden restaurar, de la más reciente a la más antigua"""
+    limite = datetime.now(timezone.utc) - timedelta(days=retencion_dias)
+    consulta = supabase.table(tabla)\
+        .select(columnas)\
+        .gte('eliminado_en', limite.isoformat())
+    if curso_id is not None:
+        consulta = consulta.eq('curso_id', curso_id)
+    return consulta.order('eliminado_en', desc=True).execute().data
+
+
+def purgar(supabase, lote=5000, retencion_dias=DIAS_RETENCION):
+    """Borra en lotes los datos de filas eliminadas hace más de `retencion_dias`
+
+    Cada llamada al servidor borra como máximo `lote` filas. Devuelve el total borrado.
+    """
+    total = 0
+    while True:
+        borradas = supabase.rpc('purgar_eliminados', {
+            'p_lote': lote, 'p_retencion': f"{retencion_dias} days"
+        }).execute().data or 0
+        total += borradas
+        if borradas == 0:
+            return total
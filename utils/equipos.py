@@ -0,0 +1,125 @@
+# utils/equipos.py
+import heapq
+import math
+import random
+
+from utils.archivo import leer_todo
+
+MODOS = {
+    'aleatorio': "Aleatorio",
+    'balanceado': "Balanceado por puntos acumulados",
+    'sin_repetir': "Evitar compañeros anteriores",
+}
+
+# Repartos que se prueban en el modo sin repetir; se queda el de menos parejas repetidas
+INTENTOS_SIN_REPETIR = 20
+
+
+def capacidades(total, tamano):
+    """Tamaño de cada grupo para repartir `total` estudiantes de la forma más pareja"""
+    cantidad = max(1, math.ceil(total / tamano))
+    base, extra = divmod(total, cantidad)
+    return [base + (1 if i < extra else 0) for i in range(cantidad)]
+
+
+def _repartir_aleatorio(ids, cupos):
+    grupos, inicio = [], 0
+    for cupo in cupos:
+        grupos.append(ids[inicio:inicio + cupo])
+        inicio += cupo
+    return grupos
+
+
+def _repartir_balanceado(ids, cupos, puntos):
+    # El estudiante con más puntos va al grupo con menor suma que tenga cupo
+    grupos = [[] for _ in cupos]
+    monticulo = [(0.0, i) for i in range(len(cupos))]
+    for estudiante_id in sorted(ids, key=lambda e: puntos.get(e, 0), reverse=True):
+        suma, i = heapq.heappop(monticulo)
+        grupos[i].append(estudiante_id)
+        if len(grupos[i]) < cupos[i]:
+            heapq.heappush(monticulo, (suma + puntos.get(estudiante_id, 0), i))
+    return grupos
+
+
+def _repartir_sin_repetir(ids, cupos, parejas):
+    # Cada estudiante va al grupo con menos compañeros anteriores y luego al más vacío
+    grupos = [[] for _ in cupos]
+    grupo_de = {}
+    for estudiante_id in ids:
+        conflictos = {}
+        for companero in parejas.get(estudiante_id, ()):
+            if companero in grupo_de:
+                conflictos[grupo_de[companero]] = conflictos.get(grupo_de[companero], 0) + 1
+        i = min(
+            (i for i in range(len(cupos)) if len(grupos[i]) < cupos[i]),
+            key=lambda i: (conflictos.get(i, 0), len(grupos[i]))
+        )
+        grupos[i].append(estudiante_id)
+        grupo_de[estudiante_id] = i
+    return grupos
+
+
+def generar_grupos(ids, tamano, modo='aleatorio', semilla=None, puntos=None, parejas=None):
+    """Reparte los estudiantes en grupos de aproximadamente `tamano` integrantes
+
+    `puntos` es {estudiante_id: puntos acumulados} para el modo balanceado y
+    `parejas` es {estudiante_id: set de compañeros anteriores} para evitar
+        repetir; en ese modo se prueban varios órdenes y se devuelve el reparto
+    con menos parejas repetidas. Con la misma semilla se obtiene siempre el
+    mismo reparto.
+    """
+    if not ids:
+        return []
+    ids = list(ids)
+    azar = random.Random(semilla)
+    azar.shuffle(ids)
+    cupos = capacidades(len(ids), tamano)
+
+    if modo == 'balanceado':
+        return _repartir_balanceado(ids, cupos, puntos or {})
+    if modo == 'sin_repetir':
+        parejas = parejas or {}
+        mejor, menos = None, None
+        for _ in range(INTENTOS_SIN_REPETIR if parejas else 1):
+            grupos = _repartir_sin_repetir(ids, cupos, parejas)
+            repetidas = parejas_repetidas(grupos, parejas)
+            if menos is None or repetidas < menos:
+                mejor, menos = grupos, repetidas
+            if not repetidas:
+                break
+            azar.shuffle(ids)
+        return mejor
+    return _repartir_aleatorio(ids, cupos)
+
+
+def parejas_anteriores(filas):
+    """Construye {estudiante_id: compañeros} a partir de filas (estudiante_a, estudiante_b)"""
+    parejas = {}
+    for f in filas:
+        parejas.setdefault(f['estudiante_a'], set()).add(f['estudiante_b'])
+        parejas.setdefault(f['estudiante_b'], set()).add(f['estudiante_a'])
+    return parejas
+
+
+def leer_parejas(supabase, curso_id):
+    """Compañeros anteriores de cada estudiante según el historial del curso
+
+    El historial se llena al formar grupos y se conserva al disolverlos.
+    """
+    return parejas_anteriores(leer_todo(
+        lambda: supabase.table('parejas_historial')
+        .select('id, estudiante_a, estudiante_b')
+        .eq('curso_id', curso_id)
+    ))
+
+
+def parejas_repetidas(grupos, parejas):
+    """Cantidad de parejas dentro de `grupos` que ya trabajaron juntas"""
+    return sum(
+        1
+        for integrantes in grupos
+        for i, estudiante_id in enumerate(integrantes)
+        for companero in integrantes[i + 1:]
+        if companero in parejas.get(estudiante_id, ())
+    )
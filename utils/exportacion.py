@@ -0,0 +1,132 @@
+# utils/exportacion.py
+import re
+
+from utils.archivo import DatosArchivados, leer_todo
+from utils.totales import TotalesSesion
+
+
+def datos_curso(supabase, curso_id):
+    """Consulta sesiones, estudiantes, grupos y puntos de un curso para exportarlo
+
+    Si el curso está archivado los datos se leen de su archivo, tabla por tabla
+    a medida que se usan.
+    """
+    curso = supabase.table('cursos')\
+        .select('archivo_ruta')\
+        .eq('id', curso_id)\
+        .execute().data
+    if curso and curso[0].get('archivo_ruta'):
+        return DatosArchivados(supabase, curso[0]['archivo_ruta'])
+
+    # PostgREST corta cada respuesta en 1000 filas: todo se lee por páginas
+    sesiones = leer_todo(lambda: supabase.table('sesiones')
+                         .select('*')
+                         .eq('curso_id', curso_id)
+                         .is_('eliminado_en', 'null')
+                         .order('fecha'))
+    ids_sesiones = [s['id'] for s in sesiones]
+
+    datos = {
+        'sesiones': sesiones,
+        'estudiantes': leer_todo(lambda: supabase.table('estudiantes_curso')
+                                 .select('*')
+                                 .eq('curso_id', curso_id)
+                                 .is_('eliminado_en', 'null')
+                                 .order('apellidos')),
+        'grupos': leer_todo(lambda: supabase.table('grupos')
+                            .select('*')
+                            .eq('curso_id', curso_id)),
+        'miembros': leer_todo(lambda: supabase.table('estudiantes_grupo')
+                              .select('estudiante_id, grupo_id, grupos!inner(curso_id), estudiantes_curso!inner(eliminado_en)')
+                              .eq('grupos.curso_id', curso_id)
+                              .is_('estudiantes_curso.eliminado_en', 'null')),
+        'puntos_individuales': [],
+        'puntos_grupales': [],
+    }
+    if ids_sesiones:
+        for tabla in ('puntos_individuales', 'puntos_grupales'):
+            datos[tabla] = leer_todo(lambda: supabase.table(tabla)
+                                     .select('*')
+                                     .in_('sesion_id', ids_sesiones))
+    return datos
+
+
+def totales_sesion(miembros, puntos_grupales, puntos_individuales):
+    """Totales por estudiante a partir de los puntos guardados de una sesión"""
+    totales = TotalesSesion((m['grupo_id'], m['estudiante_id']) for m in miembros)
+    for p in puntos_grupales:
+        totales.fijar_grupo(p['grupo_id'], p['puntos'])
+    for p in puntos_individuales:
+        totales.fijar_individual(p['estudiante_id'], p['puntos'])
+    return totales
+
+
+def filas_sesion(estudiantes, grupos, miembros, totales):
+    """Filas de la hoja de puntos de una sesión, una por estudiante"""
+    nombres_grupos = {g['id']: g['nombre'] for g in grupos}
+    grupos_por_estudiante = {}
+    for m in miembros:
+        if m['grupo_id'] in nombres_grupos:
+            grupos_por_estudiante.setdefault(m['estudiante_id'], []).append(nombres_grupos[m['grupo_id']])
+
+    return [
+        {
+            'Apellidos': est['apellidos'],
+            'Nombres': est['nombres'],
+            'Grupos': ', '.join(grupos_por_estudiante.get(est['id'], [])),
+            'Puntos Individuales': totales.individual_de(est['id']),
+            'Puntos Grupales': totales.grupal_de(est['id']),
+            'Total': totales.total_de(est['id'])
+        }
+        for est in estudiantes
+    ]
+
+
+def nombre_hoja(nombre, usados):
+    """Nombre de hoja de Excel válido (31 caracteres, sin símbolos reservados) y sin repetir"""
+    base = re.sub(r'[\[\]:*?/\\]', '_', nombre).strip() or 'Hoja'
+    candidato, n = base[:31], 2
+    while candidato.lower() in usados:
+        sufijo = f" ({n})"
+        candidato, n = base[:31 - len(sufijo)] + sufijo, n + 1
+    usados.add(candidato.lower())
+    return candidato
+
+
+def escribir_excel(hojas, destino):
+    """Escribe {nombre de hoja: DataFrame} en un archivo o buffer, ajustando el ancho de columnas"""
+    import pandas as pd
+
+    with pd.ExcelWriter(destino, engine='xlsxwriter') as writer:
+        for hoja, df in hojas.items():
+            df.to_excel(writer, index=False, sheet_name=hoja)
+            worksheet = writer.sheets[hoja]
+            for idx, col in enumerate(df.columns):
+                largo = df[col].astype(str).str.len().max() if len(df) else 0
+                worksheet.set_column(idx, idx, max(largo, len(col)) + 2)
+
+
+def exportar_curso(supabase, curso_id, destino):
+    """Exporta todas las sesiones de un curso a un Excel con una hoja por sesión"""
+    import pandas as pd
+
+    datos = datos_curso(supabase, curso_id)
+    grupales, individuales = {}, {}
+    for p in datos['puntos_grupales']:
+        grupales.setdefault(p['sesion_id'], []).append(p)
+    for p in datos['puntos_individuales']:
+        individuales.setdefault(p['sesion_id'], []).append(p)
+
+    hojas, usados = {}, set()
+    for sesion in datos['sesiones']:
+        totales = totales_sesion(
+            datos['miembros'], grupales.get(sesion['id'], []), individuales.get(sesion['id'], [])
+        )
+        filas = filas_sesion(datos['estudiantes'], datos['grupos'], datos['miembros'], totales)
+        hojas[nombre_hoja(f"{sesion['fecha']} {sesion['nombre']}", usados)] = pd.DataFrame(
+            filas, columns=['Apellidos', 'Nombres', 'Grupos', 'Puntos Individuales', 'Puntos Grupales', 'Total']
+        )
+    if not hojas:
+        hojas['Sin sesiones'] = pd.DataFrame(columns=['Apellidos', 'Nombres'])
+    escribir_excel(hojas, destino)
+    return len(datos['sesiones'])
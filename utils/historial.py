@@ -0,0 +1,55 @@
+# utils/historial.py
+import streamlit as st
+
+from utils.operaciones import limpiar_widgets_puntos
+
+
+def autor_actual():
+    """Correo del usuario que guarda los cambios, si la app usa inicio de sesión"""
+    try:
+        if st.user.is_logged_in:
+            return st.user.get('email')
+    except Exception:
+        pass
+    return None
+
+
+def guardar_con_historial(supabase, individuales, grupales):
+    """Guarda los puntos pendientes y su historial en una sola transacción
+
+    `individuales` y `grupales` son {id de la fila: puntos}. Devuelve el
+    identificador del lote, que se puede deshacer como una unidad.
+    """
+    resultado = supabase.rpc('guardar_puntos_con_historial', {
+        'p_individuales': {str(fila_id): puntos for fila_id, puntos in individuales.items()},
+        'p_grupales': {str(fila_id): puntos for fila_id, puntos in grupales.items()},
+        'p_autor': autor_actual()
+    }).execute()
+    return resultado.data
+
+
+def _aplicar_lote(supabase, funcion, sesion_id, vacio):
+    try:
+        resultado = supabase.rpc(funcion, {'p_sesion_id': sesion_id}).execute()
+    except Exception as e:
+        if 'lote_fuera_de_rango' in str(e):
+            st.warning("⚠️ Estos puntos superan el puntaje máximo actual de la sesión; "
+                       "sube el máximo en Sesiones para poder revertirlos")
+        else:
+            st.error(f"Error al aplicar el historial: {str(e)}")
+        return
+    if not resultado.data:
+        st.info(vacio)
+        return
+    limpiar_widgets_puntos()
+    st.rerun()
+
+
+def mostrar_deshacer_rehacer(supabase, sesion_id, deshabilitado=False):
+    """Botones para deshacer y rehacer los últimos lotes guardados de la sesión"""
+    if st.button("↩️ Deshacer", key="deshacer_lote", disabled=deshabilitado,
+                 use_container_width=True, help="Revierte el último guardado de la sesión"):
+        _aplicar_lote(supabase, 'deshacer_lote', sesion_id, "No hay cambios guardados para deshacer")
+    if st.button("↪️ Rehacer", key="rehacer_lote", disabled=deshabilitado,
+                 use_container_width=True, help="Vuelve a aplicar el último guardado deshecho"):
+        _aplicar_lote(supabase, 'rehacer_lote', sesion_id, "No hay cambios deshechos para rehacer")
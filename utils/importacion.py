@@ -0,0 +1,134 @@
+# utils/importacion.py
+from utils.cargador import cargador_puntos
+
+# Filas de ejemplo de la plantilla de estudiantes, se ignoran al importar
+EJEMPLOS_PLANTILLA = [
+    ('Pérez García', 'Juan'),
+    ('Martínez López', 'María')
+]
+
+
+def leer_archivo(archivo):
+    """Lee un archivo CSV o Excel subido en un DataFrame"""
+    import pandas as pd
+
+    if archivo.name.endswith('.csv'):
+        return pd.read_csv(archivo)
+    return pd.read_excel(archivo)
+
+
+def limpiar_nombres(df, quitar_ejemplos=True):
+    """Limpia espacios en blanco de apellidos y nombres y quita las filas de ejemplo"""
+    import pandas as pd
+
+    df = df.dropna(subset=['apellidos', 'nombres']).copy()
+    df['apellidos'] = df['apellidos'].astype(str).str.split().str.join(' ')
+    df['nombres'] = df['nombres'].astype(str).str.split().str.join(' ')
+    if not quitar_ejemplos:
+        return df
+    ejemplos = pd.MultiIndex.from_tuples(EJEMPLOS_PLANTILLA)
+    es_ejemplo = pd.MultiIndex.from_frame(df[['apellidos', 'nombres']]).isin(ejemplos)
+    return df[~es_ejemplo]
+
+
+def normalizar_serie(serie):
+    """Versión vectorizada de busqueda.normalizar_texto para columnas de pandas"""
+    return serie.astype(str)\
+        .str.normalize('NFKD')\
+        .str.replace('[\u0300-\u036f]', '', regex=True)\
+        .str.casefold()\
+        .str.split().str.join(' ')
+
+
+def clave_estudiante(df):
+    """Clave de coincidencia de un estudiante: apellidos y nombres normalizados"""
+    return normalizar_serie(df['apellidos']) + '|' + normalizar_serie(df['nombres'])
+
+
+def plantilla_puntos(estudiantes):
+    """Plantilla CSV con los estudiantes del curso y una columna de puntos vacía"""
+    import pandas as pd
+
+    df = pd.DataFrame([(e['apellidos'], e['nombres']) for e in estudiantes], columns=['apellidos', 'nombres'])
+    df['puntos'] = None
+    return df.to_csv(index=False).encode('utf-8')
+
+
+def preparar_puntos(df, estudiantes, puntaje_maximo):
+    """Cruza un archivo de puntos con los estudiantes del curso
+
+    Devuelve (coincidencias, sin_coincidencia, ambiguos, invalidos). Las
+    coincidencias tienen la columna estudiante_id; los ambiguos son filas cuyo
+    nombre tienen varios estudiantes del curso y los inválidos son filas con
+    puntos vacíos o fuera del rango 0 - puntaje_maximo.
+    """
+    import pandas as pd
+
+    faltantes = {'apellidos', 'nombres', 'puntos'} - set(df.columns)
+    if faltantes:
+        raise ValueError("El archivo debe contener las columnas 'apellidos', 'nombres' y 'puntos'")
+
+    df = limpiar_nombres(df, quitar_ejemplos=False)
+    df['puntos'] = pd.to_numeric(df['puntos'], errors='coerce')
+    df['clave'] = clave_estudiante(df)
+
+    curso = pd.DataFrame(
+        [(e['id'], e['apellidos'], e['nombres']) for e in estudiantes], columns=['id', 'apellidos', 'nombres']
+    )
+    curso['clave'] = clave_estudiante(curso)
+    # Un nombre repetido en el curso no se puede asignar con certeza
+    repetidas = curso['clave'].duplicated(keep=False)
+    claves_repetidas = set(curso.loc[repetidas, 'clave'])
+    curso = curso[~repetidas]
+
+    cruce = df.merge(
+        curso[['clave', 'id']].rename(columns={'id': 'estudiante_id'}),
+        on='clave', how='left'
+    )
+    ambiguos = cruce['estudiante_id'].isna() & cruce['clave'].isin(claves_repetidas)
+    sin_coincidencia = cruce['estudiante_id'].isna() & ~ambiguos
+    invalidos = cruce['estudiante_id'].notna() & ~cruce['puntos'].between(0, puntaje_maximo)
+
+    columnas = ['apellidos', 'nombres', 'puntos']
+    coincidencias = cruce[cruce['estudiante_id'].notna() & ~invalidos]\
+        .drop_duplicates('estudiante_id', keep='last')\
+        .astype({'estudiante_id': 'int64'})
+    return (coincidencias, cruce.loc[sin_coincidencia, columnas],
+            cruce.loc[ambiguos, columnas], cruce.loc[invalidos, columnas])
+
+
+def puntos_importados(supabase, sesion_id, coincidencias):
+    """Puntos importados como {id de la fila: puntos}, listos para guardar con historial"""
+    ids_estudiantes = coincidencias['estudiante_id'].tolist()
+    registros = cargador_puntos(
+        supabase, 'puntos_individuales', 'estudiante_id', sesion_id
+    ).cargar_varios(ids_estudiantes)
+
+    return {
+        registro['id']: float(puntos)
+        for registro, puntos in zip(registros, coincidencias['puntos'])
+    }
+
+
+def importar_estudiantes(supabase, curso_id, df):
+    """Agrega los estudiantes del archivo que aún no están en el curso con un solo insert
+
+    Devuelve (agregados, repetidos).
+    """
+    existentes = supabase.table('estudiantes_curso')\
+        .select('apellidos, nombres')\
+        .eq('curso_id', curso_id)\
+        .is_('eliminado_en', 'null')\
+        .execute().data
+    vistos = {(e['apellidos'], e['nombres']) for e in existentes}
+
+    nuevos, repetidos = [], 0
+    for apellidos, nombres in zip(df['apellidos'], df['nombres']):
+        if (apellidos, nombres) in vistos:
+            repetidos += 1
+            continue
+        vistos.add((apellidos, nombres))
+        nuevos.append({'curso_id': curso_id, 'apellidos': apellidos, 'nombres': nombres})
+    if nuevos:
+        supabase.table('estudiantes_curso').insert(nuevos).execute()
+    return len(nuevos), repetidos
@@ -0,0 +1,123 @@
+# utils/instantanea.py
+import sys
+from array import array
+
+from utils.archivo import leer_todo
+from utils.busqueda import IndiceBusqueda
+from utils.cache import compartido, versiones
+
+
+class Registro:
+    """Fila compacta con __slots__ que se lee igual que un dict de PostgREST"""
+
+    __slots__ = ()
+
+    def __getitem__(self, campo):
+        try:
+            return getattr(self, campo)
+        except AttributeError:
+            raise KeyError(campo)
+
+    def get(self, campo, defecto=None):
+        return getattr(self, campo, defecto)
+
+    def como_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.como_dict()})"
+
+
+class Estudiante(Registro):
+    __slots__ = ('id', 'apellidos', 'nombres')
+
+    def __init__(self, fila):
+        self.id = fila['id']
+        # Los nombres repetidos (entre cursos y sesiones) comparten el mismo objeto
+        self.apellidos = sys.intern(fila['apellidos'])
+        self.nombres = sys.intern(fila['nombres'])
+
+
+class Grupo(Registro):
+    __slots__ = ('id', 'nombre')
+
+    def __init__(self, fila):
+        self.id = fila['id']
+        self.nombre = sys.intern(fila['nombre'])
+
+
+class Miembro(Registro):
+    __slots__ = ('grupo_id', 'estudiante_id')
+
+    def __init__(self, grupo_id, estudiante_id):
+        self.grupo_id = grupo_id
+        self.estudiante_id = estudiante_id
+
+
+class InstantaneaCurso:
+    """Estudiantes, grupos e integrantes de un curso, de solo lectura
+
+    Se comparte entre todas las sesiones del navegador que ven el mismo curso,
+    así que nunca debe modificarse. Los integrantes de cada grupo se guardan
+    como arreglos de posiciones en `estudiantes`.
+    """
+
+    __slots__ = ('curso_id', 'version', 'estudiantes', 'grupos', 'miembros',
+                 'posicion', 'integrantes', '_indice')
+
+    def __init__(self, curso_id, version, estudiantes, grupos, miembros):
+        self.curso_id = curso_id
+        self.version = version
+        self.estudiantes = tuple(Estudiante(e) for e in estudiantes)
+        self.posicion = {e.id: pos for pos, e in enumerate(self.estudiantes)}
+        self.grupos = tuple(Grupo(g) for g in grupos)
+
+        ids_grupos = {g.id for g in self.grupos}
+        self.miembros = tuple(
+            Miembro(m['grupo_id'], m['estudiante_id']) for m in miembros
+            if m['grupo_id'] in ids_grupos and m['estudiante_id'] in self.posicion
+        )
+        self.integrantes = {}
+        for m in self.miembros:
+            self.integrantes.setdefault(m.grupo_id, array('i')).append(self.posicion[m.estudiante_id])
+        self._indice = None
+
+    @property
+    def clave(self):
+        return (self.curso_id, self.version)
+
+    def integrantes_de(self, grupo_id):
+        """Estudiantes de un grupo, en el orden en que se agregaron"""
+        return [self.estudiantes[pos] for pos in self.integrantes.get(grupo_id, ())]
+
+    def indice(self):
+        """Índice de búsqueda de los estudiantes, construido una vez por instantánea"""
+        if self._indice is None:
+            self._indice = IndiceBusqueda(self.estudiantes)
+        return self._indice
+
+
+def _construir(supabase, curso_id, version):
+    # Por páginas: una respuesta truncada quedaría en la caché para todos
+    estudiantes = leer_todo(lambda: supabase.table('estudiantes_curso')
+                            .select('id, apellidos, nombres')
+                            .eq('curso_id', curso_id)
+                            .is_('eliminado_en', 'null')
+                            .order('apellidos'))
+    grupos = leer_todo(lambda: supabase.table('grupos')
+                       .select('id, nombre')
+                       .eq('curso_id', curso_id))
+    miembros = leer_todo(lambda: supabase.table('estudiantes_grupo')
+                         .select('grupo_id, estudiante_id, grupos!inner(curso_id)')
+                         .eq('grupos.curso_id', curso_id))
+    return InstantaneaCurso(curso_id, version, estudiantes, grupos, miembros)
+
+
+def obtener_instantanea(supabase, curso_id):
+    """Instantánea compartida del curso para su versión de estructura actual
+
+    Cuando cambian los estudiantes, los grupos o las sesiones la versión sube
+    y se construye una instantánea nueva; la vieja sale de la caché por antigüedad.
+    """
+    version = versiones(supabase, curso_id)['estructura']
+    return compartido(('instantanea', curso_id, version), lambda: _construir(supabase, curso_id, version))
@@ -0,0 +1,175 @@
+# utils/notas.py
+from utils.archivo import DatosArchivados
+from utils.cache import compartido
+
+# Escala de la nota final (vigesimal)
+ESCALA = 20
+
+
+class MatrizNotas:
+    """Totales de todos los estudiantes en todas las sesiones de un curso
+
+    `totales` e `individuales` son arreglos de numpy estudiantes × sesiones;
+    las sesiones van por fecha y los estudiantes por apellidos. Se comparte
+    entre sesiones del navegador, así que nunca debe modificarse.
+    """
+
+    __slots__ = ('curso_id', 'version', 'sesiones', 'estudiantes', 'totales', 'individuales',
+                 'maximos', 'pesos')
+
+    def __init__(self, curso_id, version, sesiones, estudiantes, totales, individuales):
+        import numpy as np
+
+        forma = (len(estudiantes), len(sesiones))
+        self.curso_id = curso_id
+        self.version = version
+        self.sesiones = sesiones
+        self.estudiantes = estudiantes
+        self.totales = np.array(totales or [], dtype=float).reshape(forma)
+        self.individuales = np.array(individuales or [], dtype=float).reshape(forma)
+        self.maximos = np.array([s['puntaje_maximo'] for s in sesiones], dtype=float)
+        self.pesos = np.array([s.get('peso', 1) for s in sesiones], dtype=float)
+
+    def proporciones(self):
+        """Total de cada sesión dividido entre su máximo, entre 0 y 1
+
+        Un total por encima del máximo (individual más grupal) cuenta como el máximo.
+        """
+        import numpy as np
+
+        maximos = np.where(self.maximos > 0, self.maximos, 1.0)
+        return np.clip(self.totales / maximos, 0.0, 1.0)
+
+
+def notas_finales(matriz, descartar=0, escala=ESCALA, pesos=None):
+    """Nota final de cada estudiante, en el orden de `matriz.estudiantes`
+
+    Cada sesión se normaliza por su máximo y pesa según `pesos` (por defecto
+    el peso guardado). Antes de promediar se descartan las `descartar`
+    sesiones con peso en que cada estudiante sacó menos; siempre queda al
+    menos una. Sin sesiones con peso todas las notas son 0.
+    """
+    import numpy as np
+
+    pesos = matriz.pesos if pesos is None else np.asarray(pesos, dtype=float)
+    proporciones = matriz.proporciones()
+    estudiantes, sesiones = proporciones.shape
+    con_peso = pesos > 0
+    descartar = max(0, min(int(descartar), int(con_peso.sum()) - 1))
+
+    por_estudiante = np.broadcast_to(np.where(con_peso, pesos, 0.0), proporciones.shape).copy()
+    if descartar and estudiantes:
+        # Las sesiones sin peso se ordenan al final para no descartarlas
+        orden = np.argsort(np.where(con_peso, proporciones, np.inf), axis=1, kind='stable')
+        np.put_along_axis(por_estudiante, orden[:, :descartar], 0.0, axis=1)
+
+    suma_pesos = por_estudiante.sum(axis=1)
+    ponderado = (proporciones * por_estudiante).sum(axis=1)
+    return np.divide(ponderado, suma_pesos, out=np.zeros(estudiantes), where=suma_pesos > 0) * escala
+
+
+def version_datos(supabase, curso_id):
+    """Versión de todos los datos del curso, incluidos los puntos"""
+    return supabase.rpc('version_curso', {'p_curso_id': curso_id}).execute().data
+
+
+def datos_matriz(datos):
+    """Lo mismo que devuelve matriz_notas_curso, armado con las tablas de un curso
+
+    Sirve para los cursos archivados, cuyas filas ya no están en la base.
+    """
+    sesiones = sorted(datos['sesiones'], key=lambda s: (str(s['fecha'])[:10], s['id']))
+    estudiantes = sorted(datos['estudiantes'], key=lambda e: (e['apellidos'], e['nombres'], e['id']))
+
+    individuales = {(p['sesion_id'], p['estudiante_id']): p['puntos'] for p in datos['puntos_individuales']}
+    por_grupo = {}
+    for p in datos['puntos_grupales']:
+        por_grupo.setdefault(p['grupo_id'], []).append(p)
+    grupales = {}
+    for m in datos['miembros']:
+        for p in por_grupo.get(m['grupo_id'], ()):
+            clave = (p['sesion_id'], m['estudiante_id'])
+            grupales[clave] = grupales.get(clave, 0) + p['puntos']
+    con_puntos = {sesion_id for sesion_id, _ in individuales}
+
+    return {
+        'sesiones': [
+            {
+                'id': s['id'],
+                'nombre': s['nombre'],
+                'fecha': str(s['fecha'])[:10],
+                'puntaje_maximo': s['puntaje_maximo'],
+                'peso': s.get('peso', 1),
+                'con_puntos': s['id'] in con_puntos,
+            }
+            for s in sesiones
+        ],
+        'estudiantes': [
+            {'id': e['id'], 'apellidos': e['apellidos'], 'nombres': e['nombres']} for e in estudiantes
+        ],
+        'totales': [
+            [individuales.get((s['id'], e['id']), 0) + grupales.get((s['id'], e['id']), 0) for s in sesiones]
+            for e in estudiantes
+        ],
+        'individuales': [
+            [individuales.get((s['id'], e['id']), 0) for s in sesiones]
+            for e in estudiantes
+        ],
+    }
+
+
+def obtener_matriz(supabase, curso_id, version=None):
+    """Matriz del curso de la caché compartida; se consulta una vez por versión de datos
+
+    Un curso archivado se arma desde su archivo, como exportacion.datos_curso.
+    """
+    version = version_datos(supabase, curso_id) if version is None else version
+
+    def construir():
+        curso = supabase.table('cursos')\
+            .select('archivo_ruta')\
+            .eq('id', curso_id)\
+            .execute().data
+        if curso and curso[0].get('archivo_ruta'):
+            datos = datos_matriz(DatosArchivados(supabase, curso[0]['archivo_ruta']))
+        else:
+            datos = supabase.rpc('matriz_notas_curso', {'p_curso_id': curso_id}).execute().data
+        return MatrizNotas(curso_id, version, datos['sesiones'], datos['estudiantes'],
+                           datos['totales'], datos['individuales'])
+
+    return compartido(('matriz_notas', curso_id, version), construir)
+
+
+def obtener_notas(matriz, descartar=0, escala=ESCALA):
+    """Notas finales de la caché compartida, por versión de datos y reglas de cálculo"""
+    return compartido(
+        ('notas_finales', matriz.curso_id, matriz.version, descartar, escala),
+        lambda: notas_finales(matriz, descartar, escala)
+    )
+
+
+def filas_notas(matriz, notas, decimales=2):
+    """Filas del reporte de notas: estudiante, nota de cada sesión sobre su máximo y nota final"""
+    proporciones = matriz.proporciones()
+    filas = []
+    for i, est in enumerate(matriz.estudiantes):
+        fila = {'Apellidos': est['apellidos'], 'Nombres': est['nombres']}
+        for j, sesion in enumerate(matriz.sesiones):
+            fila[sesion['nombre']] = round(float(proporciones[i, j] * sesion['puntaje_maximo']), decimales)
+        fila['Nota final'] = round(float(notas[i]), decimales)
+        filas.append(fila)
+    return filas
+
+
+def guardar_pesos(supabase, curso_id, pesos):
+    """Guarda {sesion_id: peso} en una sola llamada; devuelve (exito, mensaje)"""
+    if any(p < 0 for p in pesos.values()):
+        return False, "Los pesos no pueden ser negativos"
+    try:
+        actualizadas = supabase.rpc('fijar_pesos_sesiones', {
+            'p_curso_id': curso_id,
+            'p_pesos': {str(k): v for k, v in pesos.items()},
+        }).execute().data
+        return True, f"Pesos actualizados en {actualizadas} sesiones"
+    except Exception as e:
+        return False, f"Error al guardar los pesos: {str(e)}"
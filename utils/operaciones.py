@@ -0,0 +1,117 @@
+# utils/operaciones.py
+import streamlit as st
+
+OPERACIONES = {
+    'fijar_todos': "Asignar el mismo puntaje a todos",
+    'sumar_todos': "Sumar puntos a todos los presentes",
+    'sumar_grupo': "Sumar puntos a los integrantes de un grupo",
+    'copiar_sesion': "Copiar puntos de otra sesión",
+    'reiniciar': "Reiniciar todos los puntos a 0",
+}
+
+
+def limpiar_widgets_puntos():
+    """Olvida los valores de los inputs de puntos para que muestren los datos nuevos"""
+    for clave in list(st.session_state.keys()):
+        if isinstance(clave, str) and clave.startswith(('ind_', 'grupo_')):
+            del st.session_state[clave]
+
+
+def aplicar_operacion(supabase, funcion, parametros):
+    """Ejecuta una operación masiva en el servidor y devuelve (exito, mensaje)"""
+    try:
+        resultado = supabase.rpc(funcion, parametros).execute()
+        return True, f"Operación aplicada a {resultado.data or 0} estudiantes"
+    except Exception as e:
+        mensaje = getattr(e, 'message', None) or str(e)
+        return False, f"No se pudo aplicar la operación: {mensaje}"
+
+
+def mostrar_operaciones_masivas(supabase, sesion, grupos, estudiantes=(), autor=None):
+    """Formulario de operaciones masivas sobre los puntos de la sesión actual
+
+    Cada operación queda en el historial de la sesión a nombre de `autor`.
+    """
+    # El resultado de la última operación se muestra después del rerun
+    mensaje = st.session_state.pop('mensaje_operacion_masiva', None)
+    if mensaje:
+        st.success(f"✅ {mensaje}")
+
+    with st.expander("⚡ Operaciones masivas"):
+        operacion = st.selectbox(
+            "Operación",
+            options=list(OPERACIONES),
+            format_func=lambda x: OPERACIONES[x],
+            key="operacion_masiva"
+        )
+        maximo = float(sesion['puntaje_maximo'])
+
+        if operacion == 'fijar_todos':
+            puntos = st.number_input("Puntos", min_value=0.0, max_value=maximo, step=0.5,
+                                     key="op_fijar_puntos")
+            funcion, parametros = 'puntos_fijar_todos', {'p_sesion_id': sesion['id'], 'p_puntos': puntos}
+        elif operacion == 'sumar_todos':
+            delta = st.number_input("Puntos a sumar (negativo para restar)", min_value=-maximo,
+                                    max_value=maximo, value=1.0, step=0.5, key="op_sumar_puntos")
+            # La asistencia no se guarda: quien tiene 0 puntos puede estar presente
+            ausentes = st.multiselect(
+                "Ausentes (no reciben los puntos)",
+                options=[e['id'] for e in estudiantes],
+                format_func={e['id']: f"{e['apellidos']}, {e['nombres']}" for e in estudiantes}.get,
+                key="op_ausentes"
+            )
+            funcion, parametros = 'puntos_sumar_todos', {
+                'p_sesion_id': sesion['id'], 'p_delta': delta, 'p_excluir': ausentes
+            }
+        elif operacion == 'sumar_grupo':
+            if not grupos:
+                st.info("No hay grupos creados en este curso")
+                return
+            grupo_id = st.selectbox(
+                "Grupo",
+                options=[g['id'] for g in grupos],
+                format_func={g['id']: g['nombre'] for g in grupos}.get,
+                key="op_grupo"
+            )
+            delta = st.number_input("Puntos a sumar (negativo para restar)", min_value=-maximo,
+                                    max_value=maximo, value=1.0, step=0.5, key="op_grupo_puntos")
+            funcion, parametros = 'puntos_sumar_grupo', {
+                'p_sesion_id': sesion['id'], 'p_grupo_id': grupo_id, 'p_delta': delta
+            }
+        elif operacion == 'copiar_sesion':
+            sesiones = supabase.table('sesiones')\
+                .select('id, nombre, fecha')\
+                .eq('curso_id', sesion['curso_id'])\
+                .is_('eliminado_en', 'null')\
+                .order('fecha', desc=True)\
+                .execute()
+            otras = [s for s in sesiones.data if s['id'] != sesion['id']]
+            if not otras:
+                st.info("No hay otras sesiones en este curso")
+                return
+            origen_id = st.selectbox(
+                "Sesión de origen",
+                options=[s['id'] for s in otras],
+                format_func={s['id']: f"{s['nombre']} ({s['fecha']})" for s in otras}.get,
+                key="op_origen"
+            )
+            funcion, parametros = 'puntos_copiar_sesion', {
+                'p_origen_id': origen_id, 'p_destino_id': sesion['id']
+            }
+        else:
+            st.warning("Se perderán todos los puntos asignados en esta sesión")
+            funcion, parametros = 'puntos_reiniciar', {'p_sesion_id': sesion['id']}
+
+        cambios_pendientes = len(st.session_state.puntos_individuales_pendientes) + \
+                            len(st.session_state.puntos_grupales_pendientes)
+        if cambios_pendientes > 0:
+            st.info("Guarda los cambios pendientes antes de aplicar una operación masiva")
+
+        if st.button("Aplicar", key="aplicar_operacion_masiva", disabled=cambios_pendientes > 0):
+            exito, mensaje = aplicar_operacion(supabase, funcion, {**parametros, 'p_autor': autor})
+            if exito:
+                limpiar_widgets_puntos()
+                st.session_state.mensaje_operacion_masiva = mensaje
+                st.rerun()
+            else:
+                st.error(f"❌ {mensaje}")
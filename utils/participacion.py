@@ -0,0 +1,100 @@
+# utils/participacion.py
+from datetime import date
+
+from utils.cache import compartido
+
+# Valores por defecto del reporte: en riesgo con 0 puntos en 3 de las últimas 5 sesiones
+ULTIMAS_SESIONES = 5
+MINIMO_CEROS = 3
+
+
+def sesiones_pasadas(matriz, hasta=None):
+    """Posiciones de las sesiones ya dictadas antes de `hasta` (hoy por defecto), en orden de fecha
+
+    La sesión del día todavía no cuenta, ni las que nadie abrió: sus puntos
+    se crean al abrirlas, así que sin filas de puntos no hubo registro.
+    """
+    limite = (hasta or date.today()).isoformat()
+    return [
+        j for j, s in enumerate(matriz.sesiones)
+        if str(s['fecha'])[:10] < limite and s.get('con_puntos', True)
+    ]
+
+
+def rachas(ceros):
+    """(racha actual, racha máxima) de sesiones seguidas sin puntos por estudiante
+
+    `ceros` es una matriz booleana estudiantes × sesiones en orden de fecha.
+    """
+    import numpy as np
+
+    estudiantes, sesiones = ceros.shape
+    if not sesiones:
+        vacio = np.zeros(estudiantes, dtype=int)
+        return vacio, vacio
+
+    # Racha actual: ceros seguidos desde la última sesión hacia atrás
+    invertida = ceros[:, ::-1]
+    actual = np.where(invertida.all(axis=1), sesiones, np.argmin(invertida, axis=1))
+
+    # Racha máxima: largo de cada tramo de ceros, a partir de dónde empieza y termina
+    bordes = np.diff(np.pad(ceros.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+    filas, inicios = np.nonzero(bordes == 1)
+    _, fines = np.nonzero(bordes == -1)
+    maxima = np.zeros(estudiantes, dtype=int)
+    np.maximum.at(maxima, filas, fines - inicios)
+    return actual, maxima
+
+
+def reporte_participacion(matriz, ultimas=ULTIMAS_SESIONES, minimo=MINIMO_CEROS, hasta=None):
+    """Participación de cada estudiante en las sesiones ya dictadas
+
+    Una sesión sin puntos individuales cuenta como no participada. Un
+    estudiante está en riesgo si tiene 0 puntos en al menos `minimo` de las
+    últimas `ultimas` sesiones. Devuelve filas ordenadas de mayor a menor riesgo.
+    """
+    import numpy as np
+
+    pasadas = sesiones_pasadas(matriz, hasta)
+    ceros = matriz.individuales[:, pasadas] == 0
+    recientes = ceros[:, -ultimas:] if ultimas else ceros[:, :0]
+    ceros_recientes = recientes.sum(axis=1)
+    participacion = 1 - ceros.mean(axis=1) if pasadas else np.ones(len(matriz.estudiantes))
+    actual, maxima = rachas(ceros)
+
+    filas = [
+        {
+            'estudiante_id': est['id'],
+            'apellidos': est['apellidos'],
+            'nombres': est['nombres'],
+            'ceros_recientes': int(ceros_recientes[i]),
+            'sesiones_recientes': int(recientes.shape[1]),
+            'racha_actual': int(actual[i]),
+            'racha_maxima': int(maxima[i]),
+            'participacion': round(float(participacion[i]) * 100, 1),
+            'en_riesgo': bool(ceros_recientes[i] >= minimo),
+        }
+        for i, est in enumerate(matriz.estudiantes)
+    ]
+    filas.sort(key=lambda f: (-f['ceros_recientes'], -f['racha_actual'], f['participacion']))
+    return filas
+
+
+def obtener_reporte(matriz, ultimas=ULTIMAS_SESIONES, minimo=MINIMO_CEROS):
+    """Reporte de la caché compartida, por versión de datos, parámetros y día"""
+    hoy = date.today()
+    return compartido(
+        ('participacion', matriz.curso_id, matriz.version, ultimas, minimo, hoy),
+        lambda: reporte_participacion(matriz, ultimas, minimo, hoy)
+    )
+
+
+def csv_participacion(filas):
+    """Reporte en CSV con encabezados legibles"""
+    import pandas as pd
+
+    df = pd.DataFrame(filas, columns=[
+        'apellidos', 'nombres', 'ceros_recientes', 'sesiones_recientes',
+        'racha_actual', 'racha_maxima', 'participacion', 'en_riesgo'
+    ])
+    return df.to_csv(index=False).encode('utf-8')
@@ -0,0 +1,232 @@
+# utils/servicio.py
+import json
+import re
+
+from utils.cache import TTL_VERSION, CacheVersionada, VersionesCompartidas
+from utils.exportacion import datos_curso, totales_sesion
+
+# Respuestas guardadas como máximo en la caché compartida
+MAX_RESPUESTAS = 512
+
+
+class FuenteSupabase:
+    """Lee versiones y datos de los cursos desde Supabase"""
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    def version(self, curso_id):
+        return self.supabase.rpc('version_curso', {'p_curso_id': curso_id}).execute().data
+
+    def datos(self, curso_id):
+        curso = self.supabase.table('cursos')\
+            .select('id, nombre')\
+            .eq('id', curso_id)\
+            .is_('eliminado_en', 'null')\
+            .execute().data
+        if not curso:
+            return None
+        datos = datos_curso(self.supabase, curso_id)
+        datos['curso'] = curso[0]
+        return datos
+
+
+class FuenteMemoria:
+    """Fuente en memoria con el mismo formato que FuenteSupabase, para probar la API localmente"""
+
+    def __init__(self, cursos):
+        self.cursos = cursos
+        self.versiones = {curso_id: 1 for curso_id in cursos}
+        self.lecturas = 0
+
+    def version(self, curso_id):
+        self.lecturas += 1
+        return self.versiones.get(curso_id, 1)
+
+    def datos(self, curso_id):
+        self.lecturas += 1
+        return self.cursos.get(curso_id)
+
+    def modificar(self, curso_id, tabla, fila):
+        """Agrega o reemplaza una fila por id e incrementa la versión del curso"""
+        filas = self.cursos[curso_id][tabla]
+        filas[:] = [f for f in filas if f.get('id') != fila.get('id')] + [fila]
+        self.versiones[curso_id] += 1
+
+
+def datos_demo(estudiantes=30, sesiones=4, tamano_grupo=5):
+    """Curso de ejemplo para levantar la API con --fake"""
+    lista = [
+        {'id': 100 + i, 'curso_id': 1, 'apellidos': f"Apellido {i + 1:02d}", 'nombres': f"Estudiante {i + 1}"}
+        for i in range(estudiantes)
+    ]
+    grupos = [
+        {'id': 200 + g, 'curso_id': 1, 'nombre': f"Grupo {g + 1}"}
+        for g in range(max(1, estudiantes // tamano_grupo))
+    ]
+    miembros = [
+        {'estudiante_id': e['id'], 'grupo_id': grupos[i % len(grupos)]['id']}
+        for i, e in enumerate(lista)
+    ]
+    lista_sesiones = [
+        {'id': 300 + s, 'curso_id': 1, 'nombre': f"Sesión {s + 1}", 'fecha': f"2026-03-{s + 2:02d}",
+         'puntaje_maximo': 20}
+        for s in range(sesiones)
+    ]
+    puntos_individuales = [
+        {'id': 1000 + s * estudiantes + i, 'sesion_id': ses['id'], 'estudiante_id': e['id'],
+         'puntos': float((i + s) % 11)}
+        for s, ses in enumerate(lista_sesiones) for i, e in enumerate(lista)
+    ]
+    puntos_grupales = [
+        {'id': 5000 + s * len(grupos) + g, 'sesion_id': ses['id'], 'grupo_id': grupo['id'],
+         'puntos': float((g + s) % 5)}
+        for s, ses in enumerate(lista_sesiones) for g, grupo in enumerate(grupos)
+    ]
+    return {1: {
+        'curso': {'id': 1, 'nombre': "Curso de demostración"},
+        'sesiones': lista_sesiones,
+        'estudiantes': lista,
+        'grupos': grupos,
+        'miembros': miembros,
+        'puntos_individuales': puntos_individuales,
+        'puntos_grupales': puntos_grupales,
+    }}
+
+
+def _estudiante(est):
+    return {'id': est['id'], 'apellidos': est['apellidos'], 'nombres': est['nombres']}
+
+
+def _sesion(ses):
+    return {k: ses[k] for k in ('id', 'nombre', 'fecha', 'puntaje_maximo')}
+
+
+def _totales_por_sesion(datos, sesiones):
+    grupales, individuales = {}, {}
+    for p in datos['puntos_grupales']:
+        grupales.setdefault(p['sesion_id'], []).append(p)
+    for p in datos['puntos_individuales']:
+        individuales.setdefault(p['sesion_id'], []).append(p)
+    return {
+        s['id']: totales_sesion(datos['miembros'], grupales.get(s['id'], []), individuales.get(s['id'], []))
+        for s in sesiones
+    }
+
+
+def json_estudiantes(datos):
+    """Lista de estudiantes del curso con los nombres de sus grupos"""
+    nombres_grupos = {g['id']: g['nombre'] for g in datos['grupos']}
+    grupos_de = {}
+    for m in datos['miembros']:
+        if m['grupo_id'] in nombres_grupos:
+            grupos_de.setdefault(m['estudiante_id'], []).append(nombres_grupos[m['grupo_id']])
+    return {
+        'curso': datos['curso'],
+        'estudiantes': [
+            {**_estudiante(e), 'grupos': grupos_de.get(e['id'], [])}
+            for e in datos['estudiantes']
+        ],
+    }
+
+
+def json_totales_sesion(datos, sesion_id):
+    """Puntos individuales, grupales y totales de cada estudiante en una sesión"""
+    sesion = next((s for s in datos['sesiones'] if s['id'] == sesion_id), None)
+    if sesion is None:
+        return None
+    totales = _totales_por_sesion(datos, [sesion])[sesion_id]
+    return {
+        'curso': datos['curso'],
+        'sesion': _sesion(sesion),
+        'estudiantes': [
+            {
+                **_estudiante(e),
+                'individual': totales.individual_de(e['id']),
+                'grupal': totales.grupal_de(e['id']),
+                'total': totales.total_de(e['id']),
+            }
+            for e in datos['estudiantes']
+        ],
+    }
+
+
+def json_calificaciones(datos):
+    """Libro de calificaciones: total de cada estudiante en cada sesión y su suma"""
+    totales = _totales_por_sesion(datos, datos['sesiones'])
+    estudiantes = []
+    for e in datos['estudiantes']:
+        por_sesion = {str(s['id']): totales[s['id']].total_de(e['id']) for s in datos['sesiones']}
+        estudiantes.append({**_estudiante(e), 'sesiones': por_sesion, 'suma': sum(por_sesion.values())})
+    return {
+        'curso': datos['curso'],
+        'sesiones': [_sesion(s) for s in datos['sesiones']],
+        'estudiantes': estudiantes,
+    }
+
+
+RUTAS = [
+    (re.compile(r'^/cursos/(\d+)/estudiantes$'), lambda datos: json_estudiantes(datos)),
+    (re.compile(r'^/cursos/(\d+)/sesiones/(\d+)/totales$'),
+     lambda datos, sesion_id: json_totales_sesion(datos, int(sesion_id))),
+    (re.compile(r'^/cursos/(\d+)/calificaciones$'), lambda datos: json_calificaciones(datos)),
+]
+
+
+class Servicio:
+    """Resuelve las rutas de la API usando la caché versionada
+
+    Con la versión del curso en caché, una consulta repetida no lee la base de
+    datos; si el cliente ya tiene la versión actual (If-None-Match) se
+    responde 304 sin armar el cuerpo.
+    """
+
+    def __init__(self, fuente, ttl_version=TTL_VERSION, cache=None):
+        self.fuente = fuente
+        self.cache = cache or CacheVersionada(MAX_RESPUESTAS)
+        self._versiones = VersionesCompartidas(ttl_version)
+
+    def version(self, curso_id):
+        return self._versiones.obtener(curso_id, lambda: self.fuente.version(curso_id))
+
+    def responder(self, ruta, si_no_coincide=None):
+        """Devuelve (estado, encabezados, cuerpo en bytes) para una ruta GET"""
+        ruta = ruta.split('?', 1)[0].rstrip('/')
+        if ruta == '/salud':
+            return self.respuesta_json(200, {'estado': 'ok', 'cache': self.estadisticas()})
+
+        for patron, generar in RUTAS:
+            coincidencia = patron.match(ruta)
+            if not coincidencia:
+                continue
+            curso_id, *argumentos = coincidencia.groups()
+            curso_id = int(curso_id)
+            version = self.version(curso_id)
+            etag = f'"{curso_id}-{version}"'
+            encabezados = {'ETag': etag, 'Cache-Control': 'no-cache'}
+            if si_no_coincide and etag in [e.strip() for e in si_no_coincide.split(',')]:
+                return 304, encabezados, b''
+
+            datos = self.cache.obtener(('datos', curso_id, version), lambda: self.fuente.datos(curso_id))
+            if datos is None:
+                return self.respuesta_json(404, {'error': "Curso no encontrado"})
+            cuerpo = self.cache.obtener(
+                (ruta, version),
+                lambda: self._serializar(generar(datos, *argumentos))
+            )
+            if cuerpo is None:
+                return self.respuesta_json(404, {'error': "Recurso no encontrado"})
+            return 200, {**encabezados, 'Content-Type': 'application/json; charset=utf-8'}, cuerpo
+        return self.respuesta_json(404, {'error': "Ruta no encontrada"})
+
+    def estadisticas(self):
+        return {'aciertos': self.cache.aciertos, 'fallos': self.cache.fallos}
+
+    @staticmethod
+    def _serializar(valor):
+        if valor is None:
+            return None
+        return json.dumps(valor, ensure_ascii=False, default=float).encode('utf-8')
+
+    def respuesta_json(self, estado, valor):
+        return estado, {'Content-Type': 'application/json; charset=utf-8'}, self._serializar(valor)
@@ -0,0 +1,57 @@
+# utils/sesiones.py
+from datetime import timedelta
+
+DIAS_SEMANA = ['lun', 'mar', 'mie', 'jue', 'vie', 'sab', 'dom']
+
+
+def fechas_recurrentes(desde, hasta, dias):
+    """Fechas entre `desde` y `hasta` (inclusive) que caen en los días de la semana indicados
+
+    `dias` son números de 0 (lunes) a 6 (domingo).
+    """
+    dias = set(dias)
+    fecha, fechas = desde, []
+    while fecha <= hasta:
+        if fecha.weekday() in dias:
+            fechas.append(fecha)
+        fecha += timedelta(days=1)
+    return fechas
+
+
+def siguiente_numero_sesion(nombres, prefijo="Sesión"):
+    """Número que sigue al mayor de los nombres con la forma "<prefijo> X"
+
+    Los nombres con otro prefijo no cuentan: una serie "Semana" se numera aparte.
+    """
+    numeros = []
+    for nombre in nombres:
+        inicio, _, numero = nombre.strip().rpartition(' ')
+        if inicio == prefijo and numero.isdigit():
+            numeros.append(int(numero))
+    return max(numeros) + 1 if numeros else 1
+
+
+def crear_sesiones(supabase, curso_id, fechas, puntaje_maximo, prefijo="Sesión"):
+    """Crea varias sesiones de un curso con un solo insert, numeradas tras las activas con el mismo prefijo
+
+    Los registros de puntos no se crean aquí: las páginas los completan al
+    abrir cada sesión.
+    """
+    if not fechas:
+        return []
+    existentes = supabase.table('sesiones')\
+        .select('nombre')\
+        .eq('curso_id', curso_id)\
+        .is_('eliminado_en', 'null')\
+        .execute()
+    inicio = siguiente_numero_sesion((s['nombre'] for s in existentes.data), prefijo)
+    filas = [
+        {
+            'curso_id': curso_id,
+            'nombre': f"{prefijo} {inicio + i}",
+            'fecha': fecha.isoformat(),
+            'puntaje_maximo': puntaje_maximo
+        }
+        for i, fecha in enumerate(fechas)
+    ]
+    return supabase.table('sesiones').insert(filas).execute().data
@@ -0,0 +1,79 @@
+# utils/totales.py
+from array import array
+
+import streamlit as st
+
+
+class TotalesSesion:
+    """Totales por estudiante de una sesión, actualizados de forma incremental
+
+    Los puntos individuales y grupales acumulados se guardan en arreglos
+    indexados por la posición del estudiante, junto con un índice grupo →
+    posiciones de sus integrantes; así un cambio en los puntos de un grupo
+    solo toca a sus integrantes y consultar el total de un estudiante es O(1).
+    """
+
+    __slots__ = ('posicion', 'propias', 'integrantes', 'puntos_grupo', 'individual', 'grupal')
+
+    def __init__(self, miembros=(), posicion=None, integrantes=None):
+        # `posicion` e `integrantes` pueden venir de una instantánea compartida;
+        # no se modifican, los estudiantes que no están en ella van a `propias`
+        self.posicion = posicion or {}
+        self.propias = {}
+        n = len(self.posicion)
+        self.individual = array('d', bytes(8 * n))
+        self.grupal = array('d', bytes(8 * n))
+        self.integrantes = integrantes if integrantes is not None else {}
+        for grupo_id, estudiante_id in miembros:
+            self.integrantes.setdefault(grupo_id, array('i')).append(self._posicion(estudiante_id, True))
+        self.puntos_grupo = {}
+
+    @classmethod
+    def de_instantanea(cls, instantanea):
+        return cls(posicion=instantanea.posicion, integrantes=instantanea.integrantes)
+
+    def _posicion(self, estudiante_id, agregar=False):
+        pos = self.posicion.get(estudiante_id)
+        if pos is None:
+            pos = self.propias.get(estudiante_id)
+        if pos is None and agregar:
+            pos = self.propias[estudiante_id] = len(self.individual)
+            self.individual.append(0)
+            self.grupal.append(0)
+        return pos
+
+    def fijar_grupo(self, grupo_id, puntos):
+        """Actualiza los puntos de un grupo y el acumulado grupal de sus integrantes"""
+        delta = puntos - self.puntos_grupo.get(grupo_id, 0)
+        self.puntos_grupo[grupo_id] = puntos
+        if delta:
+            for pos in self.integrantes.get(grupo_id, ()):
+                self.grupal[pos] += delta
+
+    def fijar_individual(self, estudiante_id, puntos):
+        self.individual[self._posicion(estudiante_id, True)] = puntos
+
+    def individual_de(self, estudiante_id):
+        pos = self._posicion(estudiante_id)
+        return 0 if pos is None else self.individual[pos]
+
+    def grupal_de(self, estudiante_id):
+        pos = self._posicion(estudiante_id)
+        return 0 if pos is None else self.grupal[pos]
+
+    def total_de(self, estudiante_id):
+        return self.individual_de(estudiante_id) + self.grupal_de(estudiante_id)
+
+
+def obtener_totales(sesion_id, instantanea):
+    """Devuelve los totales de la sesión guardados en el estado de la página
+
+    Si cambia la sesión o la instantánea del curso (otros estudiantes o grupos)
+    los totales se vuelven a construir.
+    """
+    firma = (sesion_id, instantanea.clave)
+    guardado = st.session_state.get('totales_sesion')
+    if guardado is None or guardado[0] != firma:
+        guardado = (firma, TotalesSesion.de_instantanea(instantanea))
+        st.session_state.totales_sesion = guardado
+    return guardado[1]
@@ -0,0 +1,21 @@
+# utils/vistas.py
+import streamlit as st
+
+VISTAS = {
+    'grupos': "👥 Vista por Grupos",
+    'individual': "👤 Vista Individual",
+}
+
+
+def seleccionar_vista():
+    """Selector de la vista de puntos; a diferencia de st.tabs solo se ejecuta la vista elegida"""
+    return st.segmented_control(
+        "Vista",
+        options=list(VISTAS),
+        format_func=VISTAS.get,
+        default='grupos',
+        required=True,
+        key="vista_puntos",
+        label_visibility="collapsed"
+    )
+